@@ -0,0 +1,64 @@
+# Núcleo del analizador, sin dependencias de interfaz gráfica (la ventana
+# de Tk está en analizador.gui). Los nombres públicos se importan de su
+# módulo la primera vez que se usan, así que 'import analizador' no carga
+# sqlite3, mmap ni los módulos que el programa no llega a necesitar.
+
+# Nombre público -> módulo que lo define
+_EXPORTS = {
+    "KEYWORDS": "lexer",
+    "LEGACY_RULES": "lexer",
+    "RULES": "lexer",
+    "TOKEN_TYPES": "lexer",
+    "scan": "lexer",
+    "tokenize": "lexer",
+    "analizadorLexico": "lexer",
+    "iter_text_chunks": "stream",
+    "iter_tokens": "stream",
+    "KIND_CODES": "buffer",
+    "TokenBuffer": "buffer",
+    "Node": "parser",
+    "Parser": "parser",
+    "parse": "parser",
+    "syntax_analyzer": "syntax",
+    "relex": "incremental",
+    "semantic_analyzer": "semantic",
+    "Symbol": "symbols",
+    "SymbolTable": "symbols",
+    "Diagnostic": "pipeline",
+    "Pipeline": "pipeline",
+    "analyze_code": "pipeline",
+    "AnalysisCache": "cache",
+    "TokenStream": "tokenfile",
+    "load_tokens": "tokenfile",
+    "save_tokens": "tokenfile",
+    "CompiledExpression": "evaluator",
+    "compile_expression": "evaluator",
+    "compile_postfix": "evaluator",
+    "evaluate": "evaluator",
+    "DFA": "dfa",
+    "build_dfa": "dfa",
+    "get_dfa": "dfa",
+    "generate_polish_notation": "notation",
+    "generate_reverse_polish_notation": "notation",
+    "generate_syntax_tree": "notation",
+    "parse_expression_to_tree": "notation",
+    "Profiler": "profiling",
+    "StageRecord": "profiling",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # __import__ con fromlist devuelve el submódulo y no carga importlib
+    value = getattr(__import__(f"{__name__}.{module}", fromlist=(name,)), name)
+    # Queda como atributo del paquete: las siguientes búsquedas no pasan por aquí
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,227 @@
+import mmap
+import re
+from array import array
+from bisect import bisect_right
+from collections import Counter
+
+from .lexer import _WHITESPACE, TOKEN_TYPES, _pattern
+
+KIND_CODES = {kind: code for code, kind in enumerate(TOKEN_TYPES)}
+
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+
+
+class LineIndex:
+    """
+    Inicios de línea de un código en bytes, para pasar desplazamientos a
+    (línea, columna). En un código ASCII la columna es la distancia al
+    inicio de la línea; si no, se recuerda la última consulta y la
+    siguiente en la misma línea solo decodifica lo que avanzó, así que
+    recorrer los tokens en orden no vuelve a decodificar cada línea.
+    """
+
+    __slots__ = ("source", "starts", "ascii", "last")
+
+    def __init__(self, source, typecode="I"):
+        self.source = source
+        self.starts = array(typecode, [0])
+        find = source.find
+        offset = find(b"\n")
+        while offset >= 0:
+            self.starts.append(offset + 1)
+            offset = find(b"\n", offset + 1)
+        self.ascii = _NON_ASCII.search(source) is None
+        # Línea, desplazamiento y columna de la última consulta
+        self.last = (0, 0, 1)
+
+    def position(self, offset):
+        line = bisect_right(self.starts, offset)
+        if self.ascii:
+            return line, offset - self.starts[line - 1] + 1
+        last_line, last_offset, last_column = self.last
+        if last_line != line or last_offset > offset:
+            last_offset, last_column = self.starts[line - 1], 1
+        column = last_column + len(self.source[last_offset:offset].decode("utf-8", "replace"))
+        self.last = (line, offset, column)
+        return line, column
+
+
+class TokenBuffer:
+    """
+    Secuencia compacta de tokens sobre el código fuente codificado en UTF-8.
+
+    El tipo de cada token se guarda como un entero pequeño y sus límites
+    como desplazamientos en bytes; el lexema solo se construye cuando se
+    pide. Se recorre como pares (lexema, tipo), igual que la lista que
+    devuelve analizadorLexico.
+    """
+
+    __slots__ = ("source", "data", "compat", "kinds", "starts", "ends", "_lines")
+
+    def __init__(self, source=b"", compat=False):
+        # Un archivo mapeado se conserva tal cual, sin copiarlo
+        self.source = source if isinstance(source, mmap.mmap) else bytes(source)
+        self.data = memoryview(self.source)
+        self.compat = compat
+        typecode = "I" if len(self.source) < 1 << 32 else "Q"
+        self.kinds = array("B")
+        self.starts = array(typecode)
+        self.ends = array(typecode)
+        self._lines = None
+
+    @classmethod
+    def from_source(cls, text, compat=False, strip=False, backend="re", jobs=1):
+        """
+        Analiza el texto y devuelve el buffer con todos sus tokens.
+
+        Con 'strip' se empieza en el primer carácter no blanco, igual que al
+        analizar el texto recortado pero con desplazamientos sobre el original.
+        Con 'jobs' distinto de 1 (None: todos los núcleos) un texto grande se
+        reparte entre procesos con analizador.parallel.
+        """
+        if jobs != 1:
+            from .parallel import tokenize_buffer
+            return tokenize_buffer(text, compat, strip, jobs)
+        buffer = cls(text.encode("utf-8"), compat)
+        buffer.extend_from(text, pos=len(text) - len(text.lstrip()) if strip else 0, backend=backend)
+        return buffer
+
+    @classmethod
+    def from_file(cls, path, compat=False, strip=False):
+        """
+        Como from_source para un archivo UTF-8, que se mapea en memoria y se
+        analiza sobre sus bytes con analizador.mapped: el contenido no se
+        decodifica completo y los lexemas se leen del mapa al pedirlos.
+        """
+        from .mapped import tokenize_file
+        return tokenize_file(path, compat, strip)
+
+    def extend_from(self, text, pos=0, progress=None, step=4096, backend="re"):
+        """
+        Analiza 'text' (el mismo código que 'source', sin codificar) desde
+        'pos' y agrega los tokens al buffer.
+
+        Si se indica 'progress', se llama cada 'step' tokens con la posición
+        alcanzada en el texto. Con backend="dfa" se usa el autómata generado
+        de analizador.dfa en lugar de la expresión regular y con "numpy" el
+        recorrido vectorial de analizador.vectorized (si NumPy no está
+        instalado o el texto no es ASCII se usa la expresión regular).
+        """
+        if backend == "dfa":
+            self._extend_dfa(text, pos, progress, step)
+            return
+        if backend == "numpy":
+            # Se importa aquí para no cargar NumPy si no se usa
+            from .vectorized import extend_buffer
+            if extend_buffer(self, text, pos):
+                if progress is not None:
+                    progress(len(text))
+                return
+        elif backend != "re":
+            raise ValueError(f"backend desconocido: {backend!r}")
+
+        pattern, kinds = _pattern(self.compat)
+        codes = {group: KIND_CODES[kind] for group, kind in kinds.items()}
+        if not self.compat:
+            pos = _WHITESPACE.match(text, pos).end()
+
+        append_kind = self.kinds.append
+        append_start = self.starts.append
+        append_end = self.ends.append
+        scanner = pattern.scanner(text, pos)
+
+        if len(text) == len(self.source):
+            # Texto ASCII: los desplazamientos en caracteres ya son en bytes
+            for count, match in enumerate(iter(scanner.match, None), 1):
+                start, end = match.span(match.lastindex)
+                append_kind(codes[match.lastgroup])
+                append_start(start)
+                append_end(end)
+                if progress is not None and not count % step:
+                    progress(end)
+            return
+
+        char_pos = byte_pos = 0
+        for count, match in enumerate(iter(scanner.match, None), 1):
+            start, end = match.span(match.lastindex)
+            byte_pos += len(text[char_pos:start].encode("utf-8"))
+            byte_end = byte_pos + len(text[start:end].encode("utf-8"))
+            append_kind(codes[match.lastgroup])
+            append_start(byte_pos)
+            append_end(byte_end)
+            char_pos, byte_pos = end, byte_end
+            if progress is not None and not count % step:
+                progress(end)
+
+    def _extend_dfa(self, text, pos, progress, step):
+        # El autómata se importa (y se construye) solo si se pide este backend
+        from .dfa import get_dfa
+        append_kind = self.kinds.append
+        append_start = self.starts.append
+        append_end = self.ends.append
+        ascii_text = len(text) == len(self.source)
+        char_pos = byte_pos = 0
+        for count, (start, end, kind) in enumerate(get_dfa(self.compat).scan(text, self.compat, pos), 1):
+            if not ascii_text:
+                byte_start = byte_pos + len(text[char_pos:start].encode("utf-8"))
+                byte_end = byte_start + len(text[start:end].encode("utf-8"))
+                char_pos, byte_pos = end, byte_end
+                start, end = byte_start, byte_end
+            append_kind(KIND_CODES[kind])
+            append_start(start)
+            append_end(end)
+            if progress is not None and not count % step:
+                progress(char_pos if not ascii_text else end)
+
+    def append(self, kind, start, end):
+        self.kinds.append(KIND_CODES[kind])
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.kinds)))]
+        return self.lexeme(index), TOKEN_TYPES[self.kinds[index]]
+
+    def __iter__(self):
+        source = self.source
+        for code, start, end in zip(self.kinds, self.starts, self.ends):
+            yield source[start:end].decode("utf-8"), TOKEN_TYPES[code]
+
+    def iter_range(self, start=0, stop=None):
+        """
+        Recorre como __iter__ solo los tokens en [start, stop).
+        """
+        source = self.source
+        kinds, starts, ends = self.kinds[start:stop], self.starts[start:stop], self.ends[start:stop]
+        for code, begin, end in zip(kinds, starts, ends):
+            yield source[begin:end].decode("utf-8"), TOKEN_TYPES[code]
+
+    def span(self, index):
+        """
+        Devuelve los bytes del token como memoryview, sin copiarlos.
+        """
+        return self.data[self.starts[index]:self.ends[index]]
+
+    def lexeme(self, index):
+        return self.source[self.starts[index]:self.ends[index]].decode("utf-8")
+
+    def kind(self, index):
+        return TOKEN_TYPES[self.kinds[index]]
+
+    def counts(self):
+        """
+        Conteo por tipo de token, en el orden de primera aparición.
+        """
+        return Counter({TOKEN_TYPES[code]: count for code, count in Counter(self.kinds).items()})
+
+    def position(self, index):
+        """
+        Devuelve (línea, columna) del inicio del token, ambas desde 1.
+        """
+        if self._lines is None:
+            self._lines = LineIndex(self.source, self.starts.typecode)
+        return self._lines.position(self.starts[index])
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import time
+import zlib
+from array import array
+from contextlib import contextmanager
+from functools import lru_cache
+
+from . import lexer
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Módulos cuyo código decide lo que se guarda: las reglas, los motores
+# léxicos que puede usar la CLI y los analizadores. Se leen como archivos,
+# sin importarlos (vectorized importaría NumPy)
+_FINGERPRINT_MODULES = ("lexer", "buffer", "mapped", "parallel", "dfa", "vectorized", "parser", "syntax", "semantic",
+                        "symbols")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+INSERT OR IGNORE INTO stats SELECT 'bytes', COALESCE(SUM(size), 0) FROM entries;
+"""
+
+# Entradas que se leen por consulta al desalojar
+_EVICT_BATCH = 64
+
+
+@lru_cache(maxsize=None)
+def fingerprint():
+    """
+    Huella de la versión de las reglas de tokens y del código de los
+    analizadores: si cambia cualquiera de ellos, las entradas anteriores
+    dejan de coincidir.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((lexer.KEYWORDS, lexer.LEGACY_RULES, lexer.RULES, lexer.TOKEN_TYPES)).encode("utf-8"))
+    for name in _FINGERPRINT_MODULES:
+        with open(os.path.join(os.path.dirname(__file__), f"{name}.py"), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Caché en disco de resultados de análisis, indexada por el hash del
+    contenido del archivo más la huella de las reglas y los analizadores.
+
+    Usa SQLite en modo WAL, así que varios procesos de trabajo pueden leer y
+    escribir a la vez. Cuando el tamaño total supera 'max_bytes' se
+    eliminan las entradas usadas hace más tiempo.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        if os.path.isdir(path):
+            path = os.path.join(path, "analizador-cache.sqlite3")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def key(self, content):
+        # 'content' puede ser un archivo mapeado: se resume sin copiarlo
+        digest = hashlib.sha256(fingerprint().encode("ascii"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Devuelve la entrada guardada (tokens en arrays, conteo y mensajes de
+        los analizadores) o None si no está.
+        """
+        row = self.connection.execute("SELECT payload FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            self._count("misses")
+            return None
+        self.hits += 1
+        with self.connection:
+            self.connection.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._count("hits")
+        return _decode(row[0])
+
+    def put(self, key, tokens, syntax_result, semantic_result):
+        payload = _encode(tokens, syntax_result, semantic_result)
+        connection = self.connection
+        with self._exclusive():
+            row = connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                               (key, payload, len(payload), time.time()))
+            connection.execute("UPDATE stats SET value = value + ? WHERE name = 'bytes'",
+                               (len(payload) - (row[0] if row else 0),))
+            self._evict()
+
+    def evict(self):
+        """
+        Elimina las entradas usadas hace más tiempo hasta que el tamaño
+        total quede dentro de 'max_bytes'.
+        """
+        with self._exclusive():
+            self._evict()
+
+    @contextmanager
+    def _exclusive(self):
+        # Transacción exclusiva: dos procesos no escriben ni desalojan a la vez
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _evict(self):
+        # El tamaño total se lleva en 'stats', así que una caché dentro del
+        # presupuesto no recorre las entradas; si no, se leen de a tandas
+        connection = self.connection
+        total = connection.execute("SELECT value FROM stats WHERE name = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        while total > self.max_bytes:
+            rows = connection.execute("SELECT key, size FROM entries ORDER BY last_used LIMIT ?",
+                                      (_EVICT_BATCH,)).fetchall()
+            if not rows:
+                total = 0
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        connection.execute("UPDATE stats SET value = ? WHERE name = 'bytes'", (total,))
+        connection.execute("UPDATE stats SET value = value + ? WHERE name = 'evictions'", (evicted,))
+
+    def stats(self):
+        """
+        Estadísticas acumuladas de todos los procesos que usaron la caché.
+        """
+        values = dict(self.connection.execute("SELECT name, value FROM stats"))
+        values["entries"] = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return values
+
+    def _count(self, name):
+        self.connection.execute("UPDATE stats SET value = value + 1 WHERE name = ?", (name,))
+
+
+def _encode(tokens, syntax_result, semantic_result):
+    header = json.dumps({
+        "compat": tokens.compat,
+        "typecode": tokens.starts.typecode,
+        "length": len(tokens),
+        "counts": dict(tokens.counts()),
+        "syntax": syntax_result,
+        "semantic": semantic_result,
+    }, ensure_ascii=False).encode("utf-8")
+    body = b"".join((struct.pack("<I", len(header)), header,
+                     tokens.kinds.tobytes(), tokens.starts.tobytes(), tokens.ends.tobytes()))
+    return zlib.compress(body, 1)
+
+
+def _decode(payload):
+    body = zlib.decompress(payload)
+    (header_size,) = struct.unpack_from("<I", body)
+    entry = json.loads(body[4:4 + header_size])
+    view = memoryview(body)[4 + header_size:]
+    length = entry["length"]
+    offsets = view[length:]
+    for name, data in (("kinds", view[:length]),
+                       ("starts", offsets[:len(offsets) // 2]),
+                       ("ends", offsets[len(offsets) // 2:])):
+        values = array("B" if name == "kinds" else entry["typecode"])
+        values.frombytes(data)
+        entry[name] = values
+    return entry
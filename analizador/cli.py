@@ -0,0 +1,219 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .buffer import TokenBuffer
+from .cache import DEFAULT_MAX_BYTES, AnalysisCache
+from .mapped import map_file, tokenize_mapped
+from .parallel import available_cpus
+from .parser import parse
+from .profiling import Profiler, measure
+from .semantic import semantic_analyzer
+from .syntax import syntax_analyzer
+
+
+def collect_files(paths, pattern="*"):
+    """
+    Expande la lista de rutas: los directorios se recorren recursivamente
+    filtrando por 'pattern' y las rutas con comodines se expanden con glob.
+    """
+    seen = set()
+    for path in paths:
+        if os.path.isdir(path):
+            matches = glob.iglob(os.path.join(glob.escape(path), "**", pattern), recursive=True)
+        elif glob.has_magic(path):
+            matches = glob.iglob(path, recursive=True)
+        else:
+            matches = [path]
+        for match in matches:
+            if match not in seen and not os.path.isdir(match):
+                seen.add(match)
+                yield match
+
+
+# Una conexión a la caché por proceso de trabajo
+_caches = {}
+
+
+def _open_cache(cache_path, max_bytes):
+    cache = _caches.get(cache_path)
+    if cache is None:
+        cache = _caches[cache_path] = AnalysisCache(cache_path, max_bytes)
+    return cache
+
+
+def analyze_file(path, cache_path=None, max_bytes=DEFAULT_MAX_BYTES, profiler=None, backend="re", jobs=1):
+    """
+    Análisis léxico, sintáctico y semántico de un archivo; devuelve un
+    diccionario serializable a JSON.
+
+    Con 'cache_path', un archivo cuyo contenido ya se analizó con las mismas
+    reglas se resuelve desde la caché sin volver a analizarlo. Con
+    'profiler', cada etapa se mide y el desglose se agrega en "stages".
+    'backend' es el motor léxico de TokenBuffer.from_source y 'jobs' la
+    cantidad de procesos entre los que se reparte el análisis léxico. Con
+    "re" en un solo proceso el archivo se mapea y se analiza sobre sus bytes.
+    """
+    started = time.perf_counter()
+    first_record = len(profiler.records) if profiler is not None else 0
+    try:
+        content = map_file(path)
+    except OSError as error:
+        return {"path": path, "error": str(error)}
+
+    cache = key = None
+    if cache_path is not None:
+        cache = _open_cache(cache_path, max_bytes)
+        key = cache.key(content)
+        with measure(profiler, "cache") as record:
+            entry = cache.get(key)
+        if entry is not None:
+            record.tokens = len(entry["kinds"])
+            return _with_stages({
+                "path": path,
+                "bytes": len(content),
+                "tokens": len(entry["kinds"]),
+                "counts": entry["counts"],
+                "syntax": entry["syntax"],
+                "semantic": entry["semantic"],
+                "cached": True,
+                "seconds": round(time.perf_counter() - started, 6),
+            }, profiler, first_record)
+
+    with measure(profiler, "lexico") as record:
+        tokens = _tokenize(content, backend, jobs)
+        record.tokens = len(tokens)
+    with measure(profiler, "sintactico") as record:
+        # El árbol se construye una vez y lo usan ambos análisis
+        program = parse(tokens)
+        syntax_result = syntax_analyzer(tokens, program)
+        record.tokens = len(tokens)
+    with measure(profiler, "semantico") as record:
+        semantic_result = semantic_analyzer(tokens, program)
+        record.tokens = len(tokens)
+    if cache is not None:
+        cache.put(key, tokens, syntax_result, semantic_result)
+    return _with_stages({
+        "path": path,
+        "bytes": len(content),
+        "tokens": len(tokens),
+        "counts": dict(tokens.counts()),
+        "syntax": syntax_result,
+        "semantic": semantic_result,
+        "cached": False,
+        "seconds": round(time.perf_counter() - started, 6),
+    }, profiler, first_record)
+
+
+def _tokenize(content, backend, jobs):
+    # Con la expresión regular en un solo proceso se analizan los bytes del
+    # archivo mapeado sin decodificarlo; si no es UTF-8 válido se vuelve a
+    # decodificar reemplazando los bytes erróneos, como antes
+    if backend == "re" and jobs == 1:
+        try:
+            return tokenize_mapped(content, compat=True, strip=True)
+        except UnicodeDecodeError:
+            pass
+    return TokenBuffer.from_source(content[:].decode("utf-8", "replace"), compat=True, strip=True,
+                                   backend=backend, jobs=jobs)
+
+
+def _with_stages(result, profiler, first_record):
+    if profiler is not None:
+        result["stages"] = [record.as_dict() for record in profiler.records[first_record:]]
+    return result
+
+
+def _analyze_profiled(path, cache_path, max_bytes, memory, backend):
+    # Los perfiladores no se pueden enviar a otro proceso: cada tarea crea el suyo
+    return analyze_file(path, cache_path, max_bytes, Profiler(memory=memory), backend)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m analizador",
+        description="Analiza archivos en paralelo y escribe un resultado JSON por línea.")
+    parser.add_argument("paths", nargs="+", help="archivos, directorios o patrones glob")
+    parser.add_argument("--glob", default="*", dest="pattern",
+                        help="patrón de archivos al recorrer directorios (por defecto: *)")
+    parser.add_argument("-j", "--jobs", type=int, default=available_cpus(),
+                        help="procesos de trabajo (por defecto: núcleos disponibles)")
+    parser.add_argument("--cache", metavar="RUTA",
+                        help="archivo o directorio de la caché de resultados")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), metavar="MB",
+                        help="tamaño máximo de la caché en MB")
+    parser.add_argument("--backend", choices=("re", "dfa", "numpy"), default="re",
+                        help="motor del analizador léxico (numpy usa re si NumPy no está instalado)")
+    parser.add_argument("--profile", action="store_true",
+                        help="agrega a cada resultado el tiempo de cada etapa")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="como --profile, midiendo también la memoria de cada etapa (más lento)")
+    parser.add_argument("--cprofile", metavar="RUTA",
+                        help="analiza en este proceso bajo cProfile y guarda las estadísticas en RUTA")
+    args = parser.parse_args(argv)
+
+    files = list(collect_files(args.paths, args.pattern))
+    if not files:
+        parser.error("no se encontraron archivos para analizar")
+
+    started = time.perf_counter()
+    totals = Counter()
+    total_bytes = failures = hits = 0
+    max_bytes = args.cache_size * 1024 * 1024
+
+    profiler = executor = None
+    if args.cprofile:
+        # cProfile solo ve el proceso actual, así que no se usan procesos de trabajo
+        profiler = Profiler(memory=args.profile_memory, profile=True)
+        results = (analyze_file(path, args.cache, max_bytes, profiler, args.backend) for path in files)
+    elif len(files) == 1:
+        # Con un solo archivo los procesos se reparten su análisis léxico
+        file_profiler = Profiler(memory=args.profile_memory) if args.profile or args.profile_memory else None
+        results = [analyze_file(files[0], args.cache, max_bytes, file_profiler, args.backend, max(1, args.jobs))]
+    else:
+        executor = ProcessPoolExecutor(max_workers=max(1, args.jobs))
+        if args.profile or args.profile_memory:
+            futures = [executor.submit(_analyze_profiled, path, args.cache, max_bytes, args.profile_memory,
+                                       args.backend) for path in files]
+        else:
+            futures = [executor.submit(analyze_file, path, args.cache, max_bytes, None, args.backend)
+                       for path in files]
+        # Los resultados se escriben en el orden en que terminan
+        results = (future.result() for future in as_completed(futures))
+
+    try:
+        for result in results:
+            if "error" in result:
+                failures += 1
+            else:
+                totals.update(result["counts"])
+                total_bytes += result["bytes"]
+                hits += result["cached"]
+            sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"{len(files)} archivos ({failures} con error), {sum(totals.values())} tokens "
+          f"en {elapsed:.2f} s: {len(files) / elapsed:.1f} archivos/s, "
+          f"{total_bytes / elapsed / 1e6:.2f} MB/s", file=sys.stderr)
+    for token_type, count in totals.most_common():
+        print(f"  {token_type}: {count}", file=sys.stderr)
+    if profiler is not None:
+        profiler.dump_stats(args.cprofile)
+        print(profiler.report(), file=sys.stderr)
+        print(f"Estadísticas de cProfile guardadas en {args.cprofile}", file=sys.stderr)
+    if args.cache:
+        misses = len(files) - failures - hits
+        stats = AnalysisCache(args.cache, max_bytes).stats()
+        print(f"Caché: {hits} aciertos, {misses} fallos en esta ejecución; "
+              f"{stats['entries']} entradas, {stats['bytes'] / 1e6:.2f} MB, "
+              f"{stats['evictions']} desalojos acumulados", file=sys.stderr)
+    return 1 if failures else 0
@@ -0,0 +1,603 @@
+import hashlib
+import json
+import os
+import re
+import struct
+from array import array
+from collections import Counter
+
+from .lexer import LEGACY_RULES, RULES
+
+# Versión del formato de las tablas guardadas en disco
+FORMAT_VERSION = 1
+
+_MAGIC = b"ADFA"
+_NAMED = {
+    "d": re.compile(r"\d"),
+    "s": re.compile(r"\s"),
+    "w": re.compile(r"\w"),
+}
+_NO_RULE = 255
+
+
+class CharSet:
+    """
+    Conjunto de caracteres de una regla: caracteres ASCII explícitos más
+    las clases \\d, \\s y \\w (o sus negaciones), opcionalmente negado.
+    """
+
+    __slots__ = ("negate", "chars", "named", "negated")
+
+    def __init__(self, chars=(), named=(), negated=(), negate=False):
+        self.negate = negate
+        self.chars = frozenset(chars)
+        self.named = frozenset(named)
+        self.negated = frozenset(negated)
+        if any(ord(char) > 127 for char in self.chars):
+            raise ValueError("solo se admiten caracteres ASCII explícitos")
+
+    def contains(self, char=None, bits=None):
+        # 'bits' describe un carácter no ASCII por su pertenencia a \d, \s y \w
+        if bits is None:
+            bits = {name: bool(pattern.match(char)) for name, pattern in _NAMED.items()}
+            explicit = char in self.chars
+        else:
+            explicit = False
+        inside = (explicit or any(bits[name] for name in self.named)
+                  or any(not bits[name] for name in self.negated))
+        return inside != self.negate
+
+
+# Nodos del árbol de una regla: ("set", CharSet), ("cat", nodos),
+# ("alt", nodos), ("star" | "plus" | "opt", nodo, perezoso) y
+# ("assert", CharSet) para una condición sobre el carácter siguiente, que
+# también se cumple al final del texto.
+
+class _Parser:
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.pos = 0
+
+    def error(self, message):
+        return ValueError(f"{message} en la posición {self.pos} de {self.pattern!r}")
+
+    def peek(self):
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def take(self):
+        char = self.pattern[self.pos]
+        self.pos += 1
+        return char
+
+    def parse(self):
+        node = self.alternation()
+        if self.pos != len(self.pattern):
+            raise self.error("paréntesis sin abrir")
+        return node
+
+    def alternation(self):
+        branches = [self.sequence()]
+        while self.peek() == "|":
+            self.take()
+            branches.append(self.sequence())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def sequence(self):
+        items = []
+        while self.peek() not in (None, "|", ")"):
+            items.append(self.quantified())
+        return ("cat", items)
+
+    def quantified(self):
+        node = self.atom()
+        while self.peek() in ("*", "+", "?"):
+            if node[0] == "assert":
+                raise self.error("cuantificador sobre una aserción")
+            kind = {"*": "star", "+": "plus", "?": "opt"}[self.take()]
+            lazy = self.peek() == "?"
+            if lazy:
+                self.take()
+            node = (kind, node, lazy)
+        return node
+
+    def atom(self):
+        char = self.take()
+        if char == "(":
+            if self.pattern.startswith("?:", self.pos):
+                self.pos += 2
+                node = self.alternation()
+            elif self.pattern.startswith("?!", self.pos):
+                # Solo se admite la anticipación negativa de un carácter
+                self.pos += 2
+                inner = self.atom()
+                if inner[0] != "set" or self.peek() != ")":
+                    raise self.error("solo se admite (?!clase)")
+                chars = inner[1]
+                node = ("assert", CharSet(chars.chars, chars.named, chars.negated, not chars.negate))
+            else:
+                raise self.error("solo se admiten grupos sin captura")
+            if self.peek() != ")":
+                raise self.error("falta ')'")
+            self.take()
+            return node
+        if char == "[":
+            return ("set", self.char_class())
+        if char == ".":
+            return ("set", CharSet("\n", negate=True))
+        if char == "\\":
+            escape = self.take()
+            if escape == "b":
+                # Límite de palabra después de un carácter de palabra
+                return ("assert", CharSet(negated="w"))
+            return ("set", self.escape(escape))
+        if char in "*+?)|":
+            raise self.error(f"'{char}' inesperado")
+        return ("set", CharSet(char))
+
+    def escape(self, escape):
+        if escape in "dsw":
+            return CharSet(named=escape)
+        if escape in "DSW":
+            return CharSet(negated=escape.lower())
+        if escape == "n":
+            return CharSet("\n")
+        if escape == "t":
+            return CharSet("\t")
+        if escape.isalnum():
+            raise self.error(f"escape no admitido \\{escape}")
+        return CharSet(escape)
+
+    def char_class(self):
+        negate = self.peek() == "^"
+        if negate:
+            self.take()
+        chars, named, negated = set(), set(), set()
+        first = True
+        while first or self.peek() != "]":
+            if self.peek() is None:
+                raise self.error("falta ']'")
+            first = False
+            char = self.take()
+            if char == "\\":
+                member = self.escape(self.take())
+                chars |= member.chars
+                (negated if member.negate else named).update(member.named)
+                negated |= member.negated
+                if member.negated or member.named:
+                    continue
+                char = next(iter(member.chars))
+            if self.peek() == "-" and self.pattern[self.pos + 1:self.pos + 2] not in ("]", ""):
+                self.take()
+                end = self.take()
+                if end == "\\":
+                    end = next(iter(self.escape(self.take()).chars))
+                chars.update(chr(code) for code in range(ord(char), ord(end) + 1))
+            else:
+                chars.add(char)
+        self.take()
+        return CharSet(chars, named, negated, negate)
+
+
+def _is_lazy(node):
+    if node[0] in ("star", "plus", "opt"):
+        if node[2]:
+            return True
+        return _is_lazy(node[1])
+    if node[0] in ("cat", "alt"):
+        return any(_is_lazy(child) for child in node[1])
+    return False
+
+
+def _is_greedy_repeat(node):
+    if node[0] in ("star", "plus", "opt"):
+        return not node[2] or _is_greedy_repeat(node[1])
+    if node[0] in ("cat", "alt"):
+        return any(_is_greedy_repeat(child) for child in node[1])
+    return False
+
+
+def _char_sets(node):
+    if node[0] in ("set", "assert"):
+        yield node[1]
+    elif node[0] in ("cat", "alt"):
+        for child in node[1]:
+            yield from _char_sets(child)
+    elif node[0] in ("star", "plus", "opt"):
+        yield from _char_sets(node[1])
+
+
+class _NFA:
+    def __init__(self):
+        self.edges = []      # por estado: [(máscara de clases, destino)]
+        self.epsilon = []    # por estado: [(destino, máscara de condición o None)]
+        self.rule = []       # regla a la que pertenece cada estado
+
+    def state(self, rule):
+        self.edges.append([])
+        self.epsilon.append([])
+        self.rule.append(rule)
+        return len(self.rule) - 1
+
+    def build(self, node, start, rule, masks):
+        # Devuelve el estado final del fragmento que empieza en 'start'
+        kind = node[0]
+        if kind == "set":
+            end = self.state(rule)
+            self.edges[start].append((masks[id(node[1])], end))
+            return end
+        if kind == "assert":
+            end = self.state(rule)
+            self.epsilon[start].append((end, masks[id(node[1])]))
+            return end
+        if kind == "cat":
+            for child in node[1]:
+                start = self.build(child, start, rule, masks)
+            return start
+        if kind == "alt":
+            end = self.state(rule)
+            for child in node[1]:
+                branch = self.state(rule)
+                self.epsilon[start].append((branch, None))
+                self.epsilon[self.build(child, branch, rule, masks)].append((end, None))
+            return end
+        body = self.state(rule)
+        end = self.state(rule)
+        self.epsilon[start].append((body, None))
+        body_end = self.build(node[1], body, rule, masks)
+        self.epsilon[body_end].append((end, None))
+        if kind != "opt":
+            self.epsilon[body_end].append((body, None))
+        if kind != "plus":
+            self.epsilon[start].append((end, None))
+        return end
+
+
+class DFA:
+    """
+    Autómata finito determinista mínimo para un conjunto de reglas de
+    tokens, guardado como tablas planas.
+
+    'transitions[estado * clases + clase]' es el estado siguiente (0 es el
+    estado muerto) y 'accepts[estado * (clases + 1) + clase]' la regla que
+    acepta en ese estado si el carácter siguiente es de esa clase (la
+    última columna es el fin del texto), o 255 si ninguna acepta.
+    """
+
+    def __init__(self, kinds, ascii_classes, other_classes, spaces, transitions, accepts, start):
+        self.kinds = kinds
+        self.ascii_classes = ascii_classes
+        self.other_classes = other_classes
+        self.spaces = spaces
+        self.transitions = transitions
+        self.accepts = accepts
+        self.start = start
+        self.class_count = len(spaces)
+        self._other = {}
+
+    def __len__(self):
+        return len(self.transitions) // self.class_count
+
+    def classify(self, text):
+        """
+        Devuelve un bytes con la clase de cada carácter del texto.
+        """
+        if text.isascii():
+            return text.encode("ascii").translate(self.ascii_classes)
+        return text.translate(_ClassMap(self)).encode("latin-1")
+
+    def _class_of(self, char):
+        code = ord(char)
+        if code < 128:
+            return self.ascii_classes[code]
+        cls = self._other.get(char)
+        if cls is None:
+            bits = sum(1 << index for index, name in enumerate(_NAMED) if _NAMED[name].match(char))
+            cls = self._other[char] = self.other_classes[bits]
+        return cls
+
+    def scan(self, text, compat=False, pos=0):
+        """
+        Genera (inicio, fin, tipo) por cada token, igual que lexer.scan con
+        las mismas reglas.
+        """
+        classes = self.classify(text)
+        spaces = self.spaces
+        transitions = self.transitions
+        accepts = self.accepts
+        kinds = self.kinds
+        width = self.class_count
+        eof = width
+        start = self.start
+        size = len(text)
+
+        if not compat:
+            while pos < size and spaces[classes[pos]]:
+                pos += 1
+        while pos < size:
+            # Recorrido de máxima coincidencia: una regla de más prioridad
+            # reemplaza a la aceptada, la misma regla la alarga
+            state = start
+            best = _NO_RULE - 1
+            end = position = pos
+            while True:
+                cls = classes[position] if position < size else eof
+                rule = accepts[state * (width + 1) + cls]
+                if rule <= best:
+                    best = rule
+                    end = position
+                if cls == eof:
+                    break
+                state = transitions[state * width + cls]
+                if not state:
+                    break
+                position += 1
+            yield pos, end, kinds[best]
+            pos = end
+            while pos < size and spaces[classes[pos]]:
+                pos += 1
+
+
+class _ClassMap(dict):
+    # Mapa para str.translate: calcula y recuerda la clase de cada carácter
+    def __init__(self, dfa):
+        super().__init__()
+        self.dfa = dfa
+
+    def __missing__(self, code):
+        cls = self[code] = self.dfa._class_of(chr(code))
+        return cls
+
+
+def build_dfa(rules):
+    """
+    Compila las reglas (tipo, expresión) en un DFA mínimo con la misma
+    semántica que la alternancia maestra de lexer: gana la primera regla
+    que coincide; las reglas con cuantificadores codiciosos toman la
+    coincidencia más larga y las perezosas la más corta. Se agrega al final
+    la regla de ERROR para un carácter cualquiera.
+    """
+    rules = list(rules) + [("ERROR", r"[\s\S]")]
+    trees = [_Parser(pattern).parse() for _, pattern in rules]
+    lazy = []
+    for (_, pattern), tree in zip(rules, trees):
+        is_lazy = _is_lazy(tree)
+        if is_lazy and _is_greedy_repeat(tree):
+            raise ValueError(f"no se admiten cuantificadores codiciosos y perezosos juntos: {pattern!r}")
+        lazy.append(is_lazy)
+
+    # Clases de caracteres: los caracteres con la misma pertenencia a todos
+    # los conjuntos de las reglas son indistinguibles
+    sets = [charset for tree in trees for charset in _char_sets(tree)]
+    sets.append(CharSet(named="s"))
+    signatures = {}
+    ascii_classes = bytearray(256)
+    for code in range(128):
+        signature = tuple(charset.contains(chr(code)) for charset in sets)
+        ascii_classes[code] = signatures.setdefault(signature, len(signatures))
+    other_classes = bytearray(1 << len(_NAMED))
+    for bits in range(1 << len(_NAMED)):
+        flags = {name: bool(bits >> index & 1) for index, name in enumerate(_NAMED)}
+        signature = tuple(charset.contains(bits=flags) for charset in sets)
+        other_classes[bits] = signatures.setdefault(signature, len(signatures))
+    class_count = len(signatures)
+    if class_count >= 256:
+        raise ValueError("demasiadas clases de caracteres")
+    by_class = sorted(signatures, key=signatures.get)
+    masks = {}
+    for index, charset in enumerate(sets):
+        masks[id(charset)] = sum(1 << cls for cls, signature in enumerate(by_class) if signature[index])
+    full = (1 << (class_count + 1)) - 1
+    for charset in sets:
+        # Las condiciones sobre el carácter siguiente se cumplen al final del texto
+        masks[id(charset)] |= 1 << class_count
+    spaces = bytes(signature[-1] for signature in by_class)
+
+    nfa = _NFA()
+    start = nfa.state(None)
+    finals = []
+    for rule, tree in enumerate(trees):
+        entry = nfa.state(rule)
+        nfa.epsilon[start].append((entry, None))
+        finals.append(nfa.build(tree, entry, rule, masks))
+
+    def closure(seeds):
+        states = {}
+        stack = list(seeds.items())
+        while stack:
+            state, mask = stack.pop()
+            known = states.get(state, 0)
+            if known | mask == known:
+                continue
+            states[state] = known | mask
+            for target, condition in nfa.epsilon[state]:
+                reach = mask & condition if condition is not None else mask
+                if reach:
+                    stack.append((target, reach))
+        # Una regla perezosa que ya aceptó no sigue buscando coincidencias más largas
+        for rule, final in enumerate(finals):
+            if lazy[rule] and final in states:
+                if states[final] != full:
+                    raise ValueError("una regla perezosa no puede terminar en una aserción")
+                states = {state: mask for state, mask in states.items()
+                          if nfa.rule[state] != rule or state == final}
+        return frozenset(states.items())
+
+    dead = frozenset()
+    initial = closure({start: full})
+    ids = {dead: 0, initial: 1}
+    order = [dead, initial]
+    table = []
+    accept_rows = []
+    for current in order:
+        row = []
+        for cls in range(class_count):
+            seeds = {}
+            bit = 1 << cls
+            for state, mask in current:
+                if mask & bit:
+                    for edge_mask, target in nfa.edges[state]:
+                        if edge_mask & bit:
+                            seeds[target] = full
+            target = closure(seeds) if seeds else dead
+            if target not in ids:
+                ids[target] = len(order)
+                order.append(target)
+            row.append(ids[target])
+        table.append(row)
+        accepting = [_NO_RULE] * (class_count + 1)
+        for state, mask in current:
+            rule = nfa.rule[state]
+            if rule is not None and state == finals[rule]:
+                for cls in range(class_count + 1):
+                    if mask >> cls & 1 and rule < accepting[cls]:
+                        accepting[cls] = rule
+        accept_rows.append(tuple(accepting))
+
+    table, accept_rows, start_state = _minimize(table, accept_rows, 1)
+    typecode = "B" if len(table) < 256 else "H"
+    transitions = array(typecode, [target for row in table for target in row])
+    accepts = array("B", [rule for row in accept_rows for rule in row])
+    kinds = tuple(kind for kind, _ in rules)
+    return DFA(kinds, bytes(ascii_classes), bytes(other_classes), spaces, transitions, accepts, start_state)
+
+
+def _minimize(table, accept_rows, start):
+    # Refinamiento de particiones de Moore; el estado muerto queda como 0
+    blocks = {}
+    partition = [blocks.setdefault((state == 0, accept_rows[state]), len(blocks)) for state in range(len(table))]
+    while True:
+        blocks = {}
+        refined = [blocks.setdefault((partition[state], tuple(partition[target] for target in row)), len(blocks))
+                   for state, row in enumerate(table)]
+        if len(blocks) == len(set(partition)):
+            break
+        partition = refined
+    # Se renumera para que el muerto sea 0
+    numbers = {partition[0]: 0}
+    for state in range(len(table)):
+        numbers.setdefault(partition[state], len(numbers))
+    size = len(numbers)
+    new_table = [None] * size
+    new_accepts = [None] * size
+    for state, row in enumerate(table):
+        block = numbers[partition[state]]
+        if new_table[block] is None:
+            new_table[block] = [numbers[partition[target]] for target in row]
+            new_accepts[block] = accept_rows[state]
+    return new_table, new_accepts, numbers[partition[start]]
+
+
+def _rules_key(rules):
+    digest = hashlib.sha256()
+    digest.update(repr((FORMAT_VERSION, tuple(rules))).encode("utf-8"))
+    with open(__file__, "rb") as source:
+        digest.update(source.read())
+    return digest.hexdigest()
+
+
+def cache_dir():
+    """
+    Directorio donde se guardan las tablas generadas: ANALIZADOR_CACHE_DIR
+    o, si no está definida, ~/.cache/analizador.
+    """
+    path = os.environ.get("ANALIZADOR_CACHE_DIR")
+    if path:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "analizador")
+
+
+def save_dfa(dfa, path, key=""):
+    header = json.dumps({
+        "key": key,
+        "kinds": dfa.kinds,
+        "start": dfa.start,
+        "typecode": dfa.transitions.typecode,
+    }).encode("utf-8")
+    body = b"".join((_MAGIC, struct.pack("<I", len(header)), header, dfa.ascii_classes, dfa.other_classes,
+                     struct.pack("<B", dfa.class_count), dfa.spaces,
+                     struct.pack("<I", len(dfa.transitions)), dfa.transitions.tobytes(), dfa.accepts.tobytes()))
+    # Se escribe a un temporal y se renombra para no dejar tablas a medias
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as output:
+        output.write(body)
+    os.replace(temporary, path)
+
+
+def load_dfa(path, key=None):
+    """
+    Lee una tabla guardada con save_dfa; devuelve None si no existe, está
+    dañada o se generó para otras reglas.
+    """
+    try:
+        with open(path, "rb") as source:
+            body = source.read()
+        if body[:4] != _MAGIC:
+            return None
+        (header_size,) = struct.unpack_from("<I", body, 4)
+        offset = 8 + header_size
+        header = json.loads(body[8:offset])
+        if key is not None and header["key"] != key:
+            return None
+        ascii_classes = body[offset:offset + 256]
+        other_classes = body[offset + 256:offset + 256 + (1 << len(_NAMED))]
+        offset += 256 + (1 << len(_NAMED))
+        class_count = body[offset]
+        spaces = body[offset + 1:offset + 1 + class_count]
+        offset += 1 + class_count
+        (count,) = struct.unpack_from("<I", body, offset)
+        offset += 4
+        transitions = array(header["typecode"])
+        transitions.frombytes(body[offset:offset + count * transitions.itemsize])
+        offset += count * transitions.itemsize
+        accepts = array("B")
+        accepts.frombytes(body[offset:])
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+    if len(accepts) != count // class_count * (class_count + 1):
+        return None
+    return DFA(tuple(header["kinds"]), ascii_classes, other_classes, spaces, transitions, accepts, header["start"])
+
+
+_dfas = {}
+
+
+def get_dfa(compat=False):
+    """
+    DFA de las reglas originales (compat) o corregidas. Se genera una sola
+    vez y se guarda en cache_dir() para que los siguientes arranques solo
+    tengan que leer la tabla.
+    """
+    dfa = _dfas.get(compat)
+    if dfa is not None:
+        return dfa
+    rules = LEGACY_RULES if compat else RULES
+    key = _rules_key(rules)
+    path = os.path.join(cache_dir(), f"dfa-{'legacy' if compat else 'rules'}-{key[:16]}.bin")
+    dfa = load_dfa(path, key)
+    if dfa is None:
+        dfa = build_dfa(rules)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            save_dfa(dfa, path, key)
+        except OSError:
+            # Sin caché en disco (por ejemplo, un directorio de solo lectura)
+            pass
+    _dfas[compat] = dfa
+    return dfa
+
+
+def scan(text, compat=False, pos=0):
+    """
+    Igual que lexer.scan, pero con el DFA generado en lugar de la
+    expresión regular.
+    """
+    return get_dfa(compat).scan(text, compat, pos)
+
+
+def tokenize(text, compat=False):
+    """
+    Igual que lexer.tokenize, con el DFA generado.
+    """
+    results = [(text[start:end], kind) for start, end, kind in scan(text, compat)]
+    return results, Counter(kind for _, kind in results)
@@ -0,0 +1,478 @@
+import ast
+import re
+import threading
+from collections import OrderedDict
+
+from .notation import POSTFIX_LABELS, UNARY_LABELS, segment
+from .parser import (ASSIGNMENT, PRECEDENCE, Assign, Binary, Call, Index, Member, Name, Node, Number, Postfix,
+                     String, Unary, parse)
+
+# Expresiones compiladas recientes, por su secuencia de tokens
+CACHE_SIZE = 256
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_INCREMENT = {"++": "+", "--": "-"}
+# Operador de cada etiqueta de un operando de las notaciones y el árbol
+_PREFIX_OPS = {label: op for op, label in UNARY_LABELS.items()}
+_POSTFIX_OPS = {label: op for op, label in POSTFIX_LABELS.items()}
+
+# Operadores que se pueden calcular al compilar si sus operandos son constantes
+_BINARY = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a / b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def _not(value):
+    # '!' de C: con un array de NumPy se niega elemento a elemento
+    try:
+        return not value
+    except ValueError:
+        return value == 0
+
+
+_UNARY = {
+    "-": lambda a: -a,
+    "+": lambda a: +a,
+    "!": _not,
+}
+
+
+def _literal(node):
+    # Valor de un Number o String del código
+    if isinstance(node, Number):
+        return float(node.value) if "." in node.value else int(node.value)
+    try:
+        return ast.literal_eval(node.value)
+    except (ValueError, SyntaxError):
+        return node.value[1:-1]
+
+
+class CompiledExpression:
+    """
+    Una o más expresiones compiladas a una función de Python.
+
+    Se llama con las variables como diccionario o como argumentos con
+    nombre; los valores pueden ser números o arrays de NumPy (o cualquier
+    objeto con esos operadores), así que una llamada con columnas de un
+    millón de filas evalúa todas las filas a la vez. Las funciones que se
+    llaman en la expresión también se pasan como variables. Las
+    asignaciones se escriben en el diccionario recibido y el resultado es
+    el valor de la última expresión. La división es siempre real.
+
+    'names' son las variables que la expresión lee y 'source' el código
+    generado.
+    """
+
+    __slots__ = ("names", "assigned", "source", "function")
+
+    def __init__(self, names, assigned, source, function):
+        self.names = names
+        self.assigned = assigned
+        self.source = source
+        self.function = function
+
+    def __call__(self, bindings=None, **names):
+        if bindings is None:
+            bindings = names
+        elif names:
+            bindings = {**bindings, **names}
+        try:
+            return self.function(bindings)
+        except KeyError as error:
+            if error.args and error.args[0] in self.names:
+                raise NameError(f"la variable '{error.args[0]}' no tiene valor") from None
+            raise
+
+    def __repr__(self):
+        return f"CompiledExpression(names={self.names!r})"
+
+
+class _Compiler:
+    """
+    Genera el código de una secuencia de expresiones en orden postfijo:
+    cada operación queda en una variable temporal, las constantes se
+    calculan al compilar y una subexpresión que ya se calculó (con las
+    mismas versiones de sus variables) se reutiliza.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+        self.temporaries = 0
+        # Nombre local actual de cada variable y su versión: cada
+        # asignación crea una versión nueva, así los resultados anteriores
+        # siguen valiendo y no se reutilizan los que dependían de ella
+        self.locals = {}
+        self.versions = {}
+        self.reads = []
+        self.assigned = []
+        self.common = {}
+
+    # Un operando es ("const", valor) o ("ref", código, clave)
+
+    def constant(self, value):
+        return ("const", value)
+
+    def code(self, operand):
+        if operand[0] == "ref":
+            return operand[1]
+        value = operand[1]
+        key = (type(value), value)
+        name = self.constants.get(key)
+        if name is None:
+            name = self.constants[key] = f"_c{len(self.constants)}"
+        return name
+
+    def key(self, operand):
+        return ("const", type(operand[1]), operand[1]) if operand[0] == "const" else operand[2]
+
+    def emit(self, expression, key=None):
+        # Guarda 'expression' en una temporal, o reutiliza la que ya la tiene
+        if key is not None:
+            found = self.common.get(key)
+            if found is not None:
+                return found
+        name = f"_t{self.temporaries}"
+        self.temporaries += 1
+        self.lines.append(f"{name} = {expression}")
+        operand = ("ref", name, key if key is not None else ("temp", name))
+        if key is not None:
+            self.common[key] = operand
+        return operand
+
+    def read(self, name):
+        local = self.locals.get(name)
+        if local is None:
+            if not name.isidentifier():
+                raise ValueError(f"'{name}' no es un nombre de variable")
+            local = self.locals[name] = f"v0_{name}"
+            self.versions[name] = 0
+            self.lines.append(f"{local} = _env[{name!r}]")
+            if name not in self.reads:
+                self.reads.append(name)
+        return ("ref", local, ("var", name, self.versions[name]))
+
+    def write(self, name, operand):
+        version = self.versions.get(name, -1) + 1
+        self.versions[name] = version
+        local = self.locals[name] = f"v{version}_{name}"
+        self.lines.append(f"{local} = {self.code(operand)}")
+        self.lines.append(f"_env[{name!r}] = {local}")
+        if name not in self.assigned:
+            self.assigned.append(name)
+        return ("ref", local, ("var", name, version))
+
+    def touch(self, target):
+        # Tras modificar a[i] o a.b, las lecturas anteriores de 'a' no se reutilizan
+        while isinstance(target, (Index, Member)):
+            target = target.value
+        if isinstance(target, Name) and target.id in self.versions:
+            self.versions[target.id] += 1
+
+    def binary(self, op, left, right):
+        if left[0] == right[0] == "const":
+            try:
+                return self.constant(_BINARY[op](left[1], right[1]))
+            except Exception:
+                pass  # p. ej. una división por cero: se informa al evaluar
+        return self.emit(f"{self.code(left)} {op} {self.code(right)}", (op, self.key(left), self.key(right)))
+
+    def unary(self, op, operand):
+        if operand[0] == "const":
+            try:
+                return self.constant(_UNARY[op](operand[1]))
+            except Exception:
+                pass
+        if op == "!":
+            return self.emit(f"_not({self.code(operand)})", ("!", self.key(operand)))
+        return self.emit(f"{op}{self.code(operand)}", ("u" + op, self.key(operand)))
+
+    def store(self, target, value, parts):
+        # Asigna 'value' a un nombre, un índice o un miembro; 'parts' son
+        # los operandos ya calculados del destino (base e índice)
+        if isinstance(target, Name):
+            return self.write(target.id, value)
+        if isinstance(target, Index):
+            self.lines.append(f"{self.code(parts[0])}[{self.code(parts[1])}] = {self.code(value)}")
+        elif isinstance(target, Member):
+            self.lines.append(f"setattr({self.code(parts[0])}, {target.name!r}, {self.code(value)})")
+        else:
+            raise ValueError("solo se puede asignar a una variable, un índice o un miembro")
+        self.touch(target)
+        return value
+
+    def load(self, target, parts):
+        # Valor actual del destino de una asignación compuesta o un incremento
+        if isinstance(target, Name):
+            return self.read(target.id)
+        if isinstance(target, Index):
+            return self.emit(f"{self.code(parts[0])}[{self.code(parts[1])}]")
+        if isinstance(target, Member):
+            return self.emit(f"getattr({self.code(parts[0])}, {target.name!r})")
+        raise ValueError("solo se puede modificar una variable, un índice o un miembro")
+
+    def expression(self, node):
+        """
+        Compila un nodo de expresión sin recursión y devuelve su operando.
+        """
+        operands = []
+        stack = [(node, False)]
+        while stack:
+            node, visited = stack.pop()
+            if not visited:
+                children = _operands(node)
+                if children is None:
+                    operands.append(self.leaf(node))
+                    continue
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(children))
+                continue
+            count = len(_operands(node))
+            parts = operands[len(operands) - count:]
+            del operands[len(operands) - count:]
+            operands.append(self.reduce(node, parts))
+        return operands[-1]
+
+    def leaf(self, node):
+        if isinstance(node, Name):
+            return self.read(node.id)
+        if isinstance(node, (Number, String)):
+            return self.constant(_literal(node))
+        raise ValueError(f"no se puede evaluar {type(node).__name__}")
+
+    def reduce(self, node, parts):
+        if isinstance(node, Binary):
+            if node.op not in _BINARY:
+                raise ValueError(f"operador desconocido: {node.op}")
+            return self.binary(node.op, *parts)
+        if isinstance(node, Unary) and node.op in _UNARY:
+            return self.unary(node.op, parts[0])
+        if isinstance(node, (Unary, Postfix)):
+            if node.op not in _INCREMENT:
+                raise ValueError(f"operador desconocido: {node.op}")
+            old = self.load(node.operand, parts)
+            new = self.emit(f"{self.code(old)} {_INCREMENT[node.op]} 1")
+            self.store(node.operand, new, parts)
+            return old if isinstance(node, Postfix) else new
+        if isinstance(node, Assign):
+            value = parts[-1]
+            target_parts = parts[:-1]
+            if node.op != "=":
+                value = self.binary(node.op[0], self.load(node.target, target_parts), value)
+            return self.store(node.target, value, target_parts)
+        if isinstance(node, Call):
+            arguments = ", ".join(self.code(part) for part in parts[1:])
+            return self.emit(f"{self.code(parts[0])}({arguments})")
+        if isinstance(node, Index):
+            return self.emit(f"{self.code(parts[0])}[{self.code(parts[1])}]",
+                             ("[]", self.key(parts[0]), self.key(parts[1])))
+        if isinstance(node, Member):
+            return self.emit(f"getattr({self.code(parts[0])}, {node.name!r})", (".", self.key(parts[0]), node.name))
+        raise ValueError(f"no se puede evaluar {type(node).__name__}")
+
+    def build(self, expressions):
+        result = self.constant(None)
+        for expression in expressions:
+            result = self.expression(expression)
+        body = self.lines + [f"return {self.code(result)}"]
+        source = "def _evaluate(_env):\n" + "".join(f"    {line}\n" for line in body)
+        namespace = {"_not": _not}
+        namespace.update({name: value for (_, value), name in self.constants.items()})
+        exec(compile(source, "<expresión>", "exec"), namespace)
+        return CompiledExpression(tuple(self.reads), tuple(self.assigned), source, namespace["_evaluate"])
+
+
+def _operands(node):
+    # Hijos que se calculan antes que el nodo, en orden; None en las hojas.
+    # El destino de una asignación no se lee: solo su base y su índice.
+    if isinstance(node, Binary):
+        return [node.left, node.right]
+    if isinstance(node, (Unary, Postfix)):
+        if node.op in _INCREMENT:
+            return _target(node.operand)
+        return [node.operand]
+    if isinstance(node, Assign):
+        return _target(node.target) + [node.value]
+    if isinstance(node, Call):
+        return [node.func, *node.args]
+    if isinstance(node, Index):
+        return [node.value, node.index]
+    if isinstance(node, Member):
+        return [node.value]
+    return None
+
+
+def _target(node):
+    if isinstance(node, Index):
+        return [node.value, node.index]
+    if isinstance(node, Member):
+        return [node.value]
+    return []
+
+
+def _from_tree(tree):
+    """
+    Convierte el árbol de listas de parse_expression_to_tree en nodos.
+    """
+    built = []
+    # Se arma en orden postfijo con una pila explícita
+    stack = [(tree, False)]
+    while stack:
+        item, visited = stack.pop()
+        label, children = item[0], item[1:]
+        if children and not visited:
+            stack.append((item, True))
+            stack.extend((child, False) for child in reversed(children))
+            continue
+        count = len(children)
+        parts = built[len(built) - count:] if count else []
+        if count:
+            del built[len(built) - count:]
+        built.append(_node(label, parts, children))
+    return built[-1]
+
+
+def _node(label, parts, children=None):
+    if not parts:
+        if _NUMBER.fullmatch(label):
+            return Number(label)
+        if label.startswith('"'):
+            return String(label)
+        return Name(label)
+    if label == "()":
+        return Call(parts[0], parts[1:])
+    if label == "[]" and len(parts) == 2:
+        return Index(*parts)
+    if label == "." and len(parts) == 2 and isinstance(parts[1], Name):
+        return Member(parts[0], parts[1].id)
+    if label in ASSIGNMENT and len(parts) == 2:
+        return Assign(label, *parts)
+    if label in PRECEDENCE and len(parts) == 2:
+        return Binary(label, *parts)
+    if len(parts) == 1 and label in _PREFIX_OPS:
+        return Unary(_PREFIX_OPS[label], parts[0])
+    if len(parts) == 1 and label in _POSTFIX_OPS:
+        return Postfix(_POSTFIX_OPS[label], parts[0])
+    raise ValueError(f"'{label}' no es parte de una expresión")
+
+
+def _from_postfix(labels):
+    """
+    Arma los nodos de una expresión en notación postfija. La etiqueta dice
+    cuántos operandos toma cada operador ('-' es binario y 'u-' unario);
+    una llamada no indica cuántos argumentos tiene, así que no se admite.
+    """
+    operands = []
+    for label in labels:
+        if label == "()":
+            raise ValueError("la notación postfija no indica los argumentos de una llamada: "
+                             "compile el código o el árbol")
+        if label in _PREFIX_OPS or label in _POSTFIX_OPS:
+            arity = 1
+        elif label in PRECEDENCE or label in ASSIGNMENT or label in ("[]", "."):
+            arity = 2
+        else:
+            arity = 0
+        if len(operands) < arity:
+            raise ValueError(f"faltan operandos para '{label}'")
+        parts = operands[len(operands) - arity:] if arity else []
+        if arity:
+            del operands[len(operands) - arity:]
+        operands.append(_node(label, parts))
+    if len(operands) != 1:
+        raise ValueError("la notación postfija no forma una sola expresión")
+    return operands[0]
+
+
+def _terminated(tokens):
+    # Una expresión suelta no necesita el ';' final que pide el parser
+    visible = [lexeme for lexeme, kind in tokens if kind not in ("COMENTARIO", "ERROR")]
+    if visible and visible[-1] not in (";", "}"):
+        return tokens + ((";", "DELIMITADOR"),)
+    return tokens
+
+
+def _expressions(tokens):
+    # Expresiones del código en el orden de evaluación
+    program = parse(tokens)
+    if program.errors:
+        raise ValueError(sorted(program.errors)[0][1])
+    expressions = segment(program)
+    if not expressions:
+        raise ValueError("el código no tiene expresiones")
+    return expressions
+
+
+def _cached(key, build):
+    with _lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            return compiled
+    compiled = _Compiler().build(build())
+    with _lock:
+        _cache[key] = compiled
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def compile_expression(expression):
+    """
+    Compila para evaluar: código fuente, una secuencia de tokens (pares
+    (lexema, tipo) o un TokenBuffer), un nodo de expresión del parser o el
+    árbol de listas de parse_expression_to_tree. Si el código tiene varias
+    expresiones se evalúan en orden y se devuelve la última.
+
+    Lo compilado desde código o tokens se guarda por su secuencia de
+    tokens, así que la misma expresión no se vuelve a compilar.
+    """
+    if isinstance(expression, Node):
+        return _Compiler().build([expression])
+    if isinstance(expression, list) and expression and isinstance(expression[0], str):
+        return _Compiler().build([_from_tree(expression)])
+    if isinstance(expression, str):
+        from .lexer import tokenize
+        expression, _ = tokenize(expression, compat=True)
+    tokens = tuple((lexeme, kind) for lexeme, kind in expression)
+    return _cached(("tokens", tokens), lambda: _expressions(_terminated(tokens)))
+
+
+def compile_postfix(notation):
+    """
+    Compila la notación polaca inversa de generate_reverse_polish_notation
+    (un string con una expresión por línea, o la lista de sus elementos).
+    Los elementos van separados por espacios, así que un string con
+    espacios dentro no se puede representar; para eso está
+    compile_expression.
+    """
+    lines = notation.splitlines() if isinstance(notation, str) else [notation]
+    sequences = tuple(tuple(line.split()) if isinstance(line, str) else tuple(line) for line in lines)
+    sequences = tuple(sequence for sequence in sequences if sequence)
+    if not sequences:
+        raise ValueError("la notación postfija está vacía")
+    return _cached(("postfix", sequences), lambda: [_from_postfix(sequence) for sequence in sequences])
+
+
+def evaluate(expression, bindings=None, **names):
+    """
+    Compila (o toma de la caché) y evalúa la expresión con las variables
+    dadas; ver compile_expression y CompiledExpression.
+    """
+    return compile_expression(expression)(bindings, **names)
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
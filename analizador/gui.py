@@ -0,0 +1,884 @@
+import math
+import queue
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import compress
+import tkinter as tk
+from tkinter import filedialog, messagebox, scrolledtext, ttk
+
+from .buffer import TokenBuffer
+from .incremental import relex
+from .layout import layout
+from .lexer import TOKEN_TYPES
+from .notation import generate_polish_notation, generate_reverse_polish_notation, parse_expression_to_tree
+from .pipeline import analyze_code
+from .profiling import Profiler, format_bytes
+from .semantic import semantic_analyzer
+from .syntax import syntax_analyzer
+from .tokenfile import TokenStream, load_tokens, save_tokens
+
+
+class AnalysisCancelled(Exception):
+    """
+    Se lanza dentro del hilo de análisis cuando el usuario lo cancela.
+    """
+
+
+class VirtualTokenTable:
+    """
+    Tabla de tokens virtualizada: el Treeview solo contiene las filas que
+    caben en pantalla y se rellenan desde la secuencia de tokens en memoria
+    al desplazarse, así que el costo no depende de la cantidad de tokens.
+    """
+
+    ALL_TYPES = "Todos"
+
+    def __init__(self, parent):
+        self.tokens = []
+        self.rows = None  # Índices visibles cuando hay filtro; None = todos
+        self.top = 0
+        self.visible = 1
+
+        toolbar = ttk.Frame(parent)
+        toolbar.pack(side="top", fill="x", pady=(0, 5))
+
+        ttk.Label(toolbar, text="Ir a fila:").pack(side="left")
+        self.jump_var = tk.StringVar()
+        jump_entry = ttk.Entry(toolbar, textvariable=self.jump_var, width=10)
+        jump_entry.pack(side="left", padx=5)
+        jump_entry.bind("<Return>", lambda event: self.jump_to_entry())
+        ttk.Button(toolbar, text="Ir", command=self.jump_to_entry).pack(side="left")
+
+        self.filter_var = tk.StringVar(value=self.ALL_TYPES)
+        filter_box = ttk.Combobox(toolbar, textvariable=self.filter_var, state="readonly", width=16,
+                                  values=(self.ALL_TYPES,) + TOKEN_TYPES)
+        filter_box.pack(side="right")
+        filter_box.bind("<<ComboboxSelected>>", lambda event: self.apply_filter())
+        ttk.Label(toolbar, text="Filtrar:").pack(side="right", padx=5)
+
+        self.tree = ttk.Treeview(parent, columns=("fila", "lexema", "tipo"), show="headings")
+        self.tree.heading("fila", text="#")
+        self.tree.heading("lexema", text="Lexema")
+        self.tree.heading("tipo", text="Tipo de Token")
+        self.tree.column("fila", width=60, anchor="e", stretch=False)
+        self.tree.column("lexema", width=150)
+        self.tree.column("tipo", width=150)
+
+        self.scroll = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scroll.pack(side="right", fill="y")
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll_by(-event.delta // 120 * 3))
+        self.tree.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_by(3))
+        self.tree.bind("<Prior>", lambda event: self.scroll_by(-self.visible))
+        self.tree.bind("<Next>", lambda event: self.scroll_by(self.visible))
+
+    def __len__(self):
+        return len(self.tokens) if self.rows is None else len(self.rows)
+
+    def set_tokens(self, tokens, keep_position=False):
+        self.tokens = tokens
+        top = self.top
+        self.apply_filter()
+        if keep_position:
+            self.top = top
+            self.refresh()
+
+    def clear(self):
+        # Todas las filas se eliminan en una sola llamada
+        self.tokens = []
+        self.rows = None
+        self.top = 0
+        self.tree.delete(*self.tree.get_children())
+        self.scroll.set(0, 1)
+
+    def apply_filter(self):
+        token_type = self.filter_var.get()
+        if token_type == self.ALL_TYPES:
+            self.rows = None
+        elif hasattr(self.tokens, "kinds"):
+            code = TOKEN_TYPES.index(token_type)
+            self.rows = array("I", compress(range(len(self.tokens)), map(code.__eq__, self.tokens.kinds)))
+        else:
+            self.rows = array("I", (i for i, (_, kind) in enumerate(self.tokens) if kind == token_type))
+        self.top = 0
+        self.refresh()
+
+    def on_resize(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # Se descuenta una fila para el encabezado
+        self.visible = max(1, event.height // row_height - 1)
+        self.refresh()
+
+    def scroll_by(self, rows):
+        self.top += rows
+        self.refresh()
+
+    def yview(self, action, amount, unit=None):
+        if action == "moveto":
+            self.top = int(float(amount) * len(self))
+        elif unit == "pages":
+            self.top += int(amount) * self.visible
+        else:
+            self.top += int(amount)
+        self.refresh()
+
+    def jump_to_entry(self):
+        try:
+            self.jump_to(int(self.jump_var.get()) - 1)
+        except ValueError:
+            messagebox.showerror("Error", "Ingresa un número de fila válido.")
+
+    def jump_to(self, row):
+        # 'row' es el índice del token; con filtro se va al más cercano
+        if self.rows is not None:
+            row = bisect_left(self.rows, row)
+        self.top = row
+        self.refresh()
+        children = self.tree.get_children()
+        if children:
+            self.tree.selection_set(children[0])
+
+    def refresh(self):
+        total = len(self)
+        self.top = max(0, min(self.top, total - self.visible))
+        count = min(self.visible, total - self.top)
+
+        children = self.tree.get_children()
+        if len(children) > count:
+            self.tree.delete(*children[count:])
+        for _ in range(len(children), count):
+            self.tree.insert("", "end")
+
+        for iid, position in zip(self.tree.get_children(), range(self.top, self.top + count)):
+            index = position if self.rows is None else self.rows[position]
+            lexeme, token_type = self.tokens[index]
+            self.tree.item(iid, values=(index + 1, lexeme, token_type))
+
+        if total:
+            self.scroll.set(self.top / total, (self.top + count) / total)
+        else:
+            self.scroll.set(0, 1)
+
+
+class SyntaxTreeCanvas:
+    """
+    Lienzo del árbol sintáctico con zoom, desplazamiento y barras. Las
+    posiciones salen de analizador.layout, calculadas una vez por árbol, y
+    en cada redibujo solo se crean los nodos y aristas de la zona visible;
+    si aun así son demasiados, se dibuja uno de cada varios.
+    """
+
+    X_SPACING = 60  # Píxeles por unidad horizontal con zoom 1
+    Y_SPACING = 90
+    RADIUS = 20
+    MARGIN = 40
+    MAX_ITEMS = 4000
+    MIN_SCALE = 0.01
+    MAX_SCALE = 4.0
+
+    def __init__(self, parent, tree):
+        self.layout = layout(tree)
+        self.scale = 1.0
+        self.redraw_pending = False
+
+        toolbar = ttk.Frame(parent)
+        toolbar.pack(side="top", fill="x", padx=5, pady=5)
+        ttk.Button(toolbar, text="+", width=3, command=lambda: self.zoom(1.25)).pack(side="left")
+        ttk.Button(toolbar, text="-", width=3, command=lambda: self.zoom(0.8)).pack(side="left", padx=5)
+        ttk.Button(toolbar, text="Ajustar", command=self.fit).pack(side="left")
+        ttk.Label(toolbar, text=f"{len(self.layout)} nodos, {self.layout.height + 1} niveles").pack(side="right")
+
+        frame = ttk.Frame(parent)
+        frame.pack(fill="both", expand=True)
+        self.canvas = tk.Canvas(frame, bg="white", width=800, height=560, highlightthickness=0)
+        x_scroll = ttk.Scrollbar(frame, orient="horizontal", command=self.xview)
+        y_scroll = ttk.Scrollbar(frame, orient="vertical", command=self.yview)
+        self.canvas.configure(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        y_scroll.grid(row=0, column=1, sticky="ns")
+        x_scroll.grid(row=1, column=0, sticky="ew")
+        frame.rowconfigure(0, weight=1)
+        frame.columnconfigure(0, weight=1)
+
+        canvas = self.canvas
+        canvas.bind("<Configure>", lambda event: self.schedule_redraw())
+        canvas.bind("<ButtonPress-1>", lambda event: canvas.scan_mark(event.x, event.y))
+        canvas.bind("<B1-Motion>", self.drag)
+        canvas.bind("<MouseWheel>", lambda event: self.yview("scroll", -event.delta // 120, "units"))
+        canvas.bind("<Shift-MouseWheel>", lambda event: self.xview("scroll", -event.delta // 120, "units"))
+        canvas.bind("<Control-MouseWheel>", lambda event: self.zoom(1.25 if event.delta > 0 else 0.8, event.x, event.y))
+        canvas.bind("<Button-4>", lambda event: self.yview("scroll", -1, "units"))
+        canvas.bind("<Button-5>", lambda event: self.yview("scroll", 1, "units"))
+        canvas.bind("<Control-Button-4>", lambda event: self.zoom(1.25, event.x, event.y))
+        canvas.bind("<Control-Button-5>", lambda event: self.zoom(0.8, event.x, event.y))
+
+        self.update_scrollregion()
+        # Se empieza con la raíz centrada arriba
+        canvas.update_idletasks()
+        root_x = self.MARGIN + self.layout.x[0] * self.X_SPACING
+        self.center_on(root_x, 0)
+
+    def update_scrollregion(self):
+        width = self.layout.width * self.X_SPACING * self.scale + 2 * self.MARGIN
+        height = self.layout.height * self.Y_SPACING * self.scale + 2 * self.MARGIN
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+        self.size = (width, height)
+
+    def center_on(self, x, y):
+        # Deja el punto (x, y) del lienzo en el centro horizontal y arriba
+        width, height = self.size
+        view_width = self.canvas.winfo_width()
+        self.canvas.xview_moveto(max(0.0, (x - view_width / 2) / width))
+        self.canvas.yview_moveto(max(0.0, y / height))
+        self.schedule_redraw()
+
+    def xview(self, *args):
+        self.canvas.xview(*args)
+        self.schedule_redraw()
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.schedule_redraw()
+
+    def drag(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.schedule_redraw()
+
+    def zoom(self, factor, x=None, y=None):
+        # Mantiene fijo el punto bajo el cursor (o el centro de la vista)
+        canvas = self.canvas
+        if x is None:
+            x, y = canvas.winfo_width() / 2, canvas.winfo_height() / 2
+        scale = min(self.MAX_SCALE, max(self.MIN_SCALE, self.scale * factor))
+        if scale == self.scale:
+            return
+        world_x = (canvas.canvasx(x) - self.MARGIN) / self.scale
+        world_y = (canvas.canvasy(y) - self.MARGIN) / self.scale
+        self.scale = scale
+        self.update_scrollregion()
+        width, height = self.size
+        canvas.xview_moveto(max(0.0, (self.MARGIN + world_x * scale - x) / width))
+        canvas.yview_moveto(max(0.0, (self.MARGIN + world_y * scale - y) / height))
+        self.schedule_redraw()
+
+    def fit(self):
+        canvas = self.canvas
+        width = self.layout.width * self.X_SPACING + 2 * self.MARGIN
+        height = self.layout.height * self.Y_SPACING + 2 * self.MARGIN
+        factor = min(canvas.winfo_width() / width, canvas.winfo_height() / height, 1.0) / self.scale
+        self.zoom(factor)
+        canvas.xview_moveto(0)
+        canvas.yview_moveto(0)
+
+    def schedule_redraw(self):
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.canvas.after_idle(self.redraw)
+
+    def redraw(self):
+        self.redraw_pending = False
+        canvas = self.canvas
+        canvas.delete("all")
+        tree_layout = self.layout
+        if not len(tree_layout):
+            return
+        scale = self.scale
+        x_step = self.X_SPACING * scale
+        y_step = self.Y_SPACING * scale
+        radius = max(1.0, self.RADIUS * scale)
+        margin = self.MARGIN
+
+        # Zona visible en unidades del árbol
+        left = (canvas.canvasx(0) - margin - radius) / x_step if x_step else 0
+        right = (canvas.canvasx(canvas.winfo_width()) - margin + radius) / x_step if x_step else 0
+        first_level = max(0, math.floor((canvas.canvasy(0) - margin - radius) / y_step))
+        last_level = min(tree_layout.height,
+                         math.ceil((canvas.canvasy(canvas.winfo_height()) - margin + radius) / y_step))
+        if first_level > last_level:
+            return
+
+        node_ranges = [(level, *tree_layout.visible(level, left, right))
+                       for level in range(first_level, last_level + 1)]
+        edge_ranges = [(level, *tree_layout.visible_edges(level, left, right))
+                       for level in range(max(1, first_level), min(tree_layout.height, last_level + 1) + 1)]
+        total = sum(stop - start for _, start, stop in node_ranges + edge_ranges)
+        stride = max(1, math.ceil(total / self.MAX_ITEMS))
+
+        xs = tree_layout.x
+        parent = tree_layout.parent
+        for level, start, stop in edge_ranges:
+            nodes = tree_layout.levels[level]
+            y = margin + level * y_step
+            for position in range(start, stop, stride):
+                node = nodes[position]
+                canvas.create_line(margin + xs[parent[node]] * x_step, y - y_step + radius,
+                                   margin + xs[node] * x_step, y - radius)
+
+        labels = tree_layout.labels
+        font = ("Arial", max(6, round(10 * scale)), "bold")
+        show_labels = scale >= 0.5
+        for level, start, stop in node_ranges:
+            nodes = tree_layout.levels[level]
+            y = margin + level * y_step
+            for position in range(start, stop, stride):
+                node = nodes[position]
+                x = margin + xs[node] * x_step
+                canvas.create_oval(x - radius, y - radius, x + radius, y + radius, fill="lightblue")
+                if show_labels:
+                    label = labels[node]
+                    canvas.create_text(x, y, text=label if len(label) <= 12 else label[:11] + "…", font=font)
+
+
+class CodeAnalyzerApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Analizador Léxico")
+        self.root.geometry("1100x750")
+        self.root.configure(bg="#000000")  # Fondo negro
+        
+        # Configuración de estilos
+        self.style = ttk.Style()
+        self.style.configure("TFrame", background="#000000")  # Fondo negro
+        self.style.configure("TButton", font=("Consolas", 10), background="#2E86C1", foreground="#000000")
+        self.style.configure("TRadiobutton", font=("Consolas", 10), background="#000000", foreground="#FFFFFF")
+        self.style.configure("TLabel", font=("Consolas", 11), background="#000000", foreground="#FFFFFF")
+        self.style.configure("Header.TLabel", font=("Consolas", 16, "bold"), background="#000000", foreground="#FFFFFF")
+        
+        # Variables
+        self.analysis_type_var = tk.StringVar(value="Léxico")
+        self.current_tokens = []
+        self.current_token_counts = {}
+        
+        # Análisis en segundo plano: el hilo de trabajo publica mensajes en
+        # la cola y el bucle de Tk los recoge con root.after
+        self.analysis_queue = queue.Queue()
+        self.analysis_generation = 0
+        self.analysis_cancel = None
+        self.analysis_polling = False
+        
+        # Re-análisis incremental mientras se edita
+        self.live_var = tk.BooleanVar(value=True)
+        self.relex_pending = False
+        self.highlight_generation = 0
+        
+        # Medición por etapa del último análisis (pestaña Rendimiento)
+        self.profile_memory_var = tk.BooleanVar(value=False)
+        self.cprofile_var = tk.BooleanVar(value=False)
+        self.last_profiler = None
+        
+        self.create_widgets()
+        
+    def create_widgets(self):
+        # Header
+        header_frame = ttk.Frame(self.root, style="TFrame")
+        header_frame.pack(fill="x", pady=(10, 5))
+        
+        ttk.Label(header_frame, text="Analizador Léxico.", style="Header.TLabel").pack(anchor="center", pady=10)
+        
+        # Main content frame
+        main_frame = ttk.Frame(self.root, style="TFrame")
+        main_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        # Left panel (input)
+        left_frame = ttk.Frame(main_frame, style="TFrame")
+        left_frame.pack(side="left", fill="both", expand=True, padx=(0, 10))
+        
+        # Analysis type selection
+        ttk.Label(left_frame, text="Tipo de Análisis:", style="TLabel").pack(anchor="w", pady=(0, 5))
+        
+        # Buttons frame
+        button_frame = ttk.Frame(left_frame, style="TFrame")
+        button_frame.pack(fill="x", pady=5)
+        
+        self.lexico_button = ttk.Button(button_frame, text="Análisis Léxico", 
+                                        command=lambda: self.run_analysis("Léxico"))
+        self.lexico_button.pack(side="left", padx=(0, 5))
+        
+        self.sintactico_button = ttk.Button(button_frame, text="Análisis Sintáctico", 
+                                           command=lambda: self.run_analysis("Sintáctico"))
+        self.sintactico_button.pack(side="left", padx=5)
+        
+        self.semantico_button = ttk.Button(button_frame, text="Análisis Semántico", 
+                                          command=lambda: self.run_analysis("Semántico"))
+        self.semantico_button.pack(side="left", padx=5)
+        
+        self.cancel_button = ttk.Button(button_frame, text="Cancelar", state="disabled",
+                                        command=self.cancel_analysis)
+        self.cancel_button.pack(side="left", padx=5)
+        
+        # Botones adicionales para el árbol y la notación polaca
+        ttk.Button(button_frame, text="Árbol Sintáctico", command=self.show_syntax_tree_window).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Notación Polaca", command=self.show_polish_notation_window).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Notación Polaca Inversa", command=self.show_reverse_polish_notation_window).pack(side="left", padx=5)
+        
+        # Code input
+        code_header = ttk.Frame(left_frame, style="TFrame")
+        code_header.pack(fill="x", pady=(10, 5))
+        ttk.Label(code_header, text="Código a Analizar:", style="TLabel").pack(side="left")
+        ttk.Checkbutton(code_header, text="Análisis en vivo", variable=self.live_var).pack(side="right")
+        
+        self.code_input = scrolledtext.ScrolledText(left_frame, wrap=tk.WORD, 
+                                                  font=("Consolas", 11),
+                                                  width=40, height=20,
+                                                  bg="#666666", fg="#FFFFFF")  # Fondo negro, texto blanco
+        self.code_input.pack(fill="both", expand=True, pady=5)
+        for token_type, color in HIGHLIGHT_COLORS.items():
+            self.code_input.tag_configure(token_type, foreground=color)
+        self.code_input.bind("<<Modified>>", self.on_code_modified)
+        
+        # Clear button
+        bottom_frame = ttk.Frame(left_frame, style="TFrame")
+        bottom_frame.pack(pady=10)
+        ttk.Button(bottom_frame, text="Limpiar Código", command=self.clear_code).pack(side="left", padx=(0, 5))
+        ttk.Button(bottom_frame, text="Guardar tokens", command=self.save_token_file).pack(side="left", padx=5)
+        ttk.Button(bottom_frame, text="Cargar tokens", command=self.load_token_file).pack(side="left", padx=5)
+        
+        # Right panel (results)
+        right_frame = ttk.Frame(main_frame, style="TFrame")
+        right_frame.pack(side="right", fill="both", expand=True, padx=(10, 0))
+        
+        ttk.Label(right_frame, text="Resultados:", style="TLabel").pack(anchor="w", pady=(0, 5))
+        
+        # Notebook para los resultados
+        self.result_notebook = ttk.Notebook(right_frame)
+        self.result_notebook.pack(fill="both", expand=True)
+        
+        # Pestañas para diferentes resultados
+        self.token_frame = ttk.Frame(self.result_notebook)
+        self.counts_frame = ttk.Frame(self.result_notebook)
+        self.errors_frame = ttk.Frame(self.result_notebook)
+        self.performance_frame = ttk.Frame(self.result_notebook)
+        
+        self.result_notebook.add(self.token_frame, text="Tokens")
+        self.result_notebook.add(self.counts_frame, text="Conteo")
+        self.result_notebook.add(self.errors_frame, text="Errores")
+        self.result_notebook.add(self.performance_frame, text="Rendimiento")
+        
+        # Configurar los widgets de resultados
+        # 1. Tabla de tokens
+        self.token_table = VirtualTokenTable(self.token_frame)
+        self.token_tree = self.token_table.tree
+        
+        # 2. Tabla de conteo
+        self.count_tree = ttk.Treeview(self.counts_frame, columns=("tipo", "cantidad"), show="headings")
+        self.count_tree.heading("tipo", text="Tipo de Token")
+        self.count_tree.heading("cantidad", text="Cantidad")
+        self.count_tree.column("tipo", width=150)
+        self.count_tree.column("cantidad", width=100)
+        
+        count_scroll = ttk.Scrollbar(self.counts_frame, orient="vertical", command=self.count_tree.yview)
+        self.count_tree.configure(yscrollcommand=count_scroll.set)
+        
+        self.count_tree.pack(side="left", fill="both", expand=True)
+        count_scroll.pack(side="right", fill="y")
+        
+        # 3. Texto para errores
+        self.error_text = scrolledtext.ScrolledText(self.errors_frame, wrap=tk.WORD, 
+                                                  font=("Consolas", 11),
+                                                  bg="#666666", fg="#FFFFFF")  # Fondo negro, texto blanco
+        self.error_text.pack(fill="both", expand=True)
+        
+        # 4. Tiempos por etapa del último análisis
+        performance_toolbar = ttk.Frame(self.performance_frame)
+        performance_toolbar.pack(side="top", fill="x", pady=(0, 5))
+        ttk.Checkbutton(performance_toolbar, text="Medir memoria",
+                        variable=self.profile_memory_var).pack(side="left")
+        ttk.Checkbutton(performance_toolbar, text="cProfile",
+                        variable=self.cprofile_var).pack(side="left", padx=5)
+        self.save_profile_button = ttk.Button(performance_toolbar, text="Guardar perfil", state="disabled",
+                                              command=self.save_profile)
+        self.save_profile_button.pack(side="right")
+        
+        self.performance_tree = ttk.Treeview(self.performance_frame,
+                                             columns=("etapa", "segundos", "tokens", "velocidad", "memoria"),
+                                             show="headings")
+        for column, text, width in (("etapa", "Etapa", 110), ("segundos", "Segundos", 90),
+                                    ("tokens", "Tokens", 80), ("velocidad", "Tokens/s", 90),
+                                    ("memoria", "Memoria máx.", 100)):
+            self.performance_tree.heading(column, text=text)
+            self.performance_tree.column(column, width=width, anchor="w" if column == "etapa" else "e")
+        self.performance_tree.pack(fill="both", expand=True)
+        
+        # Status bar
+        self.status_var = tk.StringVar(value="Listo")
+        self.status_bar = ttk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN, anchor="w")
+        self.status_bar.pack(side="bottom", fill="x")
+        
+        # Progreso del analizador léxico sobre el texto de entrada
+        self.progress = ttk.Progressbar(self.root, mode="determinate")
+        self.progress.pack(side="bottom", fill="x")
+    
+    def clear_code(self):
+        self.code_input.delete("1.0", tk.END)
+        self.clear_results()
+        self.status_var.set("Listo")
+    
+    def clear_results(self):
+        # Limpiar tabla de tokens
+        self.token_table.clear()
+            
+        # Limpiar tabla de conteo
+        self.count_tree.delete(*self.count_tree.get_children())
+            
+        # Limpiar texto de errores
+        self.error_text.config(state="normal")
+        self.error_text.delete("1.0", tk.END)
+        self.error_text.config(state="disabled")
+    
+    def show_syntax_tree_window(self):
+        # Crear una nueva ventana para mostrar el árbol sintáctico
+        tree_window = tk.Toplevel(self.root)
+        tree_window.title("Árbol Sintáctico")
+        tree_window.geometry("800x600")
+
+        # Generar el árbol sintáctico dinámicamente
+        syntax_tree = parse_expression_to_tree(self.current_tokens)
+        if syntax_tree:
+            SyntaxTreeCanvas(tree_window, syntax_tree)
+        else:
+            canvas = tk.Canvas(tree_window, bg="white", width=800, height=600)
+            canvas.pack(fill="both", expand=True)
+            canvas.create_text(400, 300, text="No se pudo generar el árbol sintáctico.", font=("Arial", 14, "bold"))
+
+    def show_polish_notation_window(self):
+        # Crear una nueva ventana para mostrar la notación polaca
+        polish_window = tk.Toplevel(self.root)
+        polish_window.title("Notación Polaca")
+        polish_window.geometry("600x400")
+
+        polish_notation = generate_polish_notation(self.current_tokens)
+
+        polish_text = scrolledtext.ScrolledText(polish_window, wrap=tk.WORD, font=("Consolas", 11), bg="#FFFFFF")
+        polish_text.pack(fill="both", expand=True, padx=10, pady=10)
+        polish_text.insert("1.0", polish_notation)
+        polish_text.config(state="disabled")
+
+    def show_reverse_polish_notation_window(self):
+        # Crear una nueva ventana para mostrar la notación polaca inversa
+        rpn_window = tk.Toplevel(self.root)
+        rpn_window.title("Notación Polaca Inversa")
+        rpn_window.geometry("600x400")
+
+        reverse_polish_notation = generate_reverse_polish_notation(self.current_tokens)
+
+        rpn_text = scrolledtext.ScrolledText(rpn_window, wrap=tk.WORD, font=("Consolas", 11), bg="#FFFFFF")
+        rpn_text.pack(fill="both", expand=True, padx=10, pady=10)
+        rpn_text.insert("1.0", reverse_polish_notation)
+        rpn_text.config(state="disabled")
+
+    def run_analysis(self, analysis_type):
+        # Se analiza el texto sin recortar (saltando los espacios iniciales)
+        # para que los desplazamientos coincidan con el editor
+        code = self.code_input.get("1.0", "end-1c")
+        if not code.strip():
+            messagebox.showerror("Error", "Por favor, ingresa el código a analizar.")
+            return
+
+        # Un análisis nuevo reemplaza al que esté en curso
+        if self.analysis_cancel is not None:
+            self.analysis_cancel.set()
+        self.analysis_generation += 1
+        self.analysis_cancel = threading.Event()
+
+        self.status_var.set(f"Realizando análisis {analysis_type.lower()}...")
+        self.clear_results()
+        self.progress.configure(maximum=len(code), value=0)
+        self.cancel_button.configure(state="normal")
+
+        # Las etapas del hilo de análisis se muestran a medida que terminan
+        generation = self.analysis_generation
+        profiler = Profiler(memory=self.profile_memory_var.get(), profile=self.cprofile_var.get())
+        profiler.subscribe(lambda record: self.analysis_queue.put((generation, "stage", record)))
+        self.last_profiler = profiler
+        self.performance_tree.delete(*self.performance_tree.get_children())
+        self.save_profile_button.configure(state="disabled")
+
+        worker = threading.Thread(target=self.analysis_worker, daemon=True,
+                                  args=(generation, self.analysis_cancel, code, analysis_type, profiler))
+        worker.start()
+
+        if not self.analysis_polling:
+            self.analysis_polling = True
+            self.root.after(50, self.poll_analysis)
+
+    def cancel_analysis(self):
+        if self.analysis_cancel is not None:
+            self.analysis_cancel.set()
+
+    def analysis_worker(self, generation, cancel, code, analysis_type, profiler):
+        # Corre fuera del bucle de Tk: no toca widgets, solo publica en la cola
+        def progress(position):
+            if cancel.is_set():
+                raise AnalysisCancelled()
+            self.analysis_queue.put((generation, "progress", position))
+
+        try:
+            tokens, counts, result = analyze_code(code, analysis_type, progress, profiler)
+            if cancel.is_set():
+                raise AnalysisCancelled()
+        except AnalysisCancelled:
+            self.analysis_queue.put((generation, "cancelled", analysis_type))
+        except Exception as error:
+            self.analysis_queue.put((generation, "error", error))
+        else:
+            self.analysis_queue.put((generation, "done", (analysis_type, tokens, counts, result)))
+
+    def poll_analysis(self):
+        finished = False
+        try:
+            while True:
+                generation, kind, payload = self.analysis_queue.get_nowait()
+                # Los mensajes de análisis reemplazados se descartan
+                if generation != self.analysis_generation:
+                    continue
+                if kind == "progress":
+                    self.progress.configure(value=payload)
+                    continue
+                if kind == "stage":
+                    self.add_stage_row(payload)
+                    continue
+                finished = True
+                self.finish_analysis(kind, payload)
+        except queue.Empty:
+            pass
+
+        if finished:
+            self.analysis_cancel = None
+            self.cancel_button.configure(state="disabled")
+        if self.analysis_cancel is not None:
+            self.root.after(50, self.poll_analysis)
+        else:
+            self.analysis_polling = False
+
+    def finish_analysis(self, kind, payload):
+        if kind == "cancelled":
+            self.progress.configure(value=0)
+            self.status_var.set(f"Análisis {payload.lower()} cancelado")
+            return
+        if kind == "error":
+            self.progress.configure(value=0)
+            self.status_var.set("Error durante el análisis")
+            messagebox.showerror("Error", str(payload))
+            return
+
+        analysis_type, self.current_tokens, self.current_token_counts, result = payload
+        self.progress.configure(value=self.progress.cget("maximum"))
+
+        # Las etapas que siguen corren en el hilo de Tk: se muestran al final
+        profiler = self.last_profiler
+        profiler.observers.clear()
+
+        # Mostrar resultados según el tipo de análisis
+        with profiler.stage("tabla") as record:
+            self.show_lexical_results()
+            record.tokens = len(self.current_tokens)
+        if analysis_type == "Léxico":
+            self.result_notebook.select(0)  # Mostrar pestaña de tokens
+        elif analysis_type == "Sintáctico":
+            with profiler.stage("errores"):
+                self.show_syntax_results(result)
+            self.result_notebook.select(2)  # Mostrar pestaña de errores
+        elif analysis_type == "Semántico":
+            syntax_result, semantic_result = result
+            with profiler.stage("errores"):
+                self.show_semantic_results(semantic_result, syntax_result)
+            self.result_notebook.select(2)  # Mostrar pestaña de errores
+
+        # Si se editó durante el análisis, el buffer se pone al día antes de resaltar
+        with profiler.stage("resaltado") as record:
+            self.relex_code()
+            self.highlight_all()
+            record.tokens = len(self.current_tokens)
+        self.show_profile(profiler)
+        self.status_var.set(f"Análisis {analysis_type.lower()} completado en {profiler.total():.3f} s")
+
+    def add_stage_row(self, record):
+        rate = f"{record.tokens / record.seconds:.0f}" if record.tokens and record.seconds else ""
+        memory = format_bytes(record.peak) if record.peak is not None else ""
+        tokens = record.tokens if record.tokens is not None else ""
+        self.performance_tree.insert("", "end", values=(record.name, f"{record.seconds:.6f}", tokens, rate, memory))
+
+    def show_profile(self, profiler):
+        # Desglose completo del análisis, incluidas las etapas del hilo de Tk
+        self.performance_tree.delete(*self.performance_tree.get_children())
+        for record in profiler.summary():
+            self.add_stage_row(record)
+        self.performance_tree.insert("", "end", values=("Total", f"{profiler.total():.6f}", "", "", ""))
+        if profiler.profile is not None:
+            self.save_profile_button.configure(state="normal")
+
+    def save_profile(self):
+        path = filedialog.asksaveasfilename(title="Guardar perfil", defaultextension=".prof",
+                                            filetypes=[("Estadísticas de cProfile", "*.prof")])
+        if path:
+            self.last_profiler.dump_stats(path)
+            self.status_var.set(f"Perfil guardado en {path}")
+
+    def save_token_file(self):
+        # Los tokens del último análisis, con el código incluido
+        tokens = self.current_tokens
+        if not isinstance(tokens, (TokenBuffer, TokenStream)) or not len(tokens):
+            messagebox.showerror("Error", "Primero realiza un análisis del código.")
+            return
+        path = filedialog.asksaveasfilename(title="Guardar tokens", defaultextension=".tok",
+                                            filetypes=[("Tokens", "*.tok")])
+        if path:
+            save_tokens(tokens, path)
+            self.status_var.set(f"{len(tokens)} tokens guardados en {path}")
+
+    def load_token_file(self):
+        path = filedialog.askopenfilename(title="Cargar tokens", filetypes=[("Tokens", "*.tok"), ("Todos", "*")])
+        if not path:
+            return
+        try:
+            with load_tokens(path) as stream:
+                tokens = stream.to_buffer()
+            code = tokens.source[:].decode("utf-8")
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Error", f"No se pudieron cargar los tokens: {error}")
+            return
+
+        # El buffer ya corresponde al código que vuelve al editor, así que el
+        # análisis en vivo no tiene nada que repetir
+        self.current_tokens = tokens
+        self.current_token_counts = tokens.counts()
+        self.code_input.delete("1.0", tk.END)
+        self.code_input.insert("1.0", code)
+        self.clear_results()
+        self.show_lexical_results()
+        self.highlight_all()
+        self.result_notebook.select(0)
+        self.status_var.set(f"{len(tokens)} tokens cargados de {path}")
+
+    def on_code_modified(self, event=None):
+        if not self.code_input.edit_modified():
+            return
+        self.code_input.edit_modified(False)
+        if self.live_var.get() and not self.relex_pending:
+            self.relex_pending = True
+            self.root.after_idle(self.relex_code)
+
+    def relex_code(self):
+        # Vuelve a analizar solo la región editada y la empalma en el buffer
+        self.relex_pending = False
+        code = self.code_input.get("1.0", "end-1c")
+        tokens = self.current_tokens
+        if not isinstance(tokens, TokenBuffer):
+            tokens = TokenBuffer.from_source(code, compat=True, strip=True)
+            self.current_tokens = tokens
+            self.current_token_counts = tokens.counts()
+            self.show_lexical_results()
+            self.highlight_all()
+            return
+
+        first, removed, added = relex(tokens, code, strip=True)
+        if not removed and not added:
+            return
+
+        counts = self.current_token_counts
+        counts.subtract(TOKEN_TYPES[code] for code in removed)
+        counts.update(TOKEN_TYPES[code] for code in tokens.kinds[first:first + added])
+        self.current_token_counts = Counter({kind: count for kind, count in counts.items() if count > 0})
+
+        self.token_table.set_tokens(tokens, keep_position=True)
+        self.count_tree.delete(*self.count_tree.get_children())
+        for token_type, count in self.current_token_counts.items():
+            self.count_tree.insert("", "end", values=(token_type, count))
+
+        # Se quitan los colores entre los tokens conservados y se vuelven a poner
+        region_start = self.text_range(tokens, first - 1)[1] if first else "1.0"
+        region_end = self.text_range(tokens, first + added)[0] if first + added < len(tokens) else "end"
+        for token_type in HIGHLIGHT_COLORS:
+            self.code_input.tag_remove(token_type, region_start, region_end)
+        self.highlight_tokens(tokens, first, first + added)
+
+    def text_range(self, tokens, index):
+        # Índices "línea.columna" de Tk para el token
+        line, column = tokens.position(index)
+        lexeme = tokens.lexeme(index)
+        newlines = lexeme.count("\n")
+        if not newlines:
+            return f"{line}.{column - 1}", f"{line}.{column - 1 + len(lexeme)}"
+        last_column = len(lexeme) - lexeme.rfind("\n") - 1
+        return f"{line}.{column - 1}", f"{line + newlines}.{last_column}"
+
+    def highlight_tokens(self, tokens, first, stop):
+        for index in range(first, stop):
+            start, end = self.text_range(tokens, index)
+            self.code_input.tag_add(tokens.kind(index), start, end)
+
+    def highlight_all(self, first=0, generation=None, step=2000):
+        # El resaltado completo se hace por tramos para no bloquear la ventana
+        if generation is None:
+            self.highlight_generation += 1
+            generation = self.highlight_generation
+            for token_type in HIGHLIGHT_COLORS:
+                self.code_input.tag_remove(token_type, "1.0", "end")
+        if generation != self.highlight_generation or not isinstance(self.current_tokens, TokenBuffer):
+            return
+        stop = min(first + step, len(self.current_tokens))
+        self.highlight_tokens(self.current_tokens, first, stop)
+        if stop < len(self.current_tokens):
+            self.root.after(1, self.highlight_all, stop, generation, step)
+    
+    def show_lexical_results(self):
+        # Mostrar tokens (solo se crean las filas visibles)
+        self.token_table.set_tokens(self.current_tokens)
+        
+        # Mostrar conteo
+        for token_type, count in self.current_token_counts.items():
+            self.count_tree.insert("", "end", values=(token_type, count))
+    
+    def show_syntax_results(self, syntax_result=None):
+        # Analizar sintaxis (si el hilo de análisis no lo hizo ya) y mostrar errores
+        if syntax_result is None:
+            syntax_result = syntax_analyzer(self.current_tokens)
+        
+        self.error_text.config(state="normal")
+        self.error_text.delete("1.0", tk.END)
+        self.error_text.insert("1.0", "ANÁLISIS SINTÁCTICO\n\n" + syntax_result)
+        self.error_text.config(state="disabled")
+    
+    def show_semantic_results(self, semantic_result=None, syntax_result=None):
+        # Analizar semántica (si el hilo de análisis no lo hizo ya) y mostrar
+        # errores, precedidos de los sintácticos si se tienen
+        if semantic_result is None:
+            semantic_result = semantic_analyzer(self.current_tokens)
+        text = "ANÁLISIS SEMÁNTICO\n\n" + semantic_result
+        if syntax_result is not None:
+            text = "ANÁLISIS SINTÁCTICO\n\n" + syntax_result + "\n\n" + text
+
+        self.error_text.config(state="normal")
+        self.error_text.delete("1.0", tk.END)
+        self.error_text.insert("1.0", text)
+        self.error_text.config(state="disabled")
+
+
+# Colores del resaltado de sintaxis en el editor
+HIGHLIGHT_COLORS = {
+    "PALABRA CLAVE": "#5DADE2",
+    "IDENTIFICADOR": "#FFFFFF",
+    "NUMERO": "#F5B041",
+    "OPERADOR": "#F1948A",
+    "DELIMITADOR": "#D5D8DC",
+    "STRING": "#82E0AA",
+    "COMENTARIO": "#ABB2B9",
+    "ERROR": "#FF0000",
+}
+
+
+def main():
+    # Iniciar la aplicación
+    tk_root = tk.Tk()
+    CodeAnalyzerApp(tk_root)
+    tk_root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
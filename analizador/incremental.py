@@ -0,0 +1,165 @@
+import sys
+from array import array
+from bisect import bisect_left
+
+from .buffer import KIND_CODES
+from .lexer import _WHITESPACE, _pattern
+
+_BLOCK = 4096
+_ERROR = KIND_CODES["ERROR"]
+
+
+def _common_prefix(a, b):
+    # Se compara por bloques (memcmp) y solo el último bloque byte a byte
+    limit = min(len(a), len(b))
+    pos = 0
+    while pos < limit:
+        stop = min(pos + _BLOCK, limit)
+        if a[pos:stop] != b[pos:stop]:
+            break
+        pos = stop
+    else:
+        return limit
+    while a[pos] == b[pos]:
+        pos += 1
+    return pos
+
+
+def _common_suffix(a, b, limit):
+    size_a, size_b = len(a), len(b)
+    count = 0
+    while count < limit:
+        step = min(_BLOCK, limit - count)
+        if a[size_a - count - step:size_a - count] != b[size_b - count - step:size_b - count]:
+            break
+        count += step
+    else:
+        return limit
+    while a[size_a - count - 1] == b[size_b - count - 1]:
+        count += 1
+    return count
+
+
+def _shift(values, start, delta):
+    """
+    Suma 'delta' a values[start:] sin recorrer los elementos en Python.
+
+    La cola se lee como un único entero (un campo por elemento) y se le suma
+    'delta' repetido en cada campo: como ningún desplazamiento nuevo sale del
+    rango del tipo ni queda negativo, no hay acarreos entre campos y todo
+    ocurre en la aritmética de enteros de C.
+    """
+    count = len(values) - start
+    if count <= 0:
+        return
+    size = values.itemsize
+    order = sys.byteorder
+    ones = int.from_bytes((1).to_bytes(size, order) * count, order)
+    total = int.from_bytes(values[start:].tobytes(), order) + delta * ones
+    tail = array(values.typecode)
+    tail.frombytes(total.to_bytes(count * size, order))
+    values[start:] = tail
+
+
+def _restart_point(tokens, source, damage):
+    """
+    Devuelve (token, posición): el primer token que hay que volver a
+    analizar para un cambio en 'damage' y el byte desde donde reanudar.
+
+    Los tokens de líneas anteriores no miran más allá de su propio salto de
+    línea, así que se reanuda en el inicio de la línea dañada (o en el token
+    que lo cruza). La excepción es un '/*' sin cerrar con las reglas
+    corregidas: depende de todo lo que sigue y se reanuda desde él.
+    """
+    line_start = source.rfind(b"\n", 0, damage) + 1
+    first = bisect_left(tokens.ends, line_start)
+    if not tokens.compat:
+        # Si hay varios '/*' sin cerrar, todos dependen del resto del texto:
+        # se reanuda desde el primero
+        kinds = tokens.kinds.tobytes()
+        error = kinds.find(bytes([_ERROR]), 0, first)
+        while error >= 0:
+            if source[tokens.starts[error]:tokens.starts[error] + 2] == b"/*":
+                return error, tokens.starts[error]
+            error = kinds.find(bytes([_ERROR]), error + 1, first)
+    if first < len(tokens):
+        return first, min(tokens.starts[first], line_start)
+    return first, line_start
+
+
+def relex(tokens, text, strip=False):
+    """
+    Actualiza el TokenBuffer 'tokens' al nuevo texto volviendo a analizar
+    solo la región modificada y empalmando el resultado.
+
+    Se reanuda en un límite de token anterior al cambio y se analiza hasta
+    volver a coincidir con un token antiguo después del cambio; desde ahí el
+    resto es idéntico, solo desplazado. Con 'strip' se ignoran los espacios
+    iniciales del texto, como cuando se analiza el código recortado.
+
+    Devuelve (primero, tipos_eliminados, agregados): los tokens antiguos en
+    [primero, primero + len(tipos_eliminados)) fueron reemplazados por los
+    tokens en [primero, primero + agregados).
+    """
+    old = tokens.source
+    new = text.encode("utf-8")
+    if old == new:
+        return len(tokens), array("B"), 0
+
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+    delta = len(new) - len(old)
+    damage_end = len(new) - suffix
+
+    first, restart = _restart_point(tokens, old, prefix)
+    if first == 0:
+        restart = _WHITESPACE.match(text).end() if strip or not tokens.compat else 0
+    else:
+        restart = _WHITESPACE.match(text, len(new[:restart].decode("utf-8"))).end()
+
+    ascii_text = len(text) == len(new)
+    pattern, kinds = _pattern(tokens.compat)
+    codes = {group: KIND_CODES[kind] for group, kind in kinds.items()}
+    old_starts = tokens.starts
+    new_kinds, new_starts, new_ends = array("B"), array(old_starts.typecode), array(old_starts.typecode)
+
+    # 'stop' es el primer token antiguo que se conserva
+    stop = len(tokens)
+    char_pos = byte_pos = restart
+    if not ascii_text:
+        byte_pos = len(text[:restart].encode("utf-8"))
+    for match in iter(pattern.scanner(text, restart).match, None):
+        start, end = match.span(match.lastindex)
+        if ascii_text:
+            byte_start, byte_end = start, end
+        else:
+            byte_start = byte_pos + len(text[char_pos:start].encode("utf-8"))
+            byte_end = byte_start + len(text[start:end].encode("utf-8"))
+            char_pos, byte_pos = end, byte_end
+
+        if byte_start >= damage_end:
+            old_start = byte_start - delta
+            candidate = bisect_left(old_starts, old_start, first)
+            if candidate < len(tokens) and old_starts[candidate] == old_start:
+                stop = candidate
+                break
+
+        new_kinds.append(codes[match.lastgroup])
+        new_starts.append(byte_start)
+        new_ends.append(byte_end)
+
+    removed = tokens.kinds[first:stop]
+    tokens.kinds[first:stop] = new_kinds
+    tokens.starts[first:stop] = new_starts
+    tokens.ends[first:stop] = new_ends
+    if delta:
+        if tokens.starts.typecode == "I" and len(new) >= 1 << 32:
+            tokens.starts, tokens.ends = array("Q", tokens.starts), array("Q", tokens.ends)
+        tail = first + len(new_kinds)
+        _shift(tokens.starts, tail, delta)
+        _shift(tokens.ends, tail, delta)
+
+    tokens.source = new
+    tokens.data = memoryview(new)
+    tokens._lines = None
+    return first, removed, len(new_kinds)
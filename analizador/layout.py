@@ -0,0 +1,236 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+
+class TreeLayout:
+    """
+    Posiciones de los nodos de un árbol de listas anidadas [etiqueta, hijo,
+    ...] calculadas con el algoritmo de Reingold–Tilford en la versión
+    lineal de Buchheim, Jünger y Leipert, sin recursión.
+
+    Los nodos se numeran en preorden. x e y están en unidades del mundo: una
+    unidad entre hermanos contiguos y una por nivel. Para dibujar solo lo
+    visible, 'levels[d]' tiene los nodos del nivel d ordenados por x (en
+    preorden ya lo están) y edge_low/edge_high los extremos horizontales de
+    la arista que llega a cada uno de ellos.
+    """
+
+    __slots__ = ("labels", "parent", "depth", "x", "width", "levels", "level_x", "edge_low", "edge_high")
+
+    def __init__(self, tree, distance=1.0):
+        labels, parent, depth, children = _flatten(tree)
+        self.labels = labels
+        self.parent = parent
+        self.depth = depth
+        n = len(labels)
+        x = _reingold_tilford(children, parent, distance) if n else array("d")
+
+        # Se desplaza para que el nodo más a la izquierda quede en x = 0
+        left = min(x) if n else 0.0
+        self.x = array("d", (value - left for value in x))
+        self.width = max(self.x) if n else 0.0
+
+        self.levels = levels = []
+        for node in range(n):
+            if depth[node] == len(levels):
+                levels.append(array("i"))
+            levels[depth[node]].append(node)
+        self.level_x = [array("d", (self.x[node] for node in level)) for level in levels]
+        self.edge_low = []
+        self.edge_high = []
+        for level in levels:
+            low = array("d")
+            high = array("d")
+            for node in level:
+                a = self.x[node]
+                b = self.x[parent[node]] if parent[node] >= 0 else a
+                low.append(min(a, b))
+                high.append(max(a, b))
+            self.edge_low.append(low)
+            self.edge_high.append(high)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def height(self):
+        return max(len(self.levels) - 1, 0)
+
+    def visible(self, level, left, right):
+        """
+        Rango [i, j) de posiciones en levels[level] de los nodos con x en
+        [left, right].
+        """
+        xs = self.level_x[level]
+        return bisect_left(xs, left), bisect_right(xs, right)
+
+    def visible_edges(self, level, left, right):
+        """
+        Rango [i, j) de posiciones en levels[level] cuyas aristas hacia el
+        padre cruzan [left, right]. Los extremos de las aristas de un nivel
+        crecen con x, así que el rango es contiguo.
+        """
+        return bisect_left(self.edge_high[level], left), bisect_right(self.edge_low[level], right)
+
+
+def _flatten(tree):
+    # Numera los nodos en preorden y devuelve etiquetas, padre, profundidad
+    # e hijos de cada uno
+    labels = []
+    parent = array("i")
+    depth = array("i")
+    children = []
+    stack = [(tree, -1, 0)]
+    while stack:
+        item, up, level = stack.pop()
+        node = len(labels)
+        labels.append(str(item[0]) if item else "")
+        parent.append(up)
+        depth.append(level)
+        children.append([])
+        if up >= 0:
+            children[up].append(node)
+        stack.extend((child, node, level + 1) for child in reversed(item[1:]))
+    return labels, parent, depth, children
+
+
+def _reingold_tilford(children, parent, distance):
+    n = len(children)
+    prelim = [0.0] * n
+    mod = [0.0] * n
+    shift = [0.0] * n
+    change = [0.0] * n
+    thread = [-1] * n
+    ancestor = list(range(n))
+    # Posición entre hermanos (desde 1) y hermano izquierdo de cada nodo
+    number = [1] * n
+    left_sibling = [-1] * n
+    for siblings in children:
+        for position, node in enumerate(siblings):
+            number[node] = position + 1
+            if position:
+                left_sibling[node] = siblings[position - 1]
+    default_ancestor = [-1] * n
+
+    def next_left(v):
+        return children[v][0] if children[v] else thread[v]
+
+    def next_right(v):
+        return children[v][-1] if children[v] else thread[v]
+
+    def move_subtree(wl, wr, amount):
+        subtrees = number[wr] - number[wl]
+        change[wr] -= amount / subtrees
+        shift[wr] += amount
+        change[wl] += amount / subtrees
+        prelim[wr] += amount
+        mod[wr] += amount
+
+    def apportion(v, default):
+        w = left_sibling[v]
+        if w < 0:
+            return default
+        vir = vor = v
+        vil = w
+        vol = children[parent[v]][0]
+        sir = sor = mod[vir]
+        sil = mod[vil]
+        sol = mod[vol]
+        while True:
+            right = next_right(vil)
+            left = next_left(vir)
+            if right < 0 or left < 0:
+                break
+            vil, vir = right, left
+            vol = next_left(vol)
+            vor = next_right(vor)
+            ancestor[vor] = v
+            amount = (prelim[vil] + sil) - (prelim[vir] + sir) + distance
+            if amount > 0:
+                a = ancestor[vil]
+                move_subtree(a if parent[a] == parent[v] else default, v, amount)
+                sir += amount
+                sor += amount
+            sil += mod[vil]
+            sir += mod[vir]
+            sol += mod[vol]
+            sor += mod[vor]
+        if next_right(vil) >= 0 and next_right(vor) < 0:
+            thread[vor] = next_right(vil)
+            mod[vor] += sil - sor
+        if next_left(vir) >= 0 and next_left(vol) < 0:
+            thread[vol] = next_left(vir)
+            mod[vol] += sir - sol
+            default = v
+        return default
+
+    # Primera pasada en postorden: el preorden invertido visita a cada nodo
+    # después de sus hijos, pero los hermanos de derecha a izquierda, y
+    # apportion los necesita de izquierda a derecha; por eso se usa una pila
+    stack = [(0, False)] if n else []
+    while stack:
+        v, done = stack.pop()
+        if not done:
+            stack.append((v, True))
+            stack.extend((child, False) for child in reversed(children[v]))
+            continue
+        kids = children[v]
+        w = left_sibling[v]
+        if kids:
+            total_shift = total_change = 0.0
+            for child in reversed(kids):
+                prelim[child] += total_shift
+                mod[child] += total_shift
+                total_change += change[child]
+                total_shift += shift[child] + total_change
+            midpoint = (prelim[kids[0]] + prelim[kids[-1]]) / 2
+            if w >= 0:
+                prelim[v] = prelim[w] + distance
+                mod[v] = prelim[v] - midpoint
+            else:
+                prelim[v] = midpoint
+        elif w >= 0:
+            prelim[v] = prelim[w] + distance
+        up = parent[v]
+        if up >= 0:
+            if w < 0:
+                default_ancestor[up] = v
+            default_ancestor[up] = apportion(v, default_ancestor[up])
+
+    # Segunda pasada en preorden: suma los modificadores de los ancestros
+    x = array("d", bytes(8 * n))
+    stack = [(0, 0.0)] if n else []
+    while stack:
+        v, offset = stack.pop()
+        x[v] = prelim[v] + offset
+        offset += mod[v]
+        stack.extend((child, offset) for child in children[v])
+    return x
+
+
+# Disposiciones recientes por árbol: id -> (árbol, TreeLayout)
+_CACHE_SIZE = 4
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def layout(tree):
+    """
+    TreeLayout de 'tree', guardado para los últimos árboles dispuestos: el
+    árbol de analizador.notation se reutiliza mientras no cambien los
+    tokens, así que volver a abrir la ventana no recalcula nada.
+    """
+    key = id(tree)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] is tree:
+            _cache.move_to_end(key)
+            return entry[1]
+    result = TreeLayout(tree)
+    with _lock:
+        _cache[key] = (tree, result)
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
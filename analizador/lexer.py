@@ -0,0 +1,130 @@
+import re
+from collections import Counter
+
+KEYWORDS = ("if", "else", "while", "for", "return", "int", "float", "def", "char", "void")
+
+# Orden fijo de los tipos de token; el índice es el código numérico del tipo
+TOKEN_TYPES = (
+    "PALABRA CLAVE",
+    "IDENTIFICADOR",
+    "NUMERO",
+    "OPERADOR",
+    "DELIMITADOR",
+    "STRING",
+    "COMENTARIO",
+    "ERROR",
+)
+
+# Reglas del analizador original, en el mismo orden en que se probaban.
+# El '\b' inicial se omite: al recortar la línea en cada paso siempre se
+# cumplía, y con desplazamientos sobre el texto original ya no sería así.
+LEGACY_RULES = (
+    ("PALABRA CLAVE", r"(?:%s)\b" % "|".join(KEYWORDS)),
+    ("IDENTIFICADOR", r"[a-zA-Z_][a-zA-Z0-9_]*\b"),
+    ("NUMERO", r"\d+(?:\.\d+)?\b"),
+    ("OPERADOR", r"[+\-*/=<>!]+"),
+    ("DELIMITADOR", r"[;,.(){}\[\]]"),
+    ("STRING", r'".*?"'),
+    ("COMENTARIO", r"\/\/.|\/\[\s\S]?\\/"),
+)
+
+# Reglas corregidas: los comentarios se reconocen antes que los operadores,
+# los strings admiten secuencias de escape y un operador no se come el
+# inicio de un comentario.
+RULES = (
+    ("COMENTARIO", r"//[^\n]*"),
+    ("COMENTARIO", r"/\*[\s\S]*?\*/"),
+    ("STRING", r'"(?:[^"\\\n]|\\.)*"'),
+    ("PALABRA CLAVE", r"(?:%s)\b" % "|".join(KEYWORDS)),
+    ("IDENTIFICADOR", r"[a-zA-Z_][a-zA-Z0-9_]*\b"),
+    ("NUMERO", r"\d+(?:\.\d+)?\b"),
+    ("OPERADOR", r"(?:[+\-*=<>!]|/(?![/*]))+"),
+    ("DELIMITADOR", r"[;,.(){}\[\]]"),
+)
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def _master_source(rules):
+    # Una sola alternancia con un grupo por regla; el último grupo captura
+    # cualquier carácter no reconocido como ERROR. Los espacios que siguen
+    # al token se consumen en la misma coincidencia.
+    parts = [f"(?P<_{index}>{pattern})" for index, (_, pattern) in enumerate(rules)]
+    parts.append(r"(?P<_error>[\s\S])")
+    kinds = {f"_{index}": kind for index, (kind, _) in enumerate(rules)}
+    kinds["_error"] = "ERROR"
+    return "(?:%s)\\s*" % "|".join(parts), kinds
+
+
+def _compile_rules(rules):
+    source, kinds = _master_source(rules)
+    return re.compile(source), kinds
+
+
+# Las expresiones maestras se compilan la primera vez que se usan: importar
+# el paquete no paga la compilación de las dos
+_patterns = {}
+
+
+def _pattern(compat):
+    compiled = _patterns.get(compat)
+    if compiled is None:
+        compiled = _patterns[compat] = _compile_rules(LEGACY_RULES if compat else RULES)
+    return compiled
+
+
+def scan(text, compat=False, pos=0):
+    """
+    Recorre el texto con la expresión maestra y genera (inicio, fin, tipo)
+    por cada token, sin recortar la cadena.
+
+    En modo compatible se reproduce exactamente el analizador original,
+    incluido el ERROR por el primer espacio si el texto empieza con uno.
+    """
+    pattern, kinds = _pattern(compat)
+    if not compat:
+        pos = _WHITESPACE.match(text, pos).end()
+
+    for match in iter(pattern.scanner(text, pos).match, None):
+        group = match.lastindex
+        yield match.start(group), match.end(group), kinds[match.lastgroup]
+
+
+def tokenize(text, compat=False, backend="re", jobs=1):
+    """
+    Devuelve la lista de (lexema, tipo) y el conteo por tipo, igual que
+    analizadorLexico.
+
+    'backend' elige el motor: "re" (la expresión maestra), "dfa" (el
+    autómata de analizador.dfa) o "numpy" (el recorrido vectorial de
+    analizador.vectorized, que vuelve a "re" si NumPy no está instalado).
+    Con 'jobs' distinto de 1 (None: todos los núcleos) un texto grande se
+    reparte entre procesos con analizador.parallel, siempre con "re".
+    Todos producen exactamente los mismos tokens.
+    """
+    if jobs != 1:
+        from . import parallel
+        return parallel.tokenize(text, compat, jobs)
+    if backend == "dfa":
+        from . import dfa
+        return dfa.tokenize(text, compat)
+    if backend == "numpy":
+        from . import vectorized
+        return vectorized.tokenize(text, compat)
+    if backend != "re":
+        raise ValueError(f"backend desconocido: {backend!r}")
+    pattern, kinds = _pattern(compat)
+    pos = 0 if compat else _WHITESPACE.match(text).end()
+
+    results = []
+    append = results.append
+    for match in iter(pattern.scanner(text, pos).match, None):
+        append((match.group(match.lastindex), kinds[match.lastgroup]))
+
+    return results, Counter(token_type for _, token_type in results)
+
+
+def analizadorLexico(line, backend="re", jobs=1):
+    # Misma salida que el analizador original, ahora con una sola pasada
+    # de la expresión maestra en modo compatible
+    return tokenize(line, compat=True, backend=backend, jobs=jobs)
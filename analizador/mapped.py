@@ -0,0 +1,237 @@
+import mmap
+import re
+
+from .buffer import KIND_CODES, TokenBuffer
+from .lexer import LEGACY_RULES, RULES, _master_source, _pattern
+
+# Tamaño aproximado de cada tramo que se analiza de una vez; los tramos
+# terminan siempre después de un salto de línea
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+_ERROR = KIND_CODES["ERROR"]
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+
+# Los caracteres ASCII que '\s' reconoce en un patrón str (str.isspace),
+# que incluyen \x1c-\x1f; en un patrón bytes '\s' no los incluye
+_BLANK_CLASS = r"\t-\r\x1c- "
+_NON_BLANK_CLASS = r"\x00-\x08\x0e-\x1b!-\xff"
+_ASCII_BLANKS = re.compile(("[%s]*" % _BLANK_CLASS).encode("ascii"))
+
+_bytes_patterns = {}
+
+
+def _to_bytes(source):
+    # Traduce un patrón str a uno bytes que reconoce lo mismo sobre texto
+    # ASCII: '\d', '\w' y '\b' ya coinciden, solo cambian '\s' y '\S'
+    out = []
+    in_class = False
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            escape = source[i:i + 2]
+            if escape in (r"\s", r"\S"):
+                ranges = _BLANK_CLASS if escape == r"\s" else _NON_BLANK_CLASS
+                out.append(ranges if in_class else f"[{ranges}]")
+            else:
+                out.append(escape)
+            i += 2
+            continue
+        if char == "[" and not in_class:
+            in_class = True
+            out.append(char)
+            # Un ']' justo después de la apertura (o de '^') es literal
+            if source[i + 1:i + 2] == "^":
+                out.append("^")
+                i += 1
+            if source[i + 1:i + 2] == "]":
+                out.append("]")
+                i += 1
+        elif char == "]" and in_class:
+            in_class = False
+            out.append(char)
+        else:
+            out.append(char)
+        i += 1
+    return "".join(out).encode("ascii")
+
+
+def _bytes_pattern(compat):
+    # La expresión maestra para bytes se compila la primera vez que se usa
+    pattern = _bytes_patterns.get(compat)
+    if pattern is None:
+        source, kinds = _master_source(LEGACY_RULES if compat else RULES)
+        codes = {group: KIND_CODES[kind] for group, kind in kinds.items()}
+        pattern = _bytes_patterns[compat] = re.compile(_to_bytes(source)), codes
+    return pattern
+
+
+def _text_pattern(compat):
+    pattern, kinds = _pattern(compat)
+    return pattern, {group: KIND_CODES[kind] for group, kind in kinds.items()}
+
+
+def _line_end(data, offset):
+    # Posición siguiente al primer salto de línea desde 'offset', o el final
+    newline = data.find(b"\n", offset)
+    return len(data) if newline < 0 else newline + 1
+
+
+def _char_length(lead):
+    # Largo de un carácter UTF-8 según su primer byte
+    if lead >= 0xF0:
+        return 4
+    if lead >= 0xE0:
+        return 3
+    return 2
+
+
+def _skip_blanks(data, pos):
+    """
+    Avanza sobre los espacios desde 'pos', incluidos los no ASCII (como
+    U+00A0), igual que '\\s*' sobre el texto decodificado.
+    """
+    size = len(data)
+    while True:
+        pos = _ASCII_BLANKS.match(data, pos).end()
+        if pos >= size or data[pos] < 0x80:
+            return pos
+        length = _char_length(data[pos])
+        if not data[pos:pos + length].decode("utf-8").isspace():
+            return pos
+        pos += length
+
+
+def _scan_ascii(buffer, data, pos, end, compat, watch):
+    # Tramo solo ASCII: la expresión maestra para bytes recorre el mapa
+    # directamente y sus posiciones ya son desplazamientos en el archivo
+    pattern, codes = _bytes_pattern(compat)
+    append_kind = buffer.kinds.append
+    append_start = buffer.starts.append
+    append_end = buffer.ends.append
+    for match in iter(pattern.scanner(data, pos, end).match, None):
+        start, stop = match.span(match.lastindex)
+        code = codes[match.lastgroup]
+        if watch and code == _ERROR and data[start:start + 2] == b"/*":
+            return start
+        append_kind(code)
+        append_start(start)
+        append_end(stop)
+    return -1
+
+
+def _scan_text(buffer, data, pos, end, compat, watch):
+    # Tramo con caracteres no ASCII: se decodifica solo este tramo y las
+    # posiciones en caracteres se pasan a bytes
+    text = data[pos:end].decode("utf-8")
+    pattern, codes = _text_pattern(compat)
+    append_kind = buffer.kinds.append
+    append_start = buffer.starts.append
+    append_end = buffer.ends.append
+    char_pos, byte_pos = 0, pos
+    for match in iter(pattern.scanner(text).match, None):
+        start, stop = match.span(match.lastindex)
+        byte_start = byte_pos + len(text[char_pos:start].encode("utf-8"))
+        byte_end = byte_start + len(text[start:stop].encode("utf-8"))
+        char_pos, byte_pos = stop, byte_end
+        code = codes[match.lastgroup]
+        if watch and code == _ERROR and text.startswith("/*", start):
+            return byte_start
+        append_kind(code)
+        append_start(byte_start)
+        append_end(byte_end)
+    return -1
+
+
+def _release(data, start, end):
+    # Devuelve al sistema las páginas ya analizadas: el archivo se lee una
+    # sola vez y la memoria residente no crece con su tamaño
+    start -= start % mmap.PAGESIZE
+    end -= end % mmap.PAGESIZE
+    if end > start:
+        data.madvise(mmap.MADV_DONTNEED, start, end - start)
+    return end
+
+
+def extend_mapped(buffer, data, pos=0, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Analiza 'data' (bytes UTF-8 o un mmap) desde 'pos' y agrega los tokens
+    a 'buffer', con los mismos resultados que TokenBuffer.extend_from sobre
+    el texto decodificado.
+
+    El código se recorre por tramos que terminan en un salto de línea. Los
+    tramos ASCII se analizan sobre los bytes sin copiarlos ni decodificarlos;
+    solo las líneas con caracteres no ASCII (identificadores, strings o
+    comentarios con UTF-8) se decodifican, de a una. Un '/*' que queda sin
+    cerrar en un tramo se vuelve a analizar hasta la línea de su cierre.
+    Un byte que no es UTF-8 válido lanza UnicodeDecodeError.
+    """
+    compat = buffer.compat
+    size = len(data)
+    release = isinstance(data, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED")
+    released = 0
+    forced = -1
+    while pos < size:
+        if forced >= 0:
+            end, forced = forced, -1
+            ascii_only = _NON_ASCII.search(data, pos, end) is None
+        else:
+            end = _line_end(data, pos + block_size - 1)
+            found = _NON_ASCII.search(data, pos, end)
+            ascii_only = found is None
+            if found is not None:
+                # Las líneas ASCII anteriores van por bytes; la línea con el
+                # carácter no ASCII, decodificada
+                line = data.rfind(b"\n", pos, found.start()) + 1
+                if line > pos:
+                    end, ascii_only = line, True
+                else:
+                    end = _line_end(data, found.start())
+        scan = _scan_ascii if ascii_only else _scan_text
+        opened = scan(buffer, data, pos, end, compat, not compat and end < size)
+        if opened >= 0:
+            # Comentario de bloque que sigue en otro tramo
+            close = data.find(b"*/", opened + 2)
+            pos, forced = opened, size if close < 0 else _line_end(data, close + 2)
+            continue
+        pos = _skip_blanks(data, end)
+        if release and pos - released >= block_size:
+            released = _release(data, released, pos)
+    return buffer
+
+
+def tokenize_mapped(data, compat=False, strip=False, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Devuelve el TokenBuffer de 'data' (bytes UTF-8 o un mmap), igual que
+    TokenBuffer.from_source sobre el texto decodificado. Un mmap queda como
+    código fuente del buffer sin copiarse.
+    """
+    buffer = TokenBuffer(data, compat)
+    return extend_mapped(buffer, data, 0 if compat and not strip else _skip_blanks(data, 0), block_size)
+
+
+def map_file(path):
+    """
+    Mapea el archivo en memoria para lectura. Lo que no se puede mapear
+    (un archivo vacío, una tubería) se lee y se devuelve como bytes.
+    """
+    with open(path, "rb") as fileobj:
+        try:
+            data = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return fileobj.read()
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        data.madvise(mmap.MADV_SEQUENTIAL)
+    return data
+
+
+def tokenize_file(path, compat=False, strip=False, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Analiza un archivo UTF-8 mapeándolo en memoria y devuelve el
+    TokenBuffer, igual que TokenBuffer.from_source sobre su contenido.
+
+    El buffer conserva el mapa como código fuente, así que los lexemas se
+    leen del archivo y se decodifican solo cuando se piden: en memoria
+    quedan las columnas de tipos y desplazamientos.
+    """
+    return tokenize_mapped(map_file(path), compat, strip, block_size)
@@ -0,0 +1,265 @@
+import threading
+from collections import OrderedDict
+
+from .parser import (Assign, Binary, Block, Call, Declaration, Empty, Expression, ExprStmt, For, FunctionDecl, If,
+                     Index, Member, Name, Node, Number, Param, Postfix, Program, Return, String, Unary, VarDecl,
+                     While, parse)
+
+# Etiquetas de los operadores de un operando en las notaciones y el árbol:
+# un '-' o '+' unario no se confunde con el binario ni '++x' con 'x++'. Ninguna
+# es un identificador válido, así que no se confunden con una variable
+UNARY_LABELS = {"-": "u-", "+": "u+", "!": "!", "++": "++x", "--": "--x"}
+POSTFIX_LABELS = {"++": "x++", "--": "x--"}
+
+
+def _describe(node):
+    """
+    Etiqueta y hijos de un nodo para dibujarlo o recorrerlo. Los hijos son
+    nodos o, para las hojas que no son nodos (nombres), cadenas.
+    """
+    if isinstance(node, ExprStmt):
+        node = node.expr
+    if isinstance(node, Name):
+        return node.id, ()
+    if isinstance(node, (Number, String)):
+        return node.value, ()
+    if isinstance(node, Assign):
+        return node.op, (node.target, node.value)
+    if isinstance(node, Binary):
+        return node.op, (node.left, node.right)
+    if isinstance(node, Unary):
+        return UNARY_LABELS.get(node.op, node.op), (node.operand,)
+    if isinstance(node, Postfix):
+        return POSTFIX_LABELS.get(node.op, node.op), (node.operand,)
+    if isinstance(node, Call):
+        return "()", (node.func, *node.args)
+    if isinstance(node, Index):
+        return "[]", (node.value, node.index)
+    if isinstance(node, Member):
+        return ".", (node.value, node.name)
+    if isinstance(node, VarDecl):
+        return ("=", (node.name, node.value)) if node.value is not None else (node.name, ())
+    if isinstance(node, Declaration):
+        return node.type_name, node.variables
+    if isinstance(node, FunctionDecl):
+        body = () if node.body is None else (node.body,)
+        return f"{node.type_name} {node.name}()", (*node.params, *body)
+    if isinstance(node, Param):
+        return f"{node.type_name} {node.name}" if node.type_name else node.name, ()
+    if isinstance(node, Program):
+        return "programa", node.body
+    if isinstance(node, Block):
+        return "{}", node.body
+    if isinstance(node, (If, While, For, Return)):
+        keyword = {If: "if", While: "while", For: "for", Return: "return"}[type(node)]
+        return keyword, list(node.children())
+    if isinstance(node, Empty):
+        return ";", ()
+    return "error", ()
+
+
+def to_tree(node):
+    """
+    Convierte un nodo en listas anidadas [etiqueta, hijo, ...], el formato
+    que dibuja la ventana del árbol. No usa recursión.
+    """
+    label, children = _describe(node)
+    root = [label]
+    pending = [(root, children)]
+    while pending:
+        target, children = pending.pop()
+        for child in children:
+            if isinstance(child, str):
+                target.append([child])
+                continue
+            label, grandchildren = _describe(child)
+            item = [label]
+            target.append(item)
+            if grandchildren:
+                pending.append((item, grandchildren))
+    return root
+
+
+def prefix(node):
+    """
+    Operadores y operandos de una expresión en orden prefijo (notación
+    polaca), sin recursión.
+    """
+    output = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            output.append(item)
+            continue
+        label, children = _describe(item)
+        output.append(label)
+        stack.extend(reversed(children))
+    return output
+
+
+def postfix(node):
+    """
+    Operadores y operandos de una expresión en orden postfijo (notación
+    polaca inversa), sin recursión.
+    """
+    output = []
+    stack = [(node, False)]
+    while stack:
+        item, visited = stack.pop()
+        if isinstance(item, str):
+            output.append(item)
+            continue
+        label, children = _describe(item)
+        if visited:
+            output.append(label)
+            continue
+        stack.append((item, True))
+        stack.extend((child, False) for child in reversed(children))
+    return output
+
+
+def segment(program):
+    """
+    Expresiones del programa, una por sentencia y en el orden del código:
+    las sentencias de expresión, las inicializaciones (como asignaciones),
+    las condiciones, las partes de un 'for' y los valores de 'return'.
+    """
+    expressions = []
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Expression):
+            expressions.append(node)
+        elif isinstance(node, ExprStmt):
+            expressions.append(node.expr)
+        elif isinstance(node, VarDecl):
+            if node.value is not None:
+                target = Name(node.name, start=node.start, end=node.start + 1)
+                expressions.append(Assign("=", target, node.value, start=node.start, end=node.end))
+        elif isinstance(node, Node):
+            stack.extend(reversed(list(node.children())))
+    return expressions
+
+
+class Notation:
+    """
+    Resultado compartido de las tres vistas: el árbol del programa y sus
+    expresiones, analizados una sola vez. La notación prefija, la postfija
+    y el árbol dibujable se derivan de ese resultado y se guardan al
+    pedirlos por primera vez.
+    """
+
+    __slots__ = ("program", "expressions", "_prefix", "_postfix", "_tree")
+
+    def __init__(self, program):
+        self.program = program
+        self.expressions = segment(program)
+        self._prefix = self._postfix = self._tree = None
+
+    def prefix(self):
+        if self._prefix is None:
+            self._prefix = [" ".join(prefix(expression)) for expression in self.expressions]
+        return self._prefix
+
+    def postfix(self):
+        if self._postfix is None:
+            self._postfix = [" ".join(postfix(expression)) for expression in self.expressions]
+        return self._postfix
+
+    def tree(self):
+        if self._tree is None:
+            program = self.program
+            body = program.body if isinstance(program, Program) else [program]
+            body = [node for node in body if not isinstance(node, Empty)]
+            if not body:
+                self._tree = []
+            elif len(body) == 1 and isinstance(body[0], ExprStmt):
+                self._tree = to_tree(body[0].expr)
+            else:
+                self._tree = to_tree(program)
+        return self._tree or None
+
+
+# Análisis recientes por contenido de los tokens: clave -> (código, Notation)
+_CACHE_SIZE = 8
+_cache = OrderedDict()
+# La interfaz analiza en un hilo de trabajo y dibuja en el de Tk
+_lock = threading.Lock()
+
+
+def _cache_key(tokens):
+    """
+    Clave que cambia con el contenido de 'tokens', aunque la secuencia se
+    modifique en su lugar. Una lista se identifica por sus tokens; un
+    TokenBuffer, por sus columnas y su código (relex reemplaza el código y
+    la entrada lo conserva, así que su id no se reutiliza mientras tanto).
+    """
+    kinds = getattr(tokens, "kinds", None)
+    if kinds is None:
+        return None, tuple(tokens)
+    source = tokens.source
+    return source, (id(source), kinds.tobytes(), tokens.starts.tobytes())
+
+
+def analyze(tokens, program=None):
+    """
+    Devuelve la Notation de 'tokens' (o de un árbol ya construido). Se
+    guarda para los últimos contenidos analizados, así las tres vistas
+    comparten un único análisis; una lista modificada o un TokenBuffer
+    pasado por relex se vuelven a analizar. Con 'program' se reutiliza un
+    parse(tokens) previo.
+    """
+    if isinstance(tokens, Node):
+        return Notation(tokens)
+    source, key = _cache_key(tokens)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] is source:
+            _cache.move_to_end(key)
+            return entry[1]
+    notation = Notation(program if program is not None else parse(tokens))
+    with _lock:
+        _cache[key] = (source, notation)
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return notation
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+def generate_syntax_tree(tokens):
+    """
+    Genera el árbol sintáctico de los tokens (un analizador.parser.Program);
+    los errores de sintaxis quedan en su atributo 'errors'.
+    """
+    return analyze(tokens).program
+
+
+def generate_polish_notation(tokens):
+    """
+    Genera la notación polaca (prefija) de cada expresión del código, una
+    por línea.
+    """
+    return "\n".join(analyze(tokens).prefix())
+
+
+def generate_reverse_polish_notation(tokens):
+    """
+    Genera la notación polaca inversa (postfija) de cada expresión del
+    código, una por línea.
+    """
+    return "\n".join(analyze(tokens).postfix())
+
+
+def parse_expression_to_tree(tokens):
+    """
+    Convierte una expresión en tokens a un árbol sintáctico de listas
+    anidadas. Si el código tiene una sola expresión se devuelve su árbol; si
+    tiene varias sentencias, el del programa completo. Devuelve None si no
+    hay nada que dibujar.
+    """
+    return analyze(tokens).tree()
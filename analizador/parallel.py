@@ -0,0 +1,234 @@
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+from .buffer import KIND_CODES, TokenBuffer
+from .lexer import _WHITESPACE, TOKEN_TYPES, _pattern
+
+# Por debajo de este tamaño (en bytes) lanzar procesos cuesta más que analizar
+MIN_PARALLEL_SIZE = 1 << 20
+
+# Trozos por proceso: más de uno reparte mejor la carga si difieren en costo
+CHUNKS_PER_JOB = 4
+
+# Lo único que puede cruzar un salto de línea fuera del modo compatible es
+# un comentario de bloque; los strings y los comentarios de línea se
+# reconocen para no tomar un '/*' dentro de ellos como apertura. En modo
+# compatible ningún token cruza un salto de línea.
+_MULTILINE = re.compile(rb'"(?:[^"\\\n]|\\.)*"|//[^\n]*|/\*[\s\S]*?\*/')
+
+
+def available_cpus():
+    # Núcleos que este proceso puede usar, que pueden ser menos que los del equipo
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _multiline_spans(data):
+    # Inicios y fines de los comentarios de bloque que contienen un salto de
+    # línea; la búsqueda solo se hace si el texto tiene algún '/*'
+    starts, ends = [], []
+    if data.find(b"/*") < 0:
+        return starts, ends
+    for match in _MULTILINE.finditer(data):
+        start, end = match.span()
+        if data[start:start + 2] == b"/*" and data.find(b"\n", start, end) >= 0:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+def split_points(data, parts, compat=False):
+    """
+    Devuelve los límites [0, c1, ..., len(data)] para cortar el código en
+    unos 'parts' trozos, siempre justo después de un salto de línea que no
+    está dentro de ningún token. Analizar cada trozo por separado da los
+    mismos tokens que analizar el texto completo.
+    """
+    size = len(data)
+    starts, ends = ([], []) if compat else _multiline_spans(data)
+    cuts = [0]
+    for part in range(1, parts):
+        position = max(size * part // parts, cuts[-1])
+        while True:
+            newline = data.find(b"\n", position)
+            if newline < 0:
+                break
+            inside = bisect_right(starts, newline) - 1
+            if inside >= 0 and newline < ends[inside]:
+                position = ends[inside]
+                continue
+            position = newline + 1
+            break
+        if newline < 0:
+            break
+        if position > cuts[-1]:
+            cuts.append(position)
+    if cuts[-1] != size:
+        cuts.append(size)
+    return cuts
+
+
+def _lex(text, compat, first):
+    # Igual que lexer.tokenize, salvo que un trozo que no es el primero
+    # empieza después de los espacios, como si los hubiera consumido el
+    # token anterior
+    pattern, kinds = _pattern(compat)
+    pos = 0 if compat and first else _WHITESPACE.match(text).end()
+    results = []
+    append = results.append
+    for match in iter(pattern.scanner(text, pos).match, None):
+        append((match.group(match.lastindex), kinds[match.lastgroup]))
+    return results, Counter(kind for _, kind in results)
+
+
+def _read(source, start, end):
+    # Los procesos de trabajo leen su trozo del buffer compartido: memoria
+    # compartida o el archivo mapeado
+    kind, name = source
+    if kind == "shm":
+        memory = shared_memory.SharedMemory(name)
+        try:
+            return bytes(memory.buf[start:end])
+        finally:
+            memory.close()
+    with open(name, "rb") as fileobj, mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return mapped[start:end]
+
+
+def _lex_chunk(source, start, end, compat, first, encoding):
+    # Devuelve los tipos como bytes y los lexemas unidos por '\0' en un
+    # solo string, que se serializan mucho más rápido que una lista de tuplas
+    text = _read(source, start, end).decode(encoding)
+    pattern, kinds = _pattern(compat)
+    codes_of = {group: KIND_CODES[kind] for group, kind in kinds.items()}
+    pos = 0 if compat and first else _WHITESPACE.match(text).end()
+    lexemes = []
+    append = lexemes.append
+    codes = bytearray()
+    append_code = codes.append
+    for match in iter(pattern.scanner(text, pos).match, None):
+        append(match.group(match.lastindex))
+        append_code(codes_of[match.lastgroup])
+    # Un '\0' en el código puede ser un lexema: entonces va la lista
+    return "\0".join(lexemes) if "\0" not in text else lexemes, bytes(codes)
+
+
+def _lex_chunk_buffer(source, start, end, compat, first, typecode):
+    # Devuelve las columnas de un TokenBuffer del trozo, con los
+    # desplazamientos ya corridos al archivo completo
+    data = _read(source, start, end)
+    text = data.decode("utf-8")
+    chunk = TokenBuffer(data, compat)
+    chunk.extend_from(text, pos=0 if compat and first else _WHITESPACE.match(text).end())
+    starts, ends = chunk.starts, chunk.ends
+    if start or starts.typecode != typecode:
+        starts = array(typecode, [offset + start for offset in starts])
+        ends = array(typecode, [offset + start for offset in ends])
+    return chunk.kinds.tobytes(), starts.tobytes(), ends.tobytes()
+
+
+def _run(worker, source, data, compat, first, jobs, executor, *args):
+    # Reparte los trozos entre los procesos y devuelve sus resultados en
+    # orden de trozo, no de llegada
+    jobs = available_cpus() if jobs is None else max(1, jobs)
+    cuts = split_points(data, jobs * CHUNKS_PER_JOB, compat)
+    own = executor is None
+    if own:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        futures = [executor.submit(worker, source, start, end, compat, first and not start, *args)
+                   for start, end in zip(cuts, cuts[1:])]
+        for future in futures:
+            yield future.result()
+    finally:
+        if own:
+            executor.shutdown()
+
+
+def _stitch(results):
+    tokens = []
+    codes = Counter()
+    for lexemes, chunk_codes in results:
+        if not chunk_codes:
+            continue
+        if isinstance(lexemes, str):
+            lexemes = lexemes.split("\0")
+        tokens.extend(zip(lexemes, map(TOKEN_TYPES.__getitem__, chunk_codes)))
+        codes.update(chunk_codes)
+    # El conteo queda en el orden de primera aparición, como en tokenize
+    return tokens, Counter({TOKEN_TYPES[code]: count for code, count in codes.items()})
+
+
+@contextmanager
+def _shared(text):
+    # Copia el texto codificado a un bloque de memoria compartida
+    data = text.encode("utf-8")
+    memory = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        memory.buf[:len(data)] = data
+        yield ("shm", memory.name), data
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def tokenize(text, compat=False, jobs=None, executor=None):
+    """
+    Igual que lexer.tokenize, repartiendo el texto entre varios procesos.
+
+    El texto se codifica una vez en un bloque de memoria compartida; cada
+    proceso lee y analiza solo su trozo, así que el código no se envía
+    serializado. 'jobs' es la cantidad de procesos (None: todos los núcleos)
+    y 'executor' permite reutilizar un ProcessPoolExecutor propio. Los
+    textos chicos se analizan en este proceso.
+
+    Armar la lista de tuplas en este proceso no se reparte; para textos
+    enormes tokenize_buffer escala mejor.
+    """
+    if not text or len(text) < MIN_PARALLEL_SIZE or jobs == 1:
+        return _lex(text, compat, True)
+    with _shared(text) as (source, data):
+        return _stitch(_run(_lex_chunk, source, data, compat, True, jobs, executor, "utf-8"))
+
+
+def tokenize_file(path, compat=False, jobs=None, executor=None, encoding="utf-8"):
+    """
+    Como tokenize, para un archivo: los procesos mapean el archivo en
+    memoria y nadie lo carga completo.
+    """
+    with open(path, "rb") as fileobj:
+        if os.fstat(fileobj.fileno()).st_size == 0:
+            return [], Counter()
+        with mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if len(data) < MIN_PARALLEL_SIZE or jobs == 1:
+                return _lex(data[:].decode(encoding), compat, True)
+            source = ("file", os.fspath(path))
+            return _stitch(_run(_lex_chunk, source, data, compat, True, jobs, executor, encoding))
+
+
+def tokenize_buffer(text, compat=False, strip=False, jobs=None, executor=None):
+    """
+    Igual que TokenBuffer.from_source, repartiendo el texto entre varios
+    procesos. Cada uno devuelve sus columnas de tipos y desplazamientos, que
+    aquí solo se concatenan: no se crea un objeto por token.
+    """
+    if not text or len(text) < MIN_PARALLEL_SIZE or jobs == 1:
+        return TokenBuffer.from_source(text, compat, strip)
+    with _shared(text) as (source, data):
+        buffer = TokenBuffer(data, compat)
+        typecode = buffer.starts.typecode
+        for kinds, starts, ends in _run(_lex_chunk_buffer, source, data, compat, not strip, jobs, executor,
+                                        typecode):
+            buffer.kinds.frombytes(kinds)
+            buffer.starts.frombytes(starts)
+            buffer.ends.frombytes(ends)
+    return buffer
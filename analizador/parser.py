@@ -0,0 +1,764 @@
+TYPE_NAMES = ("int", "float", "char", "void")
+
+# Operadores que entiende el parser. El analizador léxico junta los
+# caracteres de operador consecutivos en un solo token ("=-"), que aquí se
+# separa tomando siempre el operador más largo.
+OPERATORS = ("==", "!=", "<=", ">=", "++", "--", "+=", "-=", "*=", "/=",
+             "+", "-", "*", "/", "=", "<", ">", "!")
+ASSIGNMENT = frozenset(("=", "+=", "-=", "*=", "/="))
+PRECEDENCE = {"==": 1, "!=": 1, "<": 2, ">": 2, "<=": 2, ">=": 2, "+": 3, "-": 3, "*": 4, "/": 4}
+PREFIX = frozenset(("-", "+", "!", "++", "--"))
+
+_UNARY_PRECEDENCE = 5
+_OPERATOR_SET = frozenset(OPERATORS)
+_STATEMENT_KEYWORDS = frozenset(("if", "else", "while", "for", "return", "def") + TYPE_NAMES)
+_CLOSERS = {"(": ")", "call": ")", "[": "]"}
+
+# Cada sentencia anidada usa unos pocos marcos de Python; por encima de este
+# nivel se informa un error en lugar de llegar al límite de recursión. Las
+# expresiones no tienen límite: se analizan con pilas propias.
+MAX_DEPTH = 150
+
+
+def location(tokens, index):
+    # Línea y columna del token si la secuencia las conoce (TokenBuffer)
+    if hasattr(tokens, "position"):
+        line, column = tokens.position(index)
+        return f" (línea {line}, columna {column})"
+    return ""
+
+
+def split_operator(lexeme):
+    """
+    Separa un token OPERADOR en los operadores que lo forman, de izquierda
+    a derecha y tomando siempre el más largo: "=-" da ["=", "-"].
+    """
+    parts = []
+    i = 0
+    while i < len(lexeme):
+        part = lexeme[i:i + 2]
+        if part not in _OPERATOR_SET:
+            part = lexeme[i]
+        parts.append(part)
+        i += len(part)
+    return parts
+
+
+class Node:
+    """
+    Nodo del árbol sintáctico. 'start' y 'end' son el índice del primer
+    token del nodo y el siguiente al último, sobre la secuencia de tokens
+    analizada (comentarios incluidos); con un TokenBuffer, starts[start] y
+    ends[end - 1] dan el tramo en bytes del código fuente.
+    """
+
+    __slots__ = ("start", "end")
+    _fields = ()
+
+    def __init__(self, *values, start=-1, end=-1):
+        for name, value in zip(self._fields, values):
+            setattr(self, name, value)
+        self.start = start
+        self.end = end
+
+    def children(self):
+        """
+        Nodos hijos, en el orden en que aparecen en el código.
+        """
+        for name in self._fields:
+            value = getattr(self, name)
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, list):
+                yield from value
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({values})"
+
+
+class Expression(Node):
+    __slots__ = ()
+
+
+class Program(Node):
+    __slots__ = ("body", "errors")
+    _fields = ("body",)
+
+
+class Block(Node):
+    __slots__ = ("body",)
+    _fields = ("body",)
+
+
+class FunctionDecl(Node):
+    # 'body' es None en un prototipo ("int f(int a);")
+    __slots__ = ("type_name", "name", "params", "body")
+    _fields = ("type_name", "name", "params", "body")
+
+
+class Param(Node):
+    # 'type_name' es None en los parámetros de 'def'
+    __slots__ = ("type_name", "name")
+    _fields = ("type_name", "name")
+
+
+class Declaration(Node):
+    __slots__ = ("type_name", "variables")
+    _fields = ("type_name", "variables")
+
+
+class VarDecl(Node):
+    __slots__ = ("name", "value")
+    _fields = ("name", "value")
+
+
+class If(Node):
+    __slots__ = ("condition", "body", "orelse")
+    _fields = ("condition", "body", "orelse")
+
+
+class While(Node):
+    __slots__ = ("condition", "body")
+    _fields = ("condition", "body")
+
+
+class For(Node):
+    __slots__ = ("init", "condition", "update", "body")
+    _fields = ("init", "condition", "update", "body")
+
+
+class Return(Node):
+    __slots__ = ("value",)
+    _fields = ("value",)
+
+
+class ExprStmt(Node):
+    __slots__ = ("expr",)
+    _fields = ("expr",)
+
+
+class Empty(Node):
+    __slots__ = ()
+
+
+class Invalid(Node):
+    # Tramo que el parser descartó al recuperarse de un error
+    __slots__ = ()
+
+
+class Assign(Expression):
+    __slots__ = ("op", "target", "value")
+    _fields = ("op", "target", "value")
+
+
+class Binary(Expression):
+    __slots__ = ("op", "left", "right")
+    _fields = ("op", "left", "right")
+
+
+class Unary(Expression):
+    __slots__ = ("op", "operand")
+    _fields = ("op", "operand")
+
+
+class Postfix(Expression):
+    __slots__ = ("op", "operand")
+    _fields = ("op", "operand")
+
+
+class Call(Expression):
+    __slots__ = ("func", "args")
+    _fields = ("func", "args")
+
+
+class Index(Expression):
+    __slots__ = ("value", "index")
+    _fields = ("value", "index")
+
+
+class Member(Expression):
+    __slots__ = ("value", "name")
+    _fields = ("value", "name")
+
+
+class Name(Expression):
+    __slots__ = ("id",)
+    _fields = ("id",)
+
+
+class Number(Expression):
+    __slots__ = ("value",)
+    _fields = ("value",)
+
+
+class String(Expression):
+    __slots__ = ("value",)
+    _fields = ("value",)
+
+
+def walk(node):
+    """
+    Recorre el árbol en preorden y en el orden del código, sin recursión.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(list(node.children())))
+
+
+class _Sync(Exception):
+    # Error ya informado: la sentencia se abandona y el parser se
+    # resincroniza en el siguiente punto seguro (modo pánico)
+    pass
+
+
+class Parser:
+    """
+    Analizador descendente recursivo para las sentencias y de precedencia
+    de operadores para las expresiones.
+
+    Ante un error lo informa, descarta tokens hasta un ';', una llave o el
+    inicio de otra sentencia y sigue, así una sola pasada lineal informa
+    todos los errores. Los comentarios se ignoran y los tokens ERROR se
+    informan una vez por cada tramo consecutivo.
+
+    Con 'start' y 'stop' se analiza solo ese tramo de la secuencia; los
+    índices de los nodos y de los errores siguen siendo los de 'tokens'.
+    """
+
+    def __init__(self, tokens, start=0, stop=None):
+        self.tokens = tokens
+        self.errors = []
+        self.depth = 0
+        self.lexemes = lexemes = []
+        self.kinds = kinds = []
+        self.indexes = indexes = []
+
+        if start or stop is not None:
+            stop = len(tokens) if stop is None else stop
+            if hasattr(tokens, "iter_range"):
+                items = zip(range(start, stop), tokens.iter_range(start, stop))
+            else:
+                items = ((i, tokens[i]) for i in range(start, stop))
+        else:
+            items = enumerate(tokens)
+        unknown = None
+        count = start
+        for i, (lexeme, kind) in items:
+            count = i + 1
+            if kind == "ERROR":
+                # El original marca como ERROR el espacio inicial: no es del código
+                if not lexeme.isspace():
+                    if unknown is None:
+                        unknown = (i, [])
+                    unknown[1].append(lexeme)
+                continue
+            if unknown is not None:
+                self.unknown(*unknown)
+                unknown = None
+            if kind == "COMENTARIO":
+                continue
+            if kind == "OPERADOR":
+                for part in split_operator(lexeme):
+                    lexemes.append(part)
+                    kinds.append(kind)
+                    indexes.append(i)
+                continue
+            lexemes.append(lexeme)
+            kinds.append(kind)
+            indexes.append(i)
+        if unknown is not None:
+            self.unknown(*unknown)
+
+        # Centinela de fin; los errores al final se ubican en el último token
+        self.first = start
+        self.last = max(count - 1, start)
+        lexemes.append("")
+        kinds.append("EOF")
+        indexes.append(count)
+        self.pos = 0
+
+    def unknown(self, index, lexemes):
+        text = "".join(lexemes)
+        self.report(index, f"Error: Símbolo no reconocido '{text}' en posición {index+1}"
+                           f"{location(self.tokens, index)}")
+
+    def report(self, index, message):
+        self.errors.append((index, message))
+
+    def at(self, lexeme):
+        return self.lexemes[self.pos] == lexeme and self.kinds[self.pos] in ("DELIMITADOR", "OPERADOR")
+
+    def index(self):
+        # Índice en la secuencia original del token actual
+        return self.indexes[self.pos] if self.kinds[self.pos] != "EOF" else self.last
+
+    def end(self):
+        # Fin (exclusivo) del último token consumido
+        return self.indexes[self.pos - 1] + 1
+
+    def parse(self):
+        body = self.statements()
+        program = Program(body, start=self.first, end=self.indexes[-1])
+        program.errors = self.errors
+        return program
+
+    def statements(self, nested=False):
+        body = []
+        lexemes, kinds = self.lexemes, self.kinds
+        while kinds[self.pos] != "EOF":
+            if lexemes[self.pos] == "}" and kinds[self.pos] == "DELIMITADOR":
+                if nested:
+                    break
+                i = self.indexes[self.pos]
+                self.report(i, f"Error: '}}' en posición {i+1}{location(self.tokens, i)} no tiene '{{' de apertura")
+                self.pos += 1
+                continue
+            start = self.pos
+            try:
+                body.append(self.statement())
+            except _Sync:
+                # Siempre se avanza al menos un token, salvo una '}' que
+                # corresponde al bloque que la contiene
+                if self.pos == start and not self.at("}"):
+                    self.pos += 1
+                self.synchronize()
+                if self.pos > start:
+                    body.append(Invalid(start=self.indexes[start], end=self.end()))
+        return body
+
+    def synchronize(self):
+        lexemes, kinds = self.lexemes, self.kinds
+        while True:
+            lexeme, kind = lexemes[self.pos], kinds[self.pos]
+            if kind == "EOF":
+                return
+            if kind == "DELIMITADOR":
+                if lexeme == ";":
+                    self.pos += 1
+                    return
+                if lexeme in "{}":
+                    return
+            elif kind == "PALABRA CLAVE" and lexeme in _STATEMENT_KEYWORDS:
+                return
+            self.pos += 1
+
+    def starts_statement(self):
+        kind = self.kinds[self.pos]
+        if kind in ("EOF", "PALABRA CLAVE", "IDENTIFICADOR"):
+            return True
+        return kind == "DELIMITADOR" and self.lexemes[self.pos] in "{}"
+
+    def semicolon(self, index, message):
+        # Cierre de una sentencia. Si falta el ';' se informa y, si lo que
+        # sigue no empieza otra sentencia, se descarta hasta un punto seguro.
+        if self.at(";"):
+            self.pos += 1
+            return
+        lexeme = self.lexemes[self.pos]
+        if self.kinds[self.pos] == "DELIMITADOR" and lexeme in ")]":
+            i = self.indexes[self.pos]
+            opening = "(" if lexeme == ")" else "["
+            self.report(i, f"Error: '{lexeme}' en posición {i+1}{location(self.tokens, i)} "
+                           f"no tiene '{opening}' de apertura")
+        else:
+            self.report(index, message)
+            if self.starts_statement():
+                return
+        self.synchronize()
+
+    def statement(self):
+        if self.depth >= MAX_DEPTH:
+            i = self.index()
+            self.report(i, f"Error: Anidamiento demasiado profundo en posición {i+1}{location(self.tokens, i)}")
+            start = self.pos
+            self.skip_statement()
+            return Invalid(start=self.indexes[start], end=self.end())
+        self.depth += 1
+        try:
+            lexeme, kind = self.lexemes[self.pos], self.kinds[self.pos]
+            if kind == "PALABRA CLAVE":
+                if lexeme in TYPE_NAMES or lexeme == "def":
+                    return self.declaration()
+                if lexeme == "if" or lexeme == "while":
+                    return self.conditional()
+                if lexeme == "for":
+                    return self.for_loop()
+                if lexeme == "return":
+                    return self.return_statement()
+                if lexeme == "else":
+                    i = self.indexes[self.pos]
+                    self.report(i, f"Error: 'else' sin 'if' en posición {i+1}{location(self.tokens, i)}")
+                    self.pos += 1
+                    return Invalid(start=i, end=i + 1)
+            elif kind == "DELIMITADOR":
+                if lexeme == "{":
+                    return self.block()
+                if lexeme == ";":
+                    self.pos += 1
+                    return Empty(start=self.indexes[self.pos - 1], end=self.end())
+            return self.expression_statement()
+        finally:
+            self.depth -= 1
+
+    def skip_statement(self):
+        # Descarta una sentencia completa, con sus bloques, sin analizarla
+        depth = 0
+        while self.kinds[self.pos] != "EOF":
+            if self.kinds[self.pos] == "DELIMITADOR":
+                lexeme = self.lexemes[self.pos]
+                if lexeme == "{":
+                    depth += 1
+                elif lexeme == "}":
+                    if not depth:
+                        break
+                    depth -= 1
+                    if not depth:
+                        self.pos += 1
+                        break
+                elif lexeme == ";" and not depth:
+                    self.pos += 1
+                    break
+            self.pos += 1
+
+    def block(self):
+        start = self.pos
+        i = self.indexes[start]
+        self.pos += 1
+        body = self.statements(nested=True)
+        if self.at("}"):
+            self.pos += 1
+        else:
+            self.report(i, f"Error: Falta '}}' para cerrar '{{' en posición {i+1}{location(self.tokens, i)}")
+        return Block(body, start=i, end=self.end())
+
+    def declaration(self):
+        type_name = self.lexemes[self.pos]
+        i = self.indexes[self.pos]
+        self.pos += 1
+        if self.kinds[self.pos] == "EOF":
+            self.report(i, f"Error: Declaración incompleta después de '{type_name}'")
+            raise _Sync
+        if self.kinds[self.pos] != "IDENTIFICADOR":
+            self.report(i, f"Error: Se esperaba un identificador después de '{type_name}'")
+            raise _Sync
+        name = self.lexemes[self.pos]
+        self.pos += 1
+        if self.at("("):
+            return self.function(i, type_name, name)
+        if type_name == "def":
+            self.report(i, f"Error: Se esperaba '(' después de 'def {name}'")
+            raise _Sync
+
+        variables = [self.variable(name)]
+        while self.at(","):
+            self.pos += 1
+            if self.kinds[self.pos] != "IDENTIFICADOR":
+                self.report(i, f"Error: Se esperaba un identificador después de ',' en la declaración de '{name}'")
+                raise _Sync
+            variable = self.lexemes[self.pos]
+            self.pos += 1
+            variables.append(self.variable(variable))
+        self.semicolon(i, f"Error: Falta ';' al final de la declaración de '{name}'")
+        return Declaration(type_name, variables, start=i, end=self.end())
+
+    def variable(self, name):
+        start = self.indexes[self.pos - 1]
+        value = None
+        if self.lexemes[self.pos] == "=" and self.kinds[self.pos] == "OPERADOR":
+            self.pos += 1
+            value = self.expression()
+        return VarDecl(name, value, start=start, end=self.end())
+
+    def function(self, start, type_name, name):
+        opening = self.indexes[self.pos]
+        self.pos += 1
+        params = []
+        if not self.at(")"):
+            while True:
+                param_start = self.pos
+                param_type = None
+                if self.kinds[self.pos] == "PALABRA CLAVE" and self.lexemes[self.pos] in TYPE_NAMES:
+                    param_type = self.lexemes[self.pos]
+                    self.pos += 1
+                if self.kinds[self.pos] == "IDENTIFICADOR":
+                    self.pos += 1
+                    params.append(Param(param_type, self.lexemes[self.pos - 1],
+                                        start=self.indexes[param_start], end=self.end()))
+                elif not (param_type == "void" and not params and self.at(")")):
+                    j = self.index()
+                    self.report(j, f"Error: Se esperaba un parámetro de '{name}' en posición {j+1}"
+                                   f"{location(self.tokens, j)}")
+                    raise _Sync
+                if not self.at(","):
+                    break
+                self.pos += 1
+        if not self.at(")"):
+            self.report(opening, f"Error: Falta ')' para cerrar los parámetros de '{name}'")
+            raise _Sync
+        self.pos += 1
+        if self.at("{"):
+            body = self.block()
+        elif self.at(";"):
+            self.pos += 1
+            body = None
+        else:
+            self.report(start, f"Error: Se esperaba '{{' o ';' después de la declaración de '{name}'")
+            raise _Sync
+        return FunctionDecl(type_name, name, params, body, start=start, end=self.end())
+
+    def condition(self, keyword, i):
+        # Condición entre paréntesis de if/while; si faltan se informa y se
+        # analiza la expresión igual
+        if self.kinds[self.pos] == "EOF":
+            self.report(i, f"Error: Expresión incompleta después de '{keyword}'")
+            raise _Sync
+        if not self.at("("):
+            self.report(i, f"Error: Se esperaba '(' después de '{keyword}' en posición {i+1}"
+                           f"{location(self.tokens, self.index())}")
+            return self.expression()
+        self.pos += 1
+        condition = self.expression()
+        self.closing(keyword, i)
+        return condition
+
+    def closing(self, keyword, i):
+        if self.at(")"):
+            self.pos += 1
+            return
+        self.report(i, f"Error: Falta ')' para cerrar la condición de '{keyword}'")
+        if not self.at("{"):
+            raise _Sync
+
+    def body(self, keyword, i):
+        # El original exige llaves en el cuerpo; sin ellas se informa y se
+        # analiza la sentencia igual
+        if self.kinds[self.pos] == "EOF":
+            self.report(i, f"Error: Falta el cuerpo de '{keyword}'")
+            raise _Sync
+        if not self.at("{"):
+            self.report(i, f"Error: Se esperaba '{{' después de la condición en '{keyword}'")
+        return self.statement()
+
+    def conditional(self):
+        keyword = self.lexemes[self.pos]
+        i = self.indexes[self.pos]
+        self.pos += 1
+        condition = self.condition(keyword, i)
+        body = self.body(keyword, i)
+        if keyword == "while":
+            return While(condition, body, start=i, end=self.end())
+        orelse = None
+        if self.lexemes[self.pos] == "else" and self.kinds[self.pos] == "PALABRA CLAVE":
+            self.pos += 1
+            orelse = self.statement()
+        return If(condition, body, orelse, start=i, end=self.end())
+
+    def for_loop(self):
+        i = self.indexes[self.pos]
+        self.pos += 1
+        if self.kinds[self.pos] == "EOF":
+            self.report(i, "Error: Expresión incompleta después de 'for'")
+            raise _Sync
+        if not self.at("("):
+            self.report(i, f"Error: Se esperaba '(' después de 'for' en posición {i+1}"
+                           f"{location(self.tokens, self.index())}")
+            raise _Sync
+        self.pos += 1
+
+        init = None
+        if self.kinds[self.pos] == "PALABRA CLAVE" and self.lexemes[self.pos] in TYPE_NAMES:
+            init = self.declaration()
+        else:
+            if not self.at(";"):
+                init = self.expression()
+            self.header_semicolon(i)
+        condition = None if self.at(";") else self.expression()
+        self.header_semicolon(i)
+        update = None if self.at(")") else self.expression()
+        self.closing("for", i)
+        body = self.body("for", i)
+        return For(init, condition, update, body, start=i, end=self.end())
+
+    def header_semicolon(self, i):
+        if not self.at(";"):
+            self.report(i, f"Error: Se esperaba ';' en la cabecera de 'for' en posición {i+1}"
+                           f"{location(self.tokens, i)}")
+            raise _Sync
+        self.pos += 1
+
+    def return_statement(self):
+        i = self.indexes[self.pos]
+        self.pos += 1
+        value = None
+        if not (self.at(";") or self.at("}") or self.kinds[self.pos] == "EOF"):
+            value = self.expression()
+        self.semicolon(i, f"Error: Falta ';' al final de 'return' en posición {i+1}{location(self.tokens, i)}")
+        return Return(value, start=i, end=self.end())
+
+    def expression_statement(self):
+        expr = self.expression()
+        if isinstance(expr, Assign) and isinstance(expr.target, Name):
+            message = f"Error: Falta ';' al final de la asignación de '{expr.target.id}'"
+        else:
+            message = (f"Error: Falta ';' después de la expresión en posición {expr.start+1}"
+                       f"{location(self.tokens, expr.start)}")
+        self.semicolon(expr.start, message)
+        return ExprStmt(expr, start=expr.start, end=self.end())
+
+    def expression(self):
+        """
+        Analiza una expresión por precedencia de operadores. Los operadores
+        pendientes y los paréntesis, llamadas e índices abiertos se guardan
+        en pilas propias, así que la profundidad de anidamiento no tiene
+        límite. Termina en el primer token que no puede continuarla.
+        """
+        lexemes, kinds, indexes = self.lexemes, self.kinds, self.indexes
+        operands = []
+        # Operadores pendientes: (precedencia, operador, índice, es_unario)
+        operators = []
+        # Grupos abiertos: [tipo, índice, operadores debajo, base, argumentos]
+        groups = []
+        pos = self.pos
+        expect_operand = True
+        while True:
+            lexeme, kind, i = lexemes[pos], kinds[pos], indexes[pos]
+            if expect_operand:
+                if kind == "IDENTIFICADOR":
+                    operands.append(Name(lexeme, start=i, end=i + 1))
+                    expect_operand = False
+                elif kind == "NUMERO":
+                    operands.append(Number(lexeme, start=i, end=i + 1))
+                    expect_operand = False
+                elif kind == "STRING":
+                    operands.append(String(lexeme, start=i, end=i + 1))
+                    expect_operand = False
+                elif kind == "OPERADOR" and lexeme in PREFIX:
+                    operators.append((_UNARY_PRECEDENCE, lexeme, i, True))
+                elif kind == "DELIMITADOR" and lexeme == "(":
+                    groups.append(["(", i, len(operators), None, None])
+                else:
+                    self.pos = pos
+                    if kind == "EOF":
+                        self.report(self.last, "Error: Expresión incompleta al final del código")
+                    else:
+                        self.report(i, f"Error: Se esperaba una expresión en lugar de '{lexeme}' "
+                                       f"en posición {i+1}{location(self.tokens, i)}")
+                    raise _Sync
+                pos += 1
+                continue
+
+            if kind == "OPERADOR":
+                if lexeme == "++" or lexeme == "--":
+                    operand = operands[-1]
+                    operands[-1] = Postfix(lexeme, operand, start=operand.start, end=i + 1)
+                    pos += 1
+                    continue
+                if lexeme in ASSIGNMENT:
+                    precedence = 0
+                else:
+                    precedence = PRECEDENCE.get(lexeme)
+                    if precedence is None:
+                        break
+                self.reduce(operators, operands, groups[-1][2] if groups else 0, precedence)
+                operators.append((precedence, lexeme, i, False))
+                expect_operand = True
+                pos += 1
+                continue
+
+            if kind != "DELIMITADOR":
+                break
+            if lexeme == "(":
+                callee = operands.pop()
+                pos += 1
+                if lexemes[pos] == ")" and kinds[pos] == "DELIMITADOR":
+                    operands.append(Call(callee, [], start=callee.start, end=indexes[pos] + 1))
+                    pos += 1
+                else:
+                    groups.append(["call", i, len(operators), callee, []])
+                    expect_operand = True
+                continue
+            if lexeme == "[":
+                groups.append(["[", i, len(operators), operands.pop(), None])
+                expect_operand = True
+                pos += 1
+                continue
+            if lexeme == "." and kinds[pos + 1] == "IDENTIFICADOR":
+                value = operands[-1]
+                operands[-1] = Member(value, lexemes[pos + 1], start=value.start, end=indexes[pos + 1] + 1)
+                pos += 2
+                continue
+            if not groups or lexeme not in ",)]":
+                break
+
+            group = groups[-1]
+            self.reduce(operators, operands, group[2], -1)
+            if lexeme == ",":
+                if group[0] != "call":
+                    self.pos = pos
+                    self.report(i, f"Error: ',' inesperada en posición {i+1}{location(self.tokens, i)}")
+                    raise _Sync
+                group[4].append(operands.pop())
+                expect_operand = True
+                pos += 1
+                continue
+            closer = _CLOSERS[group[0]]
+            if lexeme != closer:
+                self.pos = pos
+                opening = "[" if group[0] == "[" else "("
+                self.report(group[1], f"Error: Se esperaba '{closer}' para cerrar '{opening}' antes de "
+                                      f"'{lexeme}' en posición {i+1}{location(self.tokens, i)}")
+                raise _Sync
+            groups.pop()
+            pos += 1
+            if group[0] == "call":
+                group[4].append(operands.pop())
+                operands.append(Call(group[3], group[4], start=group[3].start, end=i + 1))
+            elif group[0] == "[":
+                index = operands.pop()
+                operands.append(Index(group[3], index, start=group[3].start, end=i + 1))
+
+        self.pos = pos
+        if groups:
+            kind, j = groups[-1][0], groups[-1][1]
+            opening = "[" if kind == "[" else "("
+            self.report(j, f"Error: Falta '{_CLOSERS[kind]}' para cerrar '{opening}' en posición {j+1}"
+                           f"{location(self.tokens, j)}")
+            raise _Sync
+        self.reduce(operators, operands, 0, -1)
+        return operands[-1]
+
+    def reduce(self, operators, operands, base, precedence):
+        # Aplica los operadores pendientes por encima de 'base' que ligan más
+        # que 'precedence'; los de igual precedencia también, salvo la
+        # asignación, que asocia a derecha
+        while len(operators) > base:
+            top, op, i, unary = operators[-1]
+            if top < precedence or (top == precedence == 0):
+                break
+            operators.pop()
+            if unary:
+                operand = operands.pop()
+                operands.append(Unary(op, operand, start=i, end=operand.end))
+                continue
+            right = operands.pop()
+            left = operands.pop()
+            if top:
+                operands.append(Binary(op, left, right, start=left.start, end=right.end))
+                continue
+            if not isinstance(left, (Name, Index, Member)):
+                self.report(i, f"Error: No se puede asignar a la expresión en posición {left.start+1}"
+                               f"{location(self.tokens, left.start)}")
+            operands.append(Assign(op, left, right, start=left.start, end=right.end))
+
+
+def parse(tokens):
+    """
+    Analiza una secuencia de pares (lexema, tipo) o un TokenBuffer y
+    devuelve el Program con el árbol sintáctico. Los errores quedan en
+    program.errors como pares (posición del token, mensaje), en el orden en
+    que se encontraron.
+    """
+    return Parser(tokens).parse()
@@ -0,0 +1,299 @@
+from collections import Counter
+
+from .buffer import KIND_CODES, TokenBuffer
+from .lexer import TOKEN_TYPES
+from .notation import analyze
+from .parser import Parser, Program
+from .profiling import measure
+from .semantic import ScopeChecker, semantic_report
+from .syntax import syntax_analyzer
+
+_DELIMITER_CODE = bytes((KIND_CODES["DELIMITADOR"],))
+_KEYWORD = KIND_CODES["PALABRA CLAVE"]
+# Tokens que el parser no ve: no deciden dónde termina una sentencia
+_IGNORED = frozenset((KIND_CODES["COMENTARIO"], KIND_CODES["ERROR"]))
+
+DEFAULT_STEP = 1024
+
+
+class Diagnostic:
+    """
+    Un error o advertencia del análisis: la etapa que lo produjo
+    ("sintáctico" o "semántico"), el mensaje, el índice del token y su
+    desplazamiento en bytes en el código fuente.
+    """
+
+    __slots__ = ("kind", "message", "index", "offset")
+
+    def __init__(self, kind, message, index, offset):
+        self.kind = kind
+        self.message = message
+        self.index = index
+        self.offset = offset
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"Diagnostic({self.kind!r}, {self.message!r}, index={self.index}, offset={self.offset})"
+
+
+class CountStage:
+    """
+    Conteo por tipo de token a medida que llegan.
+    """
+
+    def __init__(self):
+        self.codes = Counter()
+
+    def feed(self, tokens, start, stop):
+        self.codes.update(tokens.kinds[start:stop])
+
+    def close(self, tokens):
+        pass
+
+    def counts(self):
+        return Counter({TOKEN_TYPES[code]: count for code, count in self.codes.items()})
+
+
+class SyntaxStage:
+    """
+    Corta los tokens en sentencias del nivel superior y analiza cada una con
+    el Parser en cuanto se completa: un ';' o una '}' fuera de toda llave y
+    paréntesis, salvo que el siguiente token visible sea 'else'. En esos
+    cortes el parser está siempre entre dos sentencias del programa, así
+    que los nodos y errores son los mismos que con parse() sobre el total.
+
+    Las sentencias terminadas se pasan a 'statements(lista)', si se indica.
+    """
+
+    def __init__(self, emit, statements=None):
+        self.emit = emit
+        self.statements = statements
+        self.body = []
+        self.errors = []
+        self.segment = 0
+        self.braces = 0
+        self.parens = 0
+        # Fin de un corte posible que espera al siguiente token visible
+        self.boundary = -1
+
+    def feed(self, tokens, start, stop):
+        # Solo se miran los delimitadores, que se buscan en los códigos de
+        # tipo como bytes
+        codes = tokens.kinds[start:stop].tobytes()
+        source, starts = tokens.source, tokens.starts
+        i = start
+        while True:
+            if self.boundary >= 0 and not self.resolve(tokens, stop):
+                return
+            found = codes.find(_DELIMITER_CODE, i - start)
+            if found < 0:
+                return
+            i = start + found
+            char = source[starts[i]]
+            if char == 0x3B:  # ;
+                if not self.braces and not self.parens:
+                    self.boundary = i + 1
+            elif char == 0x28:  # (
+                self.parens += 1
+            elif char == 0x29:  # )
+                if self.parens:
+                    self.parens -= 1
+            elif char == 0x7B:  # {
+                # Un paréntesis no puede abarcar un bloque: el parser ya
+                # informó el que quedó abierto
+                self.braces += 1
+                self.parens = 0
+            elif char == 0x7D:  # }
+                self.parens = 0
+                if self.braces:
+                    self.braces -= 1
+                if not self.braces:
+                    self.boundary = i + 1
+            i += 1
+
+    def resolve(self, tokens, stop):
+        # Decide el corte pendiente con el siguiente token visible; False si
+        # todavía no llegó
+        kinds = tokens.kinds
+        i = self.boundary
+        while i < stop and kinds[i] in _IGNORED:
+            i += 1
+        if i == stop:
+            return False
+        if kinds[i] != _KEYWORD or tokens.source[tokens.starts[i]:tokens.ends[i]] != b"else":
+            self.flush(tokens, self.boundary)
+        self.boundary = -1
+        return True
+
+    def close(self, tokens):
+        self.flush(tokens, len(tokens))
+
+    def flush(self, tokens, stop):
+        if stop <= self.segment:
+            return
+        program = Parser(tokens, self.segment, stop).parse()
+        self.segment = stop
+        self.body.extend(program.body)
+        errors = sorted(program.errors, key=lambda error: error[0])
+        self.errors.extend(errors)
+        for index, message in errors:
+            self.emit(Diagnostic("sintáctico", message, index, _offset(tokens, index)))
+        if self.statements is not None and program.body:
+            self.statements(program.body)
+
+
+class SemanticStage:
+    """
+    Verificación de ámbitos de las sentencias que entrega SyntaxStage.
+    """
+
+    def __init__(self, tokens, emit):
+        self.tokens = tokens
+        self.emit = emit
+        self.checker = ScopeChecker(tokens)
+        self.reported = 0
+
+    def statements(self, body):
+        self.checker.feed(body)
+        self.report()
+
+    def close(self):
+        self.checker.close()
+        self.report()
+
+    def report(self):
+        errors = self.checker.errors
+        for index, message in errors[self.reported:]:
+            self.emit(Diagnostic("semántico", message, index, _offset(self.tokens, index)))
+        self.reported = len(errors)
+
+
+def _offset(tokens, index):
+    return tokens.starts[index] if index < len(tokens) else len(tokens.source)
+
+
+class Pipeline:
+    """
+    Análisis léxico, sintáctico y semántico en una sola pasada.
+
+    El lexer llena el TokenBuffer y cada 'step' tokens empuja el tramo nuevo
+    a las etapas: el conteo, el análisis sintáctico (que corta sentencias y
+    las analiza) y el semántico (que verifica cada sentencia al recibirla).
+    Nada espera al final del texto: cada etapa retiene como mucho la
+    sentencia del nivel superior en curso. Los diagnósticos se avisan a los
+    observadores suscritos en cuanto se conocen y quedan en 'diagnostics'.
+    """
+
+    def __init__(self, text, compat=True, strip=True, syntax=True, semantic=True, backend="re"):
+        self.text = text
+        self.tokens = TokenBuffer(text.encode("utf-8"), compat)
+        self.pos = len(text) - len(text.lstrip()) if strip else 0
+        self.backend = backend
+        self.diagnostics = []
+        self.observers = []
+        self.counter = CountStage()
+        self.stages = [self.counter]
+        self.syntax = self.semantic = None
+        if syntax or semantic:
+            if semantic:
+                self.semantic = SemanticStage(self.tokens, self.publish)
+            self.syntax = SyntaxStage(self.publish, self.semantic.statements if semantic else None)
+            self.stages.append(self.syntax)
+
+    def subscribe(self, observer):
+        """
+        Registra 'observer(diagnostic)', que se llama por cada diagnóstico
+        desde el hilo que ejecuta run().
+        """
+        self.observers.append(observer)
+
+    def publish(self, diagnostic):
+        self.diagnostics.append(diagnostic)
+        for observer in self.observers:
+            observer(diagnostic)
+
+    def run(self, progress=None, step=DEFAULT_STEP):
+        """
+        Ejecuta el análisis completo y devuelve el propio Pipeline. Si se
+        indica 'progress', se llama con la posición alcanzada en el texto.
+        """
+        tokens = self.tokens
+        fed = 0
+
+        def push(position):
+            nonlocal fed
+            stop = len(tokens)
+            for stage in self.stages:
+                stage.feed(tokens, fed, stop)
+            fed = stop
+            if progress is not None:
+                progress(position)
+
+        tokens.extend_from(self.text, pos=self.pos, progress=push, step=step, backend=self.backend)
+        push(len(self.text))
+        for stage in self.stages:
+            stage.close(tokens)
+        if self.semantic is not None:
+            self.semantic.close()
+        return self
+
+    def counts(self):
+        return self.counter.counts()
+
+    @property
+    def program(self):
+        """
+        El Program armado con las sentencias de todos los tramos, igual al
+        de parse(tokens) salvo que los errores quedan ordenados por token.
+        """
+        program = Program(self.syntax.body, start=0, end=len(self.tokens))
+        program.errors = self.syntax.errors
+        return program
+
+    def syntax_report(self):
+        # Mismo texto que syntax_analyzer
+        return syntax_analyzer(self.tokens, self.program)
+
+    def semantic_report(self):
+        # Mismo texto que semantic_analyzer
+        if not self.tokens:
+            return "No hay tokens para analizar."
+        return semantic_report(self.semantic.checker.errors)
+
+
+def analyze_code(code, analysis_type="Léxico", progress=None, profiler=None):
+    """
+    El análisis de la ventana, sin la ventana: 'analysis_type' es "Léxico",
+    "Sintáctico" o "Semántico". Devuelve (tokens, conteo, resultado), con
+    resultado None, el informe sintáctico o el par (sintáctico, semántico).
+
+    Se analiza el texto sin recortar (saltando los espacios iniciales) para
+    que los desplazamientos coincidan con el editor. 'progress' se llama con
+    la posición alcanzada y puede lanzar una excepción para cancelar; las
+    etapas se miden en 'profiler' si se indica.
+    """
+    if analysis_type == "Léxico":
+        with measure(profiler, "léxico") as record:
+            tokens = TokenBuffer(code.encode("utf-8"), compat=True)
+            tokens.extend_from(code, pos=len(code) - len(code.lstrip()), progress=progress)
+            record.tokens = len(tokens)
+        with measure(profiler, "conteo") as record:
+            counts = tokens.counts()
+            record.tokens = len(tokens)
+        return tokens, counts, None
+
+    # Léxico, conteo, sintáctico y (si se pidió) semántico en una sola
+    # pasada sobre los tokens a medida que se generan
+    with measure(profiler, "análisis") as record:
+        pipeline = Pipeline(code, semantic=analysis_type == "Semántico").run(progress=progress)
+        tokens = pipeline.tokens
+        counts = pipeline.counts()
+        record.tokens = len(tokens)
+    # El árbol queda guardado para las vistas de notación y del árbol
+    analyze(tokens, pipeline.program)
+    result = pipeline.syntax_report()
+    if analysis_type == "Semántico":
+        result = (result, pipeline.semantic_report())
+    return tokens, counts, result
@@ -0,0 +1,142 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class StageRecord:
+    """
+    Medición de una etapa del análisis: tiempo de reloj, tokens procesados
+    y, si se pidió, memoria asignada (neta y máxima) durante la etapa.
+    """
+
+    __slots__ = ("name", "seconds", "tokens", "allocated", "peak")
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.tokens = None
+        self.allocated = None
+        self.peak = None
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"StageRecord({self.as_dict()!r})"
+
+
+class Profiler:
+    """
+    Instrumentación opcional de las etapas del análisis.
+
+    Cada etapa se mide dentro de 'with profiler.stage(nombre) as record:'; al
+    terminar se guarda el registro y se avisa a los observadores suscritos.
+    Con 'memory' se mide la memoria con tracemalloc y con 'profile' las
+    etapas se ejecutan bajo cProfile (ambos hacen el análisis más lento).
+    """
+
+    def __init__(self, memory=False, profile=False):
+        self.memory = memory
+        self.records = []
+        self.observers = []
+        self.profile = None
+        if profile:
+            # cProfile y tracemalloc se importan solo si se piden
+            import cProfile
+            self.profile = cProfile.Profile()
+
+    def subscribe(self, observer):
+        """
+        Registra 'observer(record)', que se llama al terminar cada etapa,
+        desde el hilo que la ejecutó.
+        """
+        self.observers.append(observer)
+
+    @contextmanager
+    def stage(self, name):
+        record = StageRecord(name)
+        started_tracing = False
+        if self.memory:
+            import tracemalloc
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        if self.profile is not None:
+            self.profile.enable()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - started
+            if self.profile is not None:
+                self.profile.disable()
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record.allocated = current - before
+                record.peak = peak - before
+                if started_tracing:
+                    tracemalloc.stop()
+            self.records.append(record)
+            for observer in self.observers:
+                observer(record)
+
+    def total(self):
+        return sum(record.seconds for record in self.records)
+
+    def summary(self):
+        """
+        Registros acumulados por nombre de etapa, en el orden de la primera
+        medición: los tiempos y tokens se suman y la memoria es la máxima.
+        """
+        stages = {}
+        for record in self.records:
+            total = stages.get(record.name)
+            if total is None:
+                total = stages[record.name] = StageRecord(record.name)
+            total.seconds += record.seconds
+            if record.tokens is not None:
+                total.tokens = (total.tokens or 0) + record.tokens
+            if record.allocated is not None:
+                total.allocated = (total.allocated or 0) + record.allocated
+                total.peak = max(total.peak or 0, record.peak)
+        return list(stages.values())
+
+    def report(self):
+        """
+        Tabla de texto con el desglose por etapa.
+        """
+        lines = [f"{'Etapa':<14}{'Segundos':>12}{'Tokens':>12}{'Tokens/s':>14}{'Memoria':>14}"]
+        for record in self.summary():
+            rate = f"{record.tokens / record.seconds:.0f}" if record.tokens and record.seconds else "-"
+            memory = format_bytes(record.peak) if record.peak is not None else "-"
+            tokens = record.tokens if record.tokens is not None else "-"
+            lines.append(f"{record.name:<14}{record.seconds:>12.6f}{tokens:>12}{rate:>14}{memory:>14}")
+        lines.append(f"{'Total':<14}{self.total():>12.6f}")
+        return "\n".join(lines)
+
+    def dump_stats(self, path):
+        """
+        Guarda las estadísticas de cProfile (para pstats o snakeviz).
+        """
+        if self.profile is None:
+            raise ValueError("el perfilador se creó sin profile=True")
+        self.profile.dump_stats(path)
+
+
+def measure(profiler, name):
+    """
+    profiler.stage(name), o un contexto que no mide nada si no hay
+    perfilador; así el código instrumentado no necesita distinguir ambos casos.
+    """
+    if profiler is None:
+        return nullcontext(StageRecord(name))
+    return profiler.stage(name)
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
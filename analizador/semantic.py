@@ -0,0 +1,156 @@
+from bisect import bisect_left
+
+from .parser import Assign, Block, Call, For, FunctionDecl, Member, Name, Node, VarDecl, location, parse
+from .symbols import SymbolTable
+
+# Acciones de la pila del recorrido, además de los nodos
+_OPEN, _CLOSE, _DECLARE, _ASSIGN = range(4)
+
+
+def semantic_analyzer(tokens, program=None):
+    """
+    Verifica declaraciones, inicializaciones y usos de variables sobre el
+    árbol de parse(tokens), o sobre 'program' si ya se tiene, con una tabla
+    de símbolos por ámbitos: cada bloque, función y 'for' abre uno nuevo.
+
+    Detecta redeclaraciones en el mismo ámbito, variables que ocultan a
+    otra exterior, usos fuera del ámbito de la declaración, usos sin
+    declarar o sin inicializar y variables sin usar en cada ámbito. Cada
+    nodo se visita una vez, así que el análisis es lineal.
+    """
+    if not tokens:
+        return "No hay tokens para analizar."
+    if program is None:
+        program = parse(tokens)
+    checker = ScopeChecker(tokens)
+    checker.feed(program.body)
+    checker.close()
+    return semantic_report(checker.errors)
+
+
+def semantic_report(errors):
+    # Texto del resultado a partir de los pares (índice, mensaje)
+    if not errors:
+        return "El análisis semántico no encontró errores."
+    return "\n".join(message for _, message in errors)
+
+
+class ScopeChecker:
+    """
+    Verificación de ámbitos incremental: se le pasan las sentencias del
+    nivel superior a medida que el parser las termina y close() cierra el
+    ámbito global. 'errors' acumula pares (índice del token, mensaje) en el
+    mismo orden en que los produce semantic_analyzer.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.starts = getattr(tokens, "starts", None)
+        self.table = SymbolTable()
+        self.table.push()
+        self.errors = []
+
+    def offset(self, index):
+        return self.starts[index] if self.starts is not None else index
+
+    def index(self, offset):
+        # Inverso de offset(): los inicios de los tokens están ordenados
+        return bisect_left(self.starts, offset) if self.starts is not None else offset
+
+    def declare(self, name, kind, index, initialized):
+        symbol, previous = self.table.declare(name, kind, self.offset(index), initialized)
+        if previous is None:
+            return
+        where = location(self.tokens, index)
+        if previous.depth == symbol.depth:
+            if previous.kind == kind == "función":
+                return  # prototipo y definición
+            self.errors.append((index, f"Error: La variable '{name}' ya ha sido declarada{where}."))
+        elif previous.kind != "función":
+            self.errors.append((index, f"Advertencia: La variable '{name}' oculta a otra de un ámbito "
+                                       f"exterior{where}."))
+
+    def use(self, name, index):
+        table = self.table
+        symbol = table.lookup(name)
+        if symbol is None:
+            where = location(self.tokens, index)
+            if name in table.closed:
+                self.errors.append((index, f"Error: La variable '{name}' se usa fuera del ámbito en que fue "
+                                           f"declarada{where}."))
+            else:
+                self.errors.append((index, f"Error: La variable '{name}' se usa sin haber sido declarada{where}."))
+            return
+        symbol.uses.append(self.offset(index))
+        if not symbol.initialized and symbol.kind == "variable":
+            self.errors.append((index, f"Advertencia: La variable '{name}' se usa posiblemente sin "
+                                       f"inicializar{location(self.tokens, index)}."))
+
+    def close(self):
+        """
+        Cierra el ámbito más interno (tras la última sentencia, el global) e
+        informa sus variables sin usar.
+        """
+        for symbol in self.table.pop():
+            if symbol.kind == "variable" and not symbol.uses:
+                self.errors.append((self.index(symbol.offset),
+                                    f"Advertencia: La variable '{symbol.name}' está declarada pero no se utiliza."))
+
+    def feed(self, statements):
+        """
+        Verifica las sentencias dadas en el ámbito global.
+        """
+        table = self.table
+        stack = list(reversed(statements))
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, Node):
+                action = node[0]
+                if action == _OPEN:
+                    table.push()
+                elif action == _CLOSE:
+                    self.close()
+                elif action == _DECLARE:
+                    self.declare(*node[1:])
+                else:
+                    symbol = table.lookup(node[1])
+                    if symbol is not None:
+                        symbol.initialized = True
+            elif isinstance(node, Name):
+                self.use(node.id, node.start)
+            elif isinstance(node, VarDecl):
+                # El valor se evalúa antes de que la variable exista
+                stack.append((_DECLARE, node.name, "variable", node.start, node.value is not None))
+                if node.value is not None:
+                    stack.append(node.value)
+            elif isinstance(node, Block):
+                stack.append((_CLOSE,))
+                stack.extend(reversed(node.body))
+                stack.append((_OPEN,))
+            elif isinstance(node, FunctionDecl):
+                # La función se declara en el ámbito que la contiene; los
+                # parámetros y el cuerpo comparten un ámbito propio
+                self.declare(node.name, "función", node.start, True)
+                stack.append((_CLOSE,))
+                if node.body is not None:
+                    stack.extend(reversed(node.body.body))
+                stack.extend((_DECLARE, param.name, "parámetro", param.start, True) for param in reversed(node.params))
+                stack.append((_OPEN,))
+            elif isinstance(node, For):
+                stack.append((_CLOSE,))
+                stack.extend(reversed(list(node.children())))
+                stack.append((_OPEN,))
+            elif isinstance(node, Assign) and isinstance(node.target, Name):
+                # Asignar inicializa la variable; con '+=' y similares el destino
+                # también se usa
+                stack.append((_ASSIGN, node.target.id))
+                if node.op != "=" or table.lookup(node.target.id) is None:
+                    stack.append(node.target)
+                stack.append(node.value)
+            elif isinstance(node, Call) and isinstance(node.func, Name):
+                # El nombre de la función llamada no es un uso de variable
+                stack.extend(reversed(node.args))
+            elif isinstance(node, Member):
+                stack.append(node.value)
+            else:
+                stack.extend(reversed(list(node.children())))
@@ -0,0 +1,326 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .buffer import TokenBuffer
+from .incremental import relex
+from .notation import analyze, generate_polish_notation, generate_reverse_polish_notation, parse_expression_to_tree
+from .semantic import semantic_analyzer
+from .syntax import syntax_analyzer
+
+# Espera tras un cambio antes de volver a analizar: las ediciones rápidas
+# se juntan en un solo relex
+DEFAULT_DEBOUNCE = 0.05
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RPCError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def _lexical(tokens, program):
+    return {"tokens": [[lexeme, kind] for lexeme, kind in tokens], "counts": dict(tokens.counts())}
+
+
+# Análisis que se pueden pedir sobre un documento: reciben el buffer y el
+# árbol ya construido y devuelven un valor serializable en JSON
+ANALYSES = {
+    "analizadorLexico": _lexical,
+    "syntax_analyzer": syntax_analyzer,
+    "semantic_analyzer": semantic_analyzer,
+    "generate_polish_notation": lambda tokens, program: generate_polish_notation(tokens),
+    "generate_reverse_polish_notation": lambda tokens, program: generate_reverse_polish_notation(tokens),
+    "parse_expression_to_tree": lambda tokens, program: parse_expression_to_tree(tokens),
+}
+
+
+class Document:
+    """
+    Documento abierto: el texto más reciente, el TokenBuffer que lo sigue
+    con relex y los resultados ya calculados para esa versión.
+    """
+
+    __slots__ = ("uri", "text", "version", "tokens", "synced", "timer", "lock", "results")
+
+    def __init__(self, uri, text, version=0):
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.tokens = None
+        # Texto que refleja 'tokens'; si no es 'text' hay cambios pendientes
+        self.synced = None
+        self.timer = None
+        self.lock = asyncio.Lock()
+        self.results = {}
+
+
+class AnalysisServer:
+    """
+    Servicio JSON-RPC 2.0 que mantiene los documentos abiertos en memoria.
+
+    Los mensajes son objetos JSON, uno por línea. Además de los métodos de
+    ANALYSES (con "uri" de un documento abierto o "text" suelto) se
+    atienden las notificaciones textDocument/didOpen, didChange y didClose.
+    El análisis corre en un pool de hilos para no bloquear el bucle de
+    eventos, y cada documento se modifica y analiza de a uno por vez.
+    """
+
+    def __init__(self, executor=None, debounce=DEFAULT_DEBOUNCE):
+        self.executor = executor or ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        self.debounce = debounce
+        self.documents = {}
+        # El bucle de eventos solo guarda referencias débiles a sus tareas:
+        # las sincronizaciones programadas quedan aquí hasta terminar
+        self.tasks = set()
+
+    async def run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def handle(self, message):
+        """
+        Atiende un mensaje ya decodificado y devuelve la respuesta, o None si
+        era una notificación.
+        """
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            return _error(message.get("id") if isinstance(message, dict) else None,
+                          INVALID_REQUEST, "mensaje JSON-RPC inválido")
+        request_id = message.get("id")
+        params = message.get("params") or {}
+        try:
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "los parámetros deben ser un objeto")
+            result = await self.dispatch(message["method"], params)
+        except RPCError as error:
+            return _error(request_id, error.code, str(error)) if "id" in message else None
+        except Exception as error:
+            return _error(request_id, INTERNAL_ERROR, f"{type(error).__name__}: {error}") if "id" in message else None
+        if "id" not in message:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    async def dispatch(self, method, params):
+        if method == "initialize":
+            return {"methods": sorted(ANALYSES), "debounce": self.debounce}
+        if method == "textDocument/didOpen":
+            return self.open(_param(params, "uri", str), _param(params, "text", str), params.get("version", 0))
+        if method == "textDocument/didChange":
+            return self.change(_param(params, "uri", str), params)
+        if method == "textDocument/didClose":
+            document = self.documents.pop(_param(params, "uri", str), None)
+            if document is not None and document.timer is not None:
+                document.timer.cancel()
+            return None
+        if method == "shutdown":
+            return None
+        analysis = ANALYSES.get(method)
+        if analysis is None:
+            raise RPCError(METHOD_NOT_FOUND, f"método desconocido: {method}")
+        if "uri" not in params:
+            # Texto suelto: se analiza sin guardarlo
+            text = _param(params, "text", str)
+            return await self.run(_analyze_text, analysis, text)
+        document = self.documents.get(_param(params, "uri", str))
+        if document is None:
+            raise RPCError(INVALID_PARAMS, f"documento no abierto: {params['uri']}")
+        return await self.analyze(document, method)
+
+    def open(self, uri, text, version):
+        previous = self.documents.get(uri)
+        if previous is not None and previous.timer is not None:
+            previous.timer.cancel()
+        document = self.documents[uri] = Document(uri, text, version)
+        self.schedule(document)
+        return None
+
+    def change(self, uri, params):
+        """
+        Aplica un cambio: 'text' reemplaza el documento completo y
+        'changes' es una lista de {"start", "end", "text"} con posiciones en
+        caracteres, aplicadas en orden. El reanálisis se pospone.
+        """
+        document = self.documents.get(uri)
+        if document is None:
+            raise RPCError(INVALID_PARAMS, f"documento no abierto: {uri}")
+        if "text" in params:
+            document.text = _param(params, "text", str)
+        else:
+            text = document.text
+            for change in _param(params, "changes", list):
+                try:
+                    start, end, new = int(change["start"]), int(change["end"]), str(change["text"])
+                except (KeyError, TypeError, ValueError):
+                    raise RPCError(INVALID_PARAMS, "cada cambio necesita 'start', 'end' y 'text'")
+                if not 0 <= start <= end <= len(text):
+                    raise RPCError(INVALID_PARAMS, f"rango fuera del documento: {start}-{end}")
+                text = text[:start] + new + text[end:]
+            document.text = text
+        document.version = params.get("version", document.version + 1)
+        self.schedule(document)
+        return None
+
+    def schedule(self, document):
+        if document.timer is not None:
+            document.timer.cancel()
+        loop = asyncio.get_running_loop()
+        document.timer = loop.call_later(self.debounce, self._start_sync, loop, document)
+
+    def _start_sync(self, loop, document):
+        task = loop.create_task(self.sync(document))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def sync(self, document):
+        """
+        Pone el buffer del documento al día con su texto, si hace falta.
+        """
+        if document.timer is not None:
+            document.timer.cancel()
+            document.timer = None
+        async with document.lock:
+            text = document.text
+            if text is document.synced:
+                return
+            if document.tokens is None:
+                document.tokens = await self.run(TokenBuffer.from_source, text, True, True)
+            else:
+                await self.run(relex, document.tokens, text, True)
+            document.synced = text
+            document.results = {}
+
+    async def analyze(self, document, method):
+        # Una petición sobre un documento con cambios pendientes no espera
+        # al temporizador: se sincroniza en el momento
+        await self.sync(document)
+        async with document.lock:
+            results = document.results
+            if method not in results:
+                results[method] = await self.run(_analyze_buffer, ANALYSES[method], document.tokens)
+            return results[method]
+
+    async def serve(self, reader, writer):
+        """
+        Atiende una conexión: lee mensajes línea por línea y responde a cada
+        uno en cuanto termina, sin esperar a los anteriores.
+        """
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(message):
+            response = await self.handle(message)
+            if response is not None:
+                await send(response)
+
+        async def send(response):
+            async with write_lock:
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError as error:
+                    await send(_error(None, PARSE_ERROR, f"JSON inválido: {error}"))
+                    continue
+                if isinstance(message, dict) and message.get("method") == "exit":
+                    break
+                task = asyncio.create_task(respond(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+
+def _analyze_buffer(analysis, tokens):
+    return analysis(tokens, analyze(tokens).program)
+
+
+def _analyze_text(analysis, text):
+    return _analyze_buffer(analysis, TokenBuffer.from_source(text, compat=True, strip=True))
+
+
+def _param(params, name, expected):
+    value = params.get(name)
+    if not isinstance(value, expected):
+        raise RPCError(INVALID_PARAMS, f"falta el parámetro '{name}' o no es válido")
+    return value
+
+
+def _error(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class _StdioStream:
+    # stdin/stdout pueden ser archivos, que los transportes de asyncio no
+    # admiten: se leen en un hilo aparte y se escriben directamente
+
+    def __init__(self):
+        self.stdin = sys.stdin.buffer
+        self.stdout = sys.stdout.buffer
+
+    async def readline(self):
+        return await asyncio.get_running_loop().run_in_executor(None, self.stdin.readline)
+
+    def write(self, data):
+        self.stdout.write(data)
+
+    async def drain(self):
+        self.stdout.flush()
+
+    def close(self):
+        self.stdout.flush()
+
+
+async def serve_stdio(server):
+    stream = _StdioStream()
+    await server.serve(stream, stream)
+
+
+async def serve_unix(server, path):
+    if os.path.exists(path):
+        os.unlink(path)
+    unix_server = await asyncio.start_unix_server(server.serve, path, limit=1 << 30, backlog=1024)
+    print(f"Escuchando en {path}", file=sys.stderr)
+    async with unix_server:
+        await unix_server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m analizador.server",
+        description="Servicio JSON-RPC (un mensaje por línea) que mantiene los documentos analizados en memoria.")
+    parser.add_argument("--socket", metavar="RUTA", help="escuchar en un socket Unix en lugar de stdin/stdout")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hilos de análisis")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="segundos de espera tras un cambio antes de reanalizar")
+    args = parser.parse_args(argv)
+
+    server = AnalysisServer(ThreadPoolExecutor(max_workers=max(1, args.workers)), args.debounce)
+    try:
+        asyncio.run(serve_unix(server, args.socket) if args.socket else serve_stdio(server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown(wait=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import codecs
+import os
+
+from .lexer import _WHITESPACE, _pattern
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def _read_chunks(fileobj, chunk_size, encoding):
+    # Acepta archivos de texto o binarios; los binarios se decodifican de
+    # forma incremental para no partir un carácter multibyte entre bloques
+    decoder = None
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)()
+            text = decoder.decode(chunk, final=not chunk)
+            if text:
+                yield text
+        elif chunk:
+            yield chunk
+        if not chunk:
+            return
+
+
+def iter_tokens(source, chunk_size=DEFAULT_CHUNK_SIZE, compat=False, encoding="utf-8"):
+    """
+    Genera los tokens (lexema, tipo) de un archivo leyéndolo por bloques.
+
+    'source' puede ser una ruta o un objeto archivo. Solo se mantiene en
+    memoria la línea en curso (o el comentario de bloque sin cerrar), de
+    modo que el consumo no crece con el tamaño del archivo.
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, encoding=encoding, newline="") as fileobj:
+            yield from iter_text_chunks(_read_chunks(fileobj, chunk_size, encoding), compat)
+    else:
+        yield from iter_text_chunks(_read_chunks(source, chunk_size, encoding), compat)
+
+
+def iter_text_chunks(chunks, compat=False):
+    """
+    Analiza una secuencia de fragmentos de texto como si fueran un único
+    texto y genera los mismos tokens que tokenize sobre el texto completo.
+    """
+    pattern, kinds = _pattern(compat)
+    pending = []
+    buffer = ""
+    at_start = True
+    # Si un comentario de bloque queda abierto, no se vuelve a analizar
+    # hasta que llegue un bloque con su cierre
+    waiting_close = False
+    last_char = ""
+
+    for chunk in _with_end(chunks):
+        eof = chunk is None
+        if not eof:
+            pending.append(chunk)
+            closes = "*/" in chunk or (last_char == "*" and chunk[0] == "/")
+            last_char = chunk[-1]
+            if waiting_close:
+                if not closes:
+                    continue
+                waiting_close = False
+            if "\n" not in chunk:
+                continue
+        buffer = buffer + "".join(pending)
+        pending.clear()
+
+        # Solo se emiten tokens que terminan antes del último salto de línea:
+        # ningún token sin cerrar puede cruzarlo, salvo un comentario de bloque
+        limit = len(buffer) if eof else buffer.rfind("\n") + 1
+        pos = 0
+        if not (compat and at_start):
+            pos = _WHITESPACE.match(buffer).end()
+        at_start = False
+
+        for match in iter(pattern.scanner(buffer, pos).match, None):
+            group = match.lastindex
+            start, end = match.span(group)
+            kind = kinds[match.lastgroup]
+            if not eof:
+                block_comment = not compat and buffer.startswith("/*", start)
+                if kind == "ERROR" and block_comment:
+                    waiting_close = True
+                    break
+                if end > limit and not (kind == "COMENTARIO" and block_comment):
+                    break
+            yield buffer[start:end], kind
+            pos = match.end()
+        else:
+            pos = len(buffer)
+
+        buffer = buffer[pos:]
+
+
+def _with_end(chunks):
+    yield from chunks
+    yield None
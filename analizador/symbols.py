@@ -0,0 +1,84 @@
+from sys import intern
+
+
+class Symbol:
+    """
+    Un nombre declarado: su tipo ("variable", "parámetro" o "función"), la
+    profundidad del ámbito, si ya tiene valor y los sitios de declaración y
+    de uso como desplazamientos (bytes en un TokenBuffer, índices de token
+    en una lista).
+    """
+
+    __slots__ = ("name", "kind", "depth", "offset", "initialized", "uses")
+
+    def __init__(self, name, kind, depth, offset, initialized=False):
+        self.name = name
+        self.kind = kind
+        self.depth = depth
+        self.offset = offset
+        self.initialized = initialized
+        self.uses = []
+
+    def __repr__(self):
+        return f"Symbol({self.name!r}, {self.kind!r}, depth={self.depth}, offset={self.offset})"
+
+
+class SymbolTable:
+    """
+    Tabla de símbolos con una pila de ámbitos que se abre y cierra con cada
+    bloque. Cada nombre (internado) apunta a la pila de sus declaraciones
+    visibles, así que declarar, buscar y cerrar un ámbito cuestan O(1) por
+    símbolo sin recorrer los ámbitos abiertos.
+    """
+
+    def __init__(self):
+        self.bindings = {}
+        self.scopes = []
+        # Última declaración de cada nombre en un ámbito ya cerrado
+        self.closed = {}
+        self.symbols = []
+
+    @property
+    def depth(self):
+        return len(self.scopes)
+
+    def push(self):
+        self.scopes.append([])
+
+    def pop(self):
+        """
+        Cierra el ámbito más interno y devuelve sus símbolos en orden de
+        declaración.
+        """
+        scope = self.scopes.pop()
+        bindings = self.bindings
+        closed = self.closed
+        for symbol in reversed(scope):
+            chain = bindings[symbol.name]
+            chain.pop()
+            if not chain:
+                del bindings[symbol.name]
+            closed[symbol.name] = symbol
+        return scope
+
+    def declare(self, name, kind, offset, initialized=False):
+        """
+        Declara 'name' en el ámbito actual. Devuelve el símbolo nuevo y la
+        declaración visible que había antes con ese nombre (None si no había).
+        """
+        name = intern(name)
+        symbol = Symbol(name, kind, len(self.scopes), offset, initialized)
+        chain = self.bindings.get(name)
+        if chain is None:
+            previous = None
+            self.bindings[name] = [symbol]
+        else:
+            previous = chain[-1]
+            chain.append(symbol)
+        self.scopes[-1].append(symbol)
+        self.symbols.append(symbol)
+        return symbol, previous
+
+    def lookup(self, name):
+        chain = self.bindings.get(name)
+        return chain[-1] if chain else None
@@ -0,0 +1,19 @@
+from .parser import parse
+
+
+def syntax_analyzer(tokens, program=None):
+    """
+    Verifica estructuras de control, declaraciones, asignaciones,
+    expresiones y el anidamiento de delimitadores con el parser de
+    analizador.parser, que se recupera de cada error y sigue, así que el
+    análisis es lineal e informa todos los errores. Si ya se tiene el
+    resultado de parse(tokens) se puede pasar como 'program'.
+    """
+    if not tokens:
+        return "No hay tokens para analizar."
+    if program is None:
+        program = parse(tokens)
+    if not program.errors:
+        return "El análisis sintáctico no encontró errores."
+    errors = sorted(program.errors, key=lambda error: error[0])
+    return "\n".join(message for _, message in errors)
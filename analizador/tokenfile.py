@@ -0,0 +1,280 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter
+from operator import add, sub
+
+from .buffer import LineIndex, TokenBuffer
+from .lexer import TOKEN_TYPES
+
+FORMAT_VERSION = 1
+
+_MAGIC = b"ATOK"
+# Firma, versión del formato y tamaño del encabezado JSON
+_PREFIX = struct.Struct("<4sHI")
+# Las columnas empiezan alineadas para poder verlas como arrays sin copiarlas
+_ALIGN = 8
+
+
+def _aligned(offset, alignment=_ALIGN):
+    return -(-offset // alignment) * alignment
+
+
+def source_hash(source):
+    """
+    Hash SHA-256 del código fuente (str o bytes UTF-8) que guarda el
+    encabezado.
+    """
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    return hashlib.sha256(source).hexdigest()
+
+
+def save_tokens(tokens, path, strings=True):
+    """
+    Guarda un TokenBuffer (o un TokenStream) en 'path'.
+
+    El archivo tiene un encabezado con la versión del formato, la tabla de
+    tipos, el modo de las reglas y el hash del código fuente, seguido de
+    tres columnas: el código de tipo de cada token, su desplazamiento en
+    bytes y su largo. Con 'strings' se agrega la tabla de textos (el código
+    fuente en UTF-8, al que apuntan los desplazamientos); sin ella el
+    archivo es mucho más chico, pero para leer los lexemas hay que pasar el
+    código al cargarlo.
+    """
+    source = tokens.source
+    if source is None:
+        raise ValueError("los tokens no tienen el código fuente")
+    starts = tokens.starts
+    typecode = getattr(starts, "typecode", None) or starts.format
+    lengths = getattr(tokens, "lengths", None)
+    if lengths is None:
+        lengths = array(typecode, map(sub, tokens.ends, starts))
+    count = len(tokens)
+    itemsize = array(typecode).itemsize
+
+    # Desplazamientos de cada sección desde el inicio del archivo; la tabla
+    # de textos se alinea a la granularidad de mmap para mapearla sola
+    sections = {}
+    header = b""
+    while True:
+        offset = _aligned(_PREFIX.size + len(header))
+        layout = {}
+        for name, size in (("kinds", count), ("starts", count * itemsize), ("lengths", count * itemsize)):
+            layout[name] = offset
+            offset = _aligned(offset + size)
+        if strings:
+            layout["strings"] = _aligned(offset, mmap.ALLOCATIONGRANULARITY)
+        if layout == sections:
+            break
+        sections = layout
+        header = json.dumps({
+            "kinds": list(TOKEN_TYPES),
+            "compat": tokens.compat,
+            "count": count,
+            "typecode": typecode,
+            "byteorder": sys.byteorder,
+            "source_size": len(source),
+            "source_sha256": source_hash(source),
+            "sections": sections,
+        }).encode("utf-8")
+
+    # Se escribe a un temporal y se renombra para no dejar archivos a medias
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as output:
+        output.write(_PREFIX.pack(_MAGIC, FORMAT_VERSION, len(header)))
+        output.write(header)
+        for name, column in (("kinds", tokens.kinds), ("starts", starts), ("lengths", lengths)):
+            output.write(b"\0" * (sections[name] - output.tell()))
+            output.write(memoryview(column).cast("B"))
+        if strings:
+            output.write(b"\0" * (sections["strings"] - output.tell()))
+            output.write(source)
+    os.replace(temporary, path)
+
+
+def load_tokens(path, source=None):
+    """
+    Abre un archivo de save_tokens como TokenStream. Si el archivo no
+    incluye la tabla de textos, 'source' es el código (str o bytes) del que
+    salieron los tokens; se comprueba contra el hash del encabezado. El
+    TokenStream se cierra con close() o usándolo en un bloque 'with'.
+    """
+    return TokenStream(path, source)
+
+
+class TokenStream:
+    """
+    Tokens de un archivo de save_tokens, leídos sobre el archivo mapeado en
+    memoria: cargarlo no recorre los tokens y cada lexema se decodifica
+    solo cuando se pide.
+
+    Se recorre como pares (lexema, tipo) y tiene la misma interfaz de
+    lectura que TokenBuffer (kinds, starts, source, position, counts...),
+    así que los analizadores lo aceptan tal cual. Es de solo lectura; para
+    modificarlo con relex se convierte con to_buffer().
+    """
+
+    def __init__(self, path, source=None):
+        with open(path, "rb") as fileobj:
+            # Un archivo vacío no se puede mapear: se informa como formato inválido
+            if os.fstat(fileobj.fileno()).st_size < _PREFIX.size:
+                raise ValueError(f"{path} no es un archivo de tokens")
+            self.file = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.file[:len(_MAGIC)] != _MAGIC:
+                self.file.close()
+                raise ValueError(f"{path} no es un archivo de tokens")
+            _, version, header_size = _PREFIX.unpack_from(self.file)
+            if version > FORMAT_VERSION:
+                self.file.close()
+                raise ValueError(f"{path} usa la versión {version} del formato; esta es la {FORMAT_VERSION}")
+            header = json.loads(self.file[_PREFIX.size:_PREFIX.size + header_size])
+            sections = header["sections"]
+            strings = sections.get("strings")
+            if strings is not None and strings % mmap.ALLOCATIONGRANULARITY == 0 and header["source_size"]:
+                # La tabla de textos se mapea aparte y queda como código fuente
+                embedded = mmap.mmap(fileobj.fileno(), header["source_size"], access=mmap.ACCESS_READ,
+                                     offset=strings)
+            elif strings is not None:
+                embedded = self.file[strings:strings + header["source_size"]]
+            else:
+                embedded = None
+
+        if embedded is None and source is not None:
+            if isinstance(source, str):
+                source = source.encode("utf-8")
+            if source_hash(source) != header["source_sha256"]:
+                self.file.close()
+                raise ValueError("el código fuente no es el que produjo estos tokens")
+            embedded = bytes(source)
+
+        self.header = header
+        self.compat = header["compat"]
+        count = header["count"]
+        typecode = header["typecode"]
+        itemsize = array(typecode).itemsize
+        view = memoryview(self.file)
+        self.kinds = view[sections["kinds"]:sections["kinds"] + count]
+        if tuple(header["kinds"]) != TOKEN_TYPES:
+            # Tabla de tipos de otra versión: los códigos se traducen a los actuales
+            table = bytearray(range(256))
+            for code, kind in enumerate(header["kinds"]):
+                table[code] = TOKEN_TYPES.index(kind)
+            stored = self.kinds
+            self.kinds = memoryview(stored.tobytes().translate(table))
+            stored.release()
+        self.starts = self._column(view, sections["starts"], count, typecode, itemsize)
+        self.lengths = self._column(view, sections["lengths"], count, typecode, itemsize)
+
+        self.source = embedded
+        self.data = memoryview(embedded) if embedded is not None else None
+        self._ends = None
+        self._lines = None
+
+    def close(self):
+        """
+        Libera el archivo mapeado. Las vistas que devolvió span() tienen
+        que liberarse antes; un TokenBuffer de to_buffer() sigue valiendo.
+        """
+        for view in (self.kinds, self.starts, self.lengths, self.data):
+            if isinstance(view, memoryview):
+                view.release()
+        if isinstance(self.source, mmap.mmap):
+            self.source.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _column(self, view, offset, count, typecode, itemsize):
+        column = view[offset:offset + count * itemsize].cast(typecode)
+        if self.header["byteorder"] != sys.byteorder:
+            column = array(typecode, column)
+            column.byteswap()
+        return column
+
+    @property
+    def ends(self):
+        # Los fines no se guardan: se calculan la primera vez que se piden
+        if self._ends is None:
+            self._ends = array(self.header["typecode"], map(add, self.starts, self.lengths))
+        return self._ends
+
+    def _text(self, start, length):
+        if self.source is None:
+            raise ValueError("el archivo no incluye el código fuente: indique 'source' al cargarlo")
+        return self.source[start:start + length].decode("utf-8")
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.kinds)))]
+        return self.lexeme(index), TOKEN_TYPES[self.kinds[index]]
+
+    def __iter__(self):
+        return self.iter_range()
+
+    def iter_range(self, start=0, stop=None):
+        """
+        Recorre los tokens en [start, stop) como pares (lexema, tipo).
+        """
+        if self.source is None:
+            self._text(0, 0)
+        source = self.source
+        kinds, starts, lengths = self.kinds[start:stop], self.starts[start:stop], self.lengths[start:stop]
+        for code, begin, length in zip(kinds, starts, lengths):
+            yield source[begin:begin + length].decode("utf-8"), TOKEN_TYPES[code]
+
+    def span(self, index):
+        start = self.starts[index]
+        return self.data[start:start + self.lengths[index]]
+
+    def lexeme(self, index):
+        return self._text(self.starts[index], self.lengths[index])
+
+    def kind(self, index):
+        return TOKEN_TYPES[self.kinds[index]]
+
+    def counts(self):
+        """
+        Conteo por tipo de token, en el orden de primera aparición.
+        """
+        codes = self.kinds.tobytes()
+        present = sorted((code for code in range(len(TOKEN_TYPES)) if bytes((code,)) in codes),
+                         key=lambda code: codes.find(bytes((code,))))
+        return Counter({TOKEN_TYPES[code]: codes.count(bytes((code,))) for code in present})
+
+    def position(self, index):
+        """
+        Devuelve (línea, columna) del inicio del token, ambas desde 1.
+        """
+        if self._lines is None:
+            if self.source is None:
+                self._text(0, 0)
+            self._lines = LineIndex(self.source, self.header["typecode"])
+        return self._lines.position(self.starts[index])
+
+    def to_buffer(self):
+        """
+        Copia los tokens y el código a un TokenBuffer modificable, sin
+        volver a analizar el código; el buffer no depende del archivo, que
+        se puede cerrar.
+        """
+        if self.source is None:
+            self._text(0, 0)
+        buffer = TokenBuffer(bytes(self.source), self.compat)
+        if buffer.starts.typecode != self.header["typecode"]:
+            buffer.starts = array(self.header["typecode"])
+        buffer.kinds.frombytes(self.kinds)
+        buffer.starts.frombytes(memoryview(self.starts).cast("B"))
+        buffer.ends = array(buffer.starts.typecode, self.ends)
+        return buffer
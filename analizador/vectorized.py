@@ -0,0 +1,276 @@
+import re
+from bisect import bisect_left
+from collections import Counter
+
+from .lexer import KEYWORDS, TOKEN_TYPES, _pattern
+from .lexer import tokenize as _scalar_tokenize
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin ella se usa el analizador escalar
+    np = None
+
+AVAILABLE = np is not None
+
+# Por debajo de este tamaño el costo fijo de NumPy supera la ganancia
+MIN_SIZE = 1 << 12
+
+_KEYWORD, _IDENTIFIER, _NUMBER, _OPERATOR, _DELIMITER = range(5)
+_ERROR = TOKEN_TYPES.index("ERROR")
+_NONE = 255     # la posición no inicia un token
+_ANCHOR = 254   # inicio de un string o comentario: lo resuelve el analizador escalar
+
+_KEYWORD_LENGTH = max(map(len, KEYWORDS))
+
+# Clases de byte; _WIDE es el primer byte de un carácter no ASCII y _TAIL
+# los bytes que lo continúan
+_SPACE, _LETTER, _DIGIT, _OP, _DELIM, _QUOTE, _OTHER, _WIDE, _TAIL = range(9)
+
+
+def _class_table():
+    table = bytearray([_OTHER]) * 128 + bytearray([_TAIL]) * 64 + bytearray([_WIDE]) * 64
+    for code in range(128):
+        char = chr(code)
+        if re.match(r"\s", char):
+            table[code] = _SPACE
+        elif char.isalpha() or char == "_":
+            table[code] = _LETTER
+        elif char.isdigit():
+            table[code] = _DIGIT
+        elif char in "+-*/=<>!":
+            table[code] = _OP
+        elif char in ";,.(){}[]":
+            table[code] = _DELIM
+        elif char == '"':
+            table[code] = _QUOTE
+    return bytes(table)
+
+
+_CLASSES = _class_table()
+
+
+def _runs(mask):
+    # Inicios y fines de los tramos consecutivos en True: los cambios de
+    # valor alternan entre inicio y fin
+    padded = np.zeros(len(mask) + 2, dtype=bool)
+    padded[1:-1] = mask
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def _keyword_keys():
+    # Cada palabra clave empaquetada en un entero (un byte por carácter)
+    return np.array([int.from_bytes(word.encode("ascii"), "little") for word in KEYWORDS], dtype=np.uint64)
+
+
+def _prescan(data, compat):
+    """
+    Tokens de 'data' (UTF-8) calculados con operaciones vectoriales, como
+    arrays (inicios, fines, tipos). Los strings, comentarios y caracteres no
+    ASCII quedan marcados con _ANCHOR para que los resuelva el analizador
+    escalar.
+    """
+    size = len(data)
+    codes = np.frombuffer(data, dtype=np.uint8)
+    classes = np.frombuffer(_CLASSES, dtype=np.uint8)[codes]
+    padded = np.concatenate((codes, np.zeros(8, dtype=np.uint8)))
+
+    anchor = (classes == _QUOTE) | (classes == _WIDE)
+    if not compat:
+        following = padded[1:size + 1]
+        anchor |= (codes == ord("/")) & ((following == ord("/")) | (following == ord("*")))
+
+    kind_at = np.full(size, _NONE, dtype=np.uint8)
+    end_at = np.zeros(size, dtype=np.int64)
+
+    def mark(starts, ends, kind):
+        kind_at[starts] = kind
+        end_at[starts] = ends
+
+    # Caracteres sueltos: delimitadores, errores e inicios ambiguos
+    for mask, kind in ((classes == _DELIM, _DELIMITER), (classes == _OTHER, _ERROR), (anchor, _ANCHOR)):
+        positions = np.flatnonzero(mask)
+        mark(positions, positions + 1, kind)
+    if compat and size and classes[0] == _SPACE:
+        # El original marca como ERROR el primer espacio del texto
+        mark(0, 1, _ERROR)
+
+    # Operadores: un token por tramo, cortado en los inicios de comentario
+    starts, ends = _runs((classes == _OP) & ~anchor)
+    mark(starts, ends, _OPERATOR)
+
+    # Palabras: identificadores, palabras clave y números
+    starts, ends = _runs((classes == _LETTER) | (classes == _DIGIT))
+    letters = np.flatnonzero(classes == _LETTER)
+    if len(letters):
+        index = np.searchsorted(letters, starts)
+        first_letter = np.where(index < len(letters), letters[np.minimum(index, len(letters) - 1)], size)
+    else:
+        first_letter = np.full(len(starts), size, dtype=np.int64)
+    first_letter = np.minimum(first_letter, ends)
+    pure = first_letter == ends
+
+    # Con letras: los dígitos iniciales no cumplen '\b' y son un ERROR cada
+    # uno; desde la primera letra es un identificador o una palabra clave
+    mixed = ~pure
+    word_starts, word_ends = first_letter[mixed], ends[mixed]
+    lengths = word_ends - word_starts
+    keys = np.zeros(len(word_starts), dtype=np.uint64)
+    for offset in range(_KEYWORD_LENGTH):
+        byte = padded[word_starts + offset].astype(np.uint64)
+        keys |= np.where(lengths > offset, byte, 0).astype(np.uint64) << np.uint64(8 * offset)
+    keyword = (lengths <= _KEYWORD_LENGTH) & np.isin(keys, _keyword_keys())
+    mark(word_starts, word_ends, np.where(keyword, _KEYWORD, _IDENTIFIER).astype(np.uint8))
+
+    leading = np.zeros(size + 1, dtype=np.int32)
+    leading[starts[mixed]] += 1
+    leading[first_letter[mixed]] -= 1
+    digits = np.flatnonzero(np.cumsum(leading[:size]) > 0)
+    mark(digits, digits + 1, _ERROR)
+
+    # Solo dígitos: un número, que se une con el siguiente si los separa un
+    # punto; en una cadena como 1.2.3 se unen de a pares desde la izquierda
+    number_starts, number_ends = starts[pure], ends[pure]
+    mark(number_starts, number_ends, _NUMBER)
+    if len(number_starts) > 1:
+        joins = np.zeros(len(number_starts), dtype=bool)
+        joins[:-1] = (padded[number_ends[:-1]] == ord(".")) & (number_starts[1:] == number_ends[:-1] + 1)
+        index = np.arange(len(joins))
+        chain_start = joins & ~np.concatenate(([False], joins[:-1]))
+        first = np.maximum.accumulate(np.where(chain_start, index, 0))
+        selected = np.flatnonzero(joins & ((index - first) % 2 == 0))
+        end_at[number_starts[selected]] = number_ends[selected + 1]
+        kind_at[number_ends[selected]] = _NONE
+        kind_at[number_starts[selected + 1]] = _NONE
+
+    starts = np.flatnonzero(kind_at != _NONE)
+    return starts, end_at[starts], kind_at[starts]
+
+
+def scan_arrays(text, compat=False, pos=0):
+    """
+    Tokens del texto desde 'pos' como tres arrays de NumPy (inicios, fines,
+    códigos de tipo), con desplazamientos en bytes sobre el texto
+    codificado en UTF-8 (en texto ASCII coinciden con los caracteres).
+
+    Las palabras, números, operadores y delimitadores se delimitan con
+    operaciones vectoriales sobre los bytes. Los strings, comentarios y
+    caracteres no ASCII se analizan con la expresión maestra, y el recorrido
+    vectorial se retoma en el primer token que vuelve a coincidir. Devuelve
+    None si NumPy no está instalado.
+    """
+    if np is None:
+        return None
+    if not compat:
+        pos = len(text) - len(text[pos:].lstrip())
+    data = text.encode("utf-8")
+    ascii_text = len(data) == len(text)
+    base = pos if ascii_text else len(text[:pos].encode("utf-8"))
+    starts, ends, kinds = _prescan(data[base:], compat)
+    starts += base
+    ends += base
+
+    anchors = np.flatnonzero(kinds == _ANCHOR).tolist()
+    if not anchors:
+        return starts, ends, kinds
+
+    if ascii_text:
+        char_bytes = None
+    else:
+        # Desplazamiento en bytes de cada carácter, para pasar de las
+        # posiciones de la expresión regular a las del recorrido vectorial
+        codes = np.frombuffer(data, dtype=np.uint8)
+        char_bytes = np.flatnonzero((codes & 0xC0) != 0x80).tolist()
+        char_bytes.append(len(data))
+
+    pattern, groups = _pattern(compat)
+    codes = {group: TOKEN_TYPES.index(kind) for group, kind in groups.items()}
+    match = pattern.match
+    start_list = starts.tolist()
+    kind_list = kinds.tolist()
+    size = len(text)
+    count = len(start_list)
+    # Tramos [desde, hasta) de tokens vectoriales que se conservan y tokens
+    # escalares que ocupan los huecos
+    kept_from, kept_to = [], []
+    scalar_starts, scalar_ends, scalar_kinds = [], [], []
+    current = 0
+    for anchor in anchors:
+        if anchor < current:
+            continue
+        first = anchor
+        if data[start_list[anchor]] >= 0x80:
+            # Un carácter no ASCII puede cambiar los tokens anteriores: romper
+            # el '\b' de una palabra, continuar un número o ser un espacio
+            # que consume el token previo. Se reanaliza desde dos tokens antes.
+            first = max(current, anchor - 2)
+        kept_from.append(current)
+        kept_to.append(first)
+
+        # Tokens escalares hasta caer en el inicio de un token vectorial
+        position = start_list[first]
+        if char_bytes is not None:
+            position = bisect_left(char_bytes, position)
+        current = count
+        while position < size:
+            found = match(text, position)
+            group = found.lastindex
+            token_start, token_end, position = found.start(group), found.end(group), found.end()
+            if char_bytes is not None:
+                token_start, token_end = char_bytes[token_start], char_bytes[token_end]
+                resume = char_bytes[position]
+            else:
+                resume = position
+            scalar_starts.append(token_start)
+            scalar_ends.append(token_end)
+            scalar_kinds.append(codes[found.lastgroup])
+            index = bisect_left(start_list, resume)
+            if anchor < index < count and start_list[index] == resume and kind_list[index] != _ANCHOR:
+                current = index
+                break
+    kept_from.append(current)
+    kept_to.append(count)
+
+    depth = np.cumsum(np.bincount(kept_from, minlength=count + 1) - np.bincount(kept_to, minlength=count + 1))
+    kept = depth[:count] > 0
+    starts = np.concatenate((starts[kept], np.array(scalar_starts, dtype=np.int64)))
+    order = np.argsort(starts, kind="stable")
+    return (starts[order],
+            np.concatenate((ends[kept], np.array(scalar_ends, dtype=np.int64)))[order],
+            np.concatenate((kinds[kept], np.array(scalar_kinds, dtype=np.uint8)))[order])
+
+
+def extend_buffer(buffer, text, pos=0):
+    """
+    Agrega a 'buffer' los tokens de 'text' usando scan_arrays. Devuelve
+    False, sin tocar el buffer, si hay que usar el analizador escalar.
+    """
+    if len(text) < MIN_SIZE:
+        return False
+    arrays = scan_arrays(text, buffer.compat, pos)
+    if arrays is None:
+        return False
+    starts, ends, kinds = arrays
+    offset_type = np.dtype(f"u{buffer.starts.itemsize}")
+    buffer.kinds.frombytes(kinds.astype(np.uint8).tobytes())
+    buffer.starts.frombytes(starts.astype(offset_type).tobytes())
+    buffer.ends.frombytes(ends.astype(offset_type).tobytes())
+    return True
+
+
+def tokenize(text, compat=False):
+    """
+    Igual que lexer.tokenize; usa el recorrido vectorial cuando se puede.
+    """
+    arrays = scan_arrays(text, compat) if len(text) >= MIN_SIZE else None
+    if arrays is None:
+        return _scalar_tokenize(text, compat)
+    starts, ends, kinds = arrays
+    if text.isascii():
+        results = [(text[start:end], TOKEN_TYPES[kind])
+                   for start, end, kind in zip(starts.tolist(), ends.tolist(), kinds.tolist())]
+    else:
+        data = text.encode("utf-8")
+        results = [(data[start:end].decode("utf-8"), TOKEN_TYPES[kind])
+                   for start, end, kind in zip(starts.tolist(), ends.tolist(), kinds.tolist())]
+    return results, Counter(kind for _, kind in results)
@@ -0,0 +1,104 @@
+import random
+
+SHAPES = ("programa", "linea_larga", "anidado", "comentarios", "strings", "errores")
+
+_TYPES = ("int", "float", "char")
+_OPERATORS = ("+", "-", "*", "/")
+_COMPARISONS = ("<", ">", "==", "!=", "<=", ">=")
+_WORDS = ("hola", "mundo", "valor", "total", "suma", "índice", "árbol", "resultado")
+
+
+class _Generator:
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.names = [f"{prefix}{i}" for prefix in ("x", "y", "total", "valor", "i") for i in range(8)]
+
+    def name(self):
+        return self.random.choice(self.names)
+
+    def operand(self):
+        if self.random.random() < 0.3:
+            return f"{self.random.randint(0, 999)}.{self.random.randint(0, 99)}"
+        if self.random.random() < 0.5:
+            return str(self.random.randint(0, 9999))
+        return self.name()
+
+    def expression(self, depth=2):
+        if depth <= 0 or self.random.random() < 0.3:
+            return self.operand()
+        left = self.expression(depth - 1)
+        right = self.expression(depth - 1)
+        expression = f"{left} {self.random.choice(_OPERATORS)} {right}"
+        return f"({expression})" if self.random.random() < 0.4 else expression
+
+    def condition(self):
+        return f"{self.name()} {self.random.choice(_COMPARISONS)} {self.operand()}"
+
+    def string(self, words=4):
+        return '"' + " ".join(self.random.choice(_WORDS) for _ in range(words)) + '"'
+
+    def statement(self, indent=""):
+        choice = self.random.random()
+        if choice < 0.25:
+            return f"{indent}{self.random.choice(_TYPES)} {self.name()} = {self.expression()};"
+        if choice < 0.5:
+            return f"{indent}{self.name()} = {self.expression(3)};"
+        if choice < 0.6:
+            return f"{indent}if ({self.condition()}) {{ {self.name()} = {self.expression()}; }}"
+        if choice < 0.7:
+            return f"{indent}while ({self.condition()}) {{ {self.name()} = {self.name()} - 1; }}"
+        if choice < 0.78:
+            i = self.name()
+            return f"{indent}for ({i} = 0; {i} < {self.operand()}; {i} = {i} + 1) {{ {self.name()} = {i}; }}"
+        if choice < 0.86:
+            return f"{indent}// {self.string(3)[1:-1]}"
+        if choice < 0.92:
+            return f"{indent}char {self.name()} = {self.string()};"
+        return f"{indent}return {self.expression()};"
+
+    def function(self):
+        lines = [f"{self.random.choice(_TYPES)} f{self.random.randint(0, 999)}({self.random.choice(_TYPES)} {self.name()}) {{"]
+        lines.extend(self.statement("    ") for _ in range(self.random.randint(2, 8)))
+        lines.append("}")
+        return lines
+
+
+def generate(shape, size, seed=0):
+    """
+    Genera un programa tipo C de aproximadamente 'size' caracteres con la
+    forma indicada. Con la misma semilla siempre se obtiene el mismo texto.
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"forma desconocida: {shape!r}")
+    generator = _Generator(repr((shape, size, seed)))
+    rand = generator.random
+    parts = []
+    length = 0
+
+    if shape == "anidado":
+        # Una sola expresión con paréntesis anidados tan profundo como quepa
+        depth = max(1, size // 12)
+        opening = "".join(f"({generator.name()} {rand.choice(_OPERATORS)} " for _ in range(depth))
+        return f"x0 = {opening}1{')' * depth};\n"
+
+    while length < size:
+        if shape == "programa" or shape == "linea_larga":
+            lines = generator.function() if rand.random() < 0.2 else [generator.statement()]
+        elif shape == "comentarios":
+            if rand.random() < 0.5:
+                lines = [f"// {generator.string(8)[1:-1]}"]
+            elif rand.random() < 0.6:
+                lines = ["/*"] + [f" * {generator.string(6)[1:-1]}" for _ in range(rand.randint(1, 5))] + [" */"]
+            else:
+                lines = [generator.statement()]
+        elif shape == "strings":
+            lines = [f"char {generator.name()} = {generator.string(rand.randint(200, 2000))};"]
+        else:  # errores
+            noise = "".join(rand.choice("#@$`?~\\'") for _ in range(rand.randint(1, 6)))
+            lines = [f"{generator.statement()} {noise}"]
+        for line in lines:
+            parts.append(line)
+            length += len(line) + 1
+
+    separator = " " if shape == "linea_larga" else "\n"
+    return separator.join(parts) + "\n"
@@ -0,0 +1,72 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Lo que hace un programa que usa el núcleo: importar el paquete y las
+# funciones de análisis
+DEFAULT_STATEMENT = "import analizador; from analizador import analizadorLexico, syntax_analyzer, semantic_analyzer"
+
+# Módulos que importar el núcleo no debe cargar
+FORBIDDEN = ("tkinter", "_tkinter", "sqlite3", "mmap", "cProfile", "tracemalloc", "numpy", "multiprocessing")
+
+# Marca en stderr: las líneas anteriores son del arranque del intérprete
+_MARK = "-- importtime --"
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(statement=DEFAULT_STATEMENT):
+    """
+    Ejecuta 'statement' en un intérprete nuevo con -X importtime y devuelve
+    el tiempo total de sus importaciones en microsegundos, la lista de
+    (módulo, acumulado) de primer nivel y los módulos prohibidos cargados.
+    """
+    code = (f"import sys; sys.stderr.write({_MARK!r} + '\\n'); {statement}; "
+            f"print(' '.join(sorted({{m.split('.')[0] for m in sys.modules}} & set({FORBIDDEN!r}))))")
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=_ROOT, capture_output=True,
+                               text=True, check=True)
+    lines = completed.stderr.splitlines()
+    lines = lines[lines.index(_MARK) + 1:] if _MARK in lines else []
+    total = 0
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Solo las importaciones de primer nivel: las anidadas ya están en su acumulado
+        if name.startswith("  "):
+            continue
+        total += int(cumulative)
+        modules.append((name.strip(), int(cumulative)))
+    return total, modules, completed.stdout.split()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.importtime",
+        description="Comprueba con -X importtime que importar el núcleo del analizador no pasa del presupuesto.")
+    parser.add_argument("--budget", type=float, default=25.0, help="presupuesto en milisegundos")
+    parser.add_argument("--repeat", type=int, default=5, help="ejecuciones; se toma la más rápida")
+    parser.add_argument("--statement", default=DEFAULT_STATEMENT, help="importaciones que se miden")
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.statement) for _ in range(max(1, args.repeat))]
+    total, modules, _ = min(runs, key=lambda run: run[0])
+
+    for name, cumulative in sorted(modules, key=lambda module: -module[1]):
+        print(f"{name:<30}{cumulative / 1000:>10.2f} ms", file=sys.stderr)
+    print(f"{'Total':<30}{total / 1000:>10.2f} ms (presupuesto {args.budget:.2f} ms)", file=sys.stderr)
+
+    failures = 0
+    if total / 1000 > args.budget:
+        failures += 1
+        print(f"EXCEDIDO: {total / 1000:.2f} ms > {args.budget:.2f} ms", file=sys.stderr)
+    for module in sorted({run_module for run in runs for run_module in run[2]}):
+        failures += 1
+        print(f"PROHIBIDO: se cargó {module}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
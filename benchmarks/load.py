@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from analizador.server import AnalysisServer, serve_unix
+from benchmarks.corpus import generate
+
+# Peticiones de análisis que hace cada cliente entre sus ediciones
+METHODS = ("syntax_analyzer", "semantic_analyzer", "analizadorLexico", "generate_reverse_polish_notation")
+
+
+class _Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    async def notify(self, method, params):
+        self.writer.write(json.dumps({"jsonrpc": "2.0", "method": method, "params": params}).encode() + b"\n")
+        await self.writer.drain()
+
+    async def request(self, method, params):
+        self.next_id += 1
+        message = {"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params}
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        if "error" in response:
+            raise RuntimeError(response["error"]["message"])
+        return response["result"]
+
+
+async def _client(path, number, requests, size, seed, latencies):
+    reader, writer = await asyncio.open_unix_connection(path, limit=1 << 30)
+    client = _Client(reader, writer)
+    rand = random.Random(seed + number)
+    uri = f"mem://cliente{number}.c"
+    text = generate("programa", size, seed + number)
+    await client.notify("textDocument/didOpen", {"uri": uri, "text": text})
+    try:
+        for _ in range(requests):
+            # Una ráfaga de ediciones pequeñas seguida de una petición
+            for _ in range(rand.randint(0, 3)):
+                position = rand.randint(0, len(text))
+                edit = rand.choice(("x = 1;\n", " ", "int y;\n"))
+                text = text[:position] + edit + text[position:]
+                await client.notify("textDocument/didChange",
+                                    {"uri": uri, "changes": [{"start": position, "end": position, "text": edit}]})
+            started = time.perf_counter()
+            await client.request(rand.choice(METHODS), {"uri": uri})
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(clients, requests, size, seed, path=None, workers=None, debounce=0.05):
+    """
+    Lanza 'clients' clientes concurrentes contra el servicio (uno propio en
+    un socket temporal si no se indica 'path') y devuelve las latencias de
+    las peticiones de análisis en segundos.
+    """
+    server_task = None
+    directory = None
+    if path is None:
+        directory = tempfile.TemporaryDirectory()
+        path = os.path.join(directory.name, "analizador.sock")
+        from concurrent.futures import ThreadPoolExecutor
+        server = AnalysisServer(ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1), debounce)
+        server_task = asyncio.create_task(serve_unix(server, path))
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+
+    latencies = []
+    try:
+        await asyncio.gather(*(_client(path, number, requests, size, seed, latencies) for number in range(clients)))
+    finally:
+        if server_task is not None:
+            server_task.cancel()
+            directory.cleanup()
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load",
+        description="Prueba de carga del servicio de análisis: muchos clientes que editan y piden análisis.")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="peticiones de análisis por cliente")
+    parser.add_argument("--size", type=int, default=2000, help="tamaño aproximado de cada documento")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--socket", metavar="RUTA", help="servicio ya en marcha (por defecto se lanza uno propio)")
+    parser.add_argument("--workers", type=int, help="hilos de análisis del servicio propio")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    latencies = asyncio.run(run(args.clients, args.requests, args.size, args.seed, args.socket, args.workers))
+    elapsed = time.perf_counter() - started
+    print(f"{args.clients} clientes, {len(latencies)} peticiones en {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:.0f} peticiones/s)")
+    print(f"p50 {_percentile(latencies, 0.5) * 1000:.1f} ms  p99 {_percentile(latencies, 0.99) * 1000:.1f} ms  "
+          f"media {statistics.mean(latencies) * 1000:.1f} ms  máx {max(latencies) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import argparse
+import datetime
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from analizador import (analizadorLexico, generate_polish_notation, generate_reverse_polish_notation,
+                        parse_expression_to_tree, semantic_analyzer, syntax_analyzer)
+from analizador.dfa import tokenize as dfa_tokenize
+from analizador.notation import clear_cache
+from analizador.pipeline import Pipeline
+from analizador.vectorized import tokenize as numpy_tokenize
+from benchmarks.corpus import SHAPES, generate
+
+
+def _uncached(function):
+    # Las vistas de notación guardan su resultado por buffer; para medir el
+    # trabajo real cada repetición empieza sin él
+    def stage(tokens):
+        clear_cache()
+        return function(tokens)
+    return stage
+
+
+# Etapas medidas, en el orden en que se ejecutan; las léxicas reciben el
+# código y las demás los tokens del análisis léxico
+STAGES = {
+    "lexico": analizadorLexico,
+    "lexico_dfa": lambda code: dfa_tokenize(code, compat=True),
+    "lexico_numpy": lambda code: numpy_tokenize(code, compat=True),
+    # En varios procesos; por debajo de parallel.MIN_PARALLEL_SIZE es secuencial
+    "lexico_paralelo": lambda code: analizadorLexico(code, jobs=None),
+    # Léxico, sintáctico y semántico en una sola pasada
+    "pipeline": lambda code: Pipeline(code).run(),
+    "sintactico": syntax_analyzer,
+    "semantico": semantic_analyzer,
+    "polaca": _uncached(generate_polish_notation),
+    "polaca_inversa": _uncached(generate_reverse_polish_notation),
+    "arbol": _uncached(parse_expression_to_tree),
+}
+
+LEXICAL_STAGES = {"lexico", "lexico_dfa", "lexico_numpy", "lexico_paralelo", "pipeline"}
+
+DEFAULT_SIZES = (10_000, 100_000)
+
+
+def _measure(function, argument, repeat):
+    # El mejor de 'repeat' tiempos, sin tracemalloc para no distorsionarlos
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = function(argument)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _peak_memory(function, argument):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function(argument)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(shape, size, seed=0, stages=tuple(STAGES), repeat=3, memory=True):
+    """
+    Mide todas las etapas sobre un programa generado y devuelve un
+    diccionario con tiempos, tokens/s y memoria máxima por etapa.
+    """
+    code = generate(shape, size, seed)
+    seconds, (tokens, _) = _measure(STAGES["lexico"], code, repeat)
+    case = {"shape": shape, "size": size, "chars": len(code), "tokens": len(tokens), "stages": {}}
+
+    for stage in stages:
+        argument = code if stage in LEXICAL_STAGES else tokens
+        record = {}
+        try:
+            if stage != "lexico":
+                seconds, _ = _measure(STAGES[stage], argument, repeat)
+            record["seconds"] = seconds
+            record["tokens_per_second"] = len(tokens) / seconds if seconds else None
+            if memory:
+                record["peak_bytes"] = _peak_memory(STAGES[stage], argument)
+        except Exception as error:
+            # Algunas etapas fallan con ciertas entradas; se registra sin cortar la serie
+            record["error"] = f"{type(error).__name__}: {error}"
+        case["stages"][stage] = record
+    return case
+
+
+def compare(results, baseline, threshold, min_seconds=0.001):
+    """
+    Devuelve la lista de regresiones: etapas cuyo tiempo supera al de la
+    línea base en más de 'threshold' (fracción, 0.2 = 20 %). Las etapas que
+    en la línea base tardaron menos de 'min_seconds' se ignoran por ruidosas.
+    """
+    previous = {(case["shape"], case["size"]): case for case in baseline["results"]}
+    regressions = []
+    for case in results["results"]:
+        old_case = previous.get((case["shape"], case["size"]))
+        if old_case is None:
+            continue
+        for stage, record in case["stages"].items():
+            old = old_case["stages"].get(stage, {})
+            if "seconds" not in record or old.get("seconds", 0) < min_seconds:
+                continue
+            ratio = record["seconds"] / old["seconds"]
+            if ratio > 1 + threshold:
+                regressions.append({"shape": case["shape"], "size": case["size"], "stage": stage,
+                                    "baseline": old["seconds"], "seconds": record["seconds"], "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Mide cada etapa del analizador sobre programas generados.")
+    parser.add_argument("--shapes", default=",".join(SHAPES),
+                        help=f"formas de programa separadas por comas ({', '.join(SHAPES)})")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="tamaños aproximados en caracteres, separados por comas")
+    parser.add_argument("--stages", default=",".join(STAGES), help="etapas a medir, separadas por comas")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones por etapa (se toma la mejor)")
+    parser.add_argument("--no-memory", action="store_true", help="no medir la memoria con tracemalloc")
+    parser.add_argument("-o", "--output", help="archivo donde guardar el resultado JSON")
+    parser.add_argument("--baseline", help="resultado JSON anterior con el que comparar")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="aumento de tiempo tolerado respecto a la línea base (0.2 = 20 %%)")
+    parser.add_argument("--min-seconds", type=float, default=0.001,
+                        help="no comparar etapas que en la línea base tardaron menos que esto")
+    args = parser.parse_args(argv)
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    for stage in stages:
+        if stage not in STAGES:
+            parser.error(f"etapa desconocida: {stage}")
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": [],
+    }
+    for shape in args.shapes.split(","):
+        for size in map(int, args.sizes.split(",")):
+            case = run_case(shape, size, args.seed, stages, args.repeat, not args.no_memory)
+            results["results"].append(case)
+            lexico = case["stages"].get("lexico", {})
+            print(f"{shape:>12} {size:>10} {case['tokens']:>9} tokens "
+                  + " ".join(f"{stage}={record['seconds']:.4f}s" if "seconds" in record else f"{stage}=error"
+                             for stage, record in case["stages"].items())
+                  + (f" ({lexico['tokens_per_second']:.0f} tokens/s)" if lexico.get("tokens_per_second") else ""),
+                  file=sys.stderr)
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as source:
+            baseline = json.load(source)
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        for regression in regressions:
+            print(f"REGRESIÓN {regression['shape']} {regression['size']} {regression['stage']}: "
+                  f"{regression['baseline']:.4f}s -> {regression['seconds']:.4f}s "
+                  f"(x{regression['ratio']:.2f})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import pytest
+
+from analizador import TokenBuffer, lexer
+from benchmarks.corpus import SHAPES, generate
+
+TEXTS = [generate(shape, 5000) for shape in SHAPES] + ["", "  \n", "  x = 1;", "á = \"ñ\";\n\tb = á + 1;"]
+
+
+def _positions(text, buffer):
+    # Línea y columna contando caracteres, sin LineIndex
+    result = []
+    for start in buffer.starts:
+        before = buffer.source[:start].decode("utf-8")
+        result.append((before.count("\n") + 1, len(before) - before.rfind("\n")))
+    return result
+
+
+@pytest.mark.parametrize("compat", [True, False])
+@pytest.mark.parametrize("text", TEXTS)
+def test_buffer_matches_tokenize(text, compat):
+    buffer = TokenBuffer.from_source(text, compat)
+    tokens, counts = lexer.tokenize(text, compat)
+    assert list(buffer) == tokens
+    assert buffer[:] == tokens
+    assert list(buffer.iter_range(1, 5)) == tokens[1:5]
+    assert buffer.counts() == counts
+    assert [bytes(buffer.span(i)).decode("utf-8") for i in range(len(buffer))] == [lexeme for lexeme, _ in tokens]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_buffer_strip(text):
+    assert list(TokenBuffer.from_source(text, True, strip=True)) == lexer.tokenize(text.lstrip(), True)[0]
+
+
+@pytest.mark.parametrize("backend", ["dfa", "numpy"])
+def test_buffer_backends(backend):
+    for text in TEXTS:
+        expected = TokenBuffer.from_source(text)
+        buffer = TokenBuffer.from_source(text, backend=backend)
+        assert (buffer.kinds, buffer.starts, buffer.ends) == (expected.kinds, expected.starts, expected.ends)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_positions(text):
+    buffer = TokenBuffer.from_source(text)
+    expected = _positions(text, buffer)
+    assert [buffer.position(i) for i in range(len(buffer))] == expected
+    # Consultas desordenadas, como al saltar a un error
+    order = sorted(range(len(buffer)), key=lambda i: (i * 7919) % (len(buffer) or 1))
+    assert [buffer.position(i) for i in order] == [expected[i] for i in order]
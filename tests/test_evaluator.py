@@ -0,0 +1,54 @@
+import pytest
+
+from analizador import analizadorLexico, generate_reverse_polish_notation, parse_expression_to_tree
+from analizador.evaluator import compile_expression, compile_postfix
+
+# Código, variables y resultado esperado de la última expresión
+CASES = [
+    ("x = a - -b;", {"a": 1, "b": 2}, 3),
+    ("x = a * -b;", {"a": 3, "b": 2}, -6),
+    ("x = -a - b;", {"a": 1, "b": 2}, -3),
+    ("x = a + +b;", {"a": 1, "b": 2}, 3),
+    ("x = +a - +b;", {"a": 1, "b": 2}, -1),
+    ("x = -(-a);", {"a": 4}, 4),
+    ("x = !a + !b;", {"a": 0, "b": 5}, 1),
+    ("x = !(a - a) * b;", {"a": 7, "b": 5}, 5),
+    ("y = x++;", {"x": 1}, 1),
+    ("y = ++x;", {"x": 1}, 2),
+    ("y = x--;", {"x": 1}, 1),
+    ("y = --x;", {"x": 1}, 0),
+    ("y = x++ + ++x;", {"x": 1}, 4),
+    ("y = --x - x--;", {"x": 4}, 0),
+    ("y = -x++;", {"x": 3}, -3),
+    # Variables con nombres parecidos a etiquetas de operadores
+    ("y = neg + pos;", {"neg": 2, "pos": 3}, 5),
+    ("y = a - neg;", {"a": 5, "neg": 2}, 3),
+    ("y = u - -u;", {"u": 2}, 4),
+]
+
+
+@pytest.mark.parametrize("code, names, expected", CASES)
+def test_postfix_matches_tree(code, names, expected):
+    tokens = analizadorLexico(code)[0]
+    from_tree = compile_expression(parse_expression_to_tree(tokens))
+    from_postfix = compile_postfix(generate_reverse_polish_notation(tokens))
+    tree_names, postfix_names = dict(names), dict(names)
+    assert from_tree(tree_names) == expected
+    assert from_postfix(postfix_names) == expected
+    # Las asignaciones e incrementos dejan las mismas variables
+    assert postfix_names == tree_names
+
+
+@pytest.mark.parametrize("code, names, expected", CASES)
+def test_source_matches_tree(code, names, expected):
+    assert compile_expression(code)(dict(names)) == expected
+
+
+def test_postfix_labels_keep_arity():
+    tokens = analizadorLexico("x = a - -b; y = x++ + ++x;")[0]
+    assert generate_reverse_polish_notation(tokens).splitlines() == ["x a b u- - =", "y x x++ x ++x + ="]
+
+
+def test_postfix_missing_operand():
+    with pytest.raises(ValueError):
+        compile_postfix("a -")
@@ -0,0 +1,54 @@
+import random
+from array import array
+
+import pytest
+
+from analizador import TokenBuffer, relex
+from analizador.incremental import _shift
+from benchmarks.corpus import generate
+
+_PIECES = ("a", "é", " ", "\n", "+", "1", "/*", "*/", '"x"', "ñ = 2;", "//c\n", "if", ";")
+
+
+def _columns(buffer):
+    return buffer.kinds, buffer.starts, buffer.ends
+
+
+@pytest.mark.parametrize("compat", [True, False])
+def test_random_edits(compat):
+    rand = random.Random(3)
+    for _ in range(200):
+        text = "".join(rand.choice(_PIECES) for _ in range(60))
+        buffer = TokenBuffer.from_source(text, compat)
+        for _ in range(5):
+            start = rand.randrange(len(text) + 1)
+            end = rand.randrange(start, min(len(text), start + 8) + 1)
+            text = text[:start] + "".join(rand.choice(_PIECES) for _ in range(rand.randrange(4))) + text[end:]
+            first, removed, added = relex(buffer, text)
+            assert _columns(buffer) == _columns(TokenBuffer.from_source(text, compat)), text
+            assert first + added <= len(buffer)
+
+
+def test_edit_report():
+    text = generate("programa", 20000)
+    buffer = TokenBuffer.from_source(text)
+    old = list(buffer)
+    edited = text.replace("=", "= -", 1)
+    first, removed, added = relex(buffer, edited)
+    assert list(buffer) == list(TokenBuffer.from_source(edited))
+    assert old[:first] == list(buffer)[:first]
+    assert old[first + len(removed):] == list(buffer)[first + added:]
+    assert relex(buffer, edited) == (len(buffer), array("B"), 0)
+
+
+@pytest.mark.parametrize("typecode", ["I", "Q"])
+def test_shift(typecode):
+    # Incluye un valor cerca del máximo del tipo: no debe acarrear al vecino
+    top = (1 << 8 * array(typecode).itemsize) - 10
+    values = array(typecode, [0, 5, 9, 1 << 20, top])
+    _shift(values, 1, 7)
+    assert values.tolist() == [0, 12, 16, (1 << 20) + 7, top + 7]
+    _shift(values, 2, -16)
+    assert values.tolist() == [0, 12, 0, (1 << 20) - 9, top - 9]
+    _shift(values, len(values), 3)
+    assert values.tolist() == [0, 12, 0, (1 << 20) - 9, top - 9]
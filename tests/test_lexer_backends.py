@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from analizador import dfa, lexer, vectorized
+from benchmarks.corpus import SHAPES, generate
+
+# Fragmentos para las cadenas aleatorias: palabras clave y sus prefijos,
+# números, comentarios y strings a medias y caracteres no ASCII
+_PIECES = lexer.KEYWORDS + ("iff", "intx", "x1", "_", "12", "3.5", "4.", ".5", "//", "/*", "*/", '"a\\"b"', '"',
+                            "\\", "/", "+", "=", "!", ";", "(", "]", "\n", " ", "\t", "#", "é", "٣", " ", "\x85")
+
+
+def _random_texts(count, seed=0):
+    rand = random.Random(seed)
+    return ["".join(rand.choice(_PIECES) for _ in range(rand.randint(0, 16))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("compat", [True, False])
+@pytest.mark.parametrize("shape", SHAPES)
+def test_dfa_matches_regex_on_corpus(shape, compat):
+    text = generate(shape, 20000)
+    assert list(dfa.scan(text, compat)) == list(lexer.scan(text, compat))
+
+
+@pytest.mark.parametrize("compat", [True, False])
+def test_dfa_matches_regex_on_random_text(compat):
+    for text in _random_texts(5000):
+        assert list(dfa.scan(text, compat)) == list(lexer.scan(text, compat)), text
+
+
+@pytest.mark.parametrize("compat", [True, False])
+@pytest.mark.parametrize("backend", ["dfa", "numpy"])
+def test_backends_match_tokenize(backend, compat):
+    if backend == "numpy" and not vectorized.AVAILABLE:
+        pytest.skip("NumPy no está instalado")
+    for text in [generate(shape, 20000) for shape in SHAPES] + _random_texts(500, seed=1):
+        assert lexer.tokenize(text, compat, backend) == lexer.tokenize(text, compat), text
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        lexer.tokenize("x = 1;", backend="otro")
@@ -0,0 +1,45 @@
+import pytest
+
+from analizador import TokenBuffer
+from analizador.mapped import tokenize_file, tokenize_mapped
+from benchmarks.corpus import SHAPES, generate
+
+TEXTS = [generate(shape, 5000) for shape in SHAPES] + [
+    "",
+    "  \x1cx = 1;",
+    "a = 1; /* abierto\nsigue\n*/ b = \"ñ\";\nc = 3;",
+    "a = 1; /* sin cerrar\nb = 2;\n",
+    "x = \"á\";\n// é ñ\ny = x;",
+]
+
+
+def _columns(buffer):
+    return buffer.kinds, buffer.starts, buffer.ends
+
+
+@pytest.mark.parametrize("strip", [False, True])
+@pytest.mark.parametrize("compat", [True, False])
+@pytest.mark.parametrize("text", TEXTS)
+def test_mapped_matches_from_source(text, compat, strip):
+    expected = _columns(TokenBuffer.from_source(text, compat, strip))
+    data = text.encode("utf-8")
+    # Tramos chicos para que los cortes caigan en medio del código
+    for block_size in (1, 64, 1 << 20):
+        assert _columns(tokenize_mapped(data, compat, strip, block_size)) == expected
+
+
+@pytest.mark.parametrize("compat", [True, False])
+@pytest.mark.parametrize("text", TEXTS)
+def test_tokenize_file(text, compat, tmp_path):
+    path = tmp_path / "codigo.c"
+    path.write_bytes(text.encode("utf-8"))
+    expected = TokenBuffer.from_source(text, compat)
+    buffer = tokenize_file(path, compat, block_size=64)
+    assert _columns(buffer) == _columns(expected)
+    assert list(buffer) == list(expected)
+    assert list(TokenBuffer.from_file(path, compat)) == list(expected)
+
+
+def test_invalid_utf8():
+    with pytest.raises(UnicodeDecodeError):
+        tokenize_mapped(b"x = \xff;")
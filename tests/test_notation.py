@@ -0,0 +1,21 @@
+from analizador import TokenBuffer, analizadorLexico, generate_reverse_polish_notation, relex
+from analizador.notation import analyze
+
+
+def test_cache_follows_list_contents():
+    tokens = analizadorLexico("x = a + b;")[0]
+    first = analyze(tokens)
+    assert analyze(tokens) is first
+    assert analyze(list(tokens)) is first
+    # Misma longitud, otro contenido: no se reutiliza el análisis anterior
+    tokens[3] = ("-", "OPERADOR")
+    assert generate_reverse_polish_notation(tokens) == "x a b - ="
+
+
+def test_cache_follows_relex():
+    buffer = TokenBuffer.from_source("x = a + b;", compat=True, strip=True)
+    first = analyze(buffer)
+    assert analyze(buffer) is first
+    relex(buffer, "x = a * b;", strip=True)
+    assert analyze(buffer) is not first
+    assert generate_reverse_polish_notation(buffer) == "x a b * ="
@@ -0,0 +1,55 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from analizador import TokenBuffer, lexer, parallel
+from benchmarks.corpus import SHAPES, generate
+
+TEXTS = [generate(shape, 20000) for shape in SHAPES] + [
+    "  x = 1;\n" * 200,
+    "a = 1;\n/* abierto\n" + "x = 2;\n" * 300 + "*/ b = \"ñ\";\nc = 3;\n",
+    "a = 1;\n" * 300 + "/* sin cerrar\n" + "b = 2;\n" * 300,
+]
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.fixture(autouse=True)
+def small_texts(monkeypatch):
+    # Que los textos de prueba también se repartan entre procesos
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_SIZE", 0)
+
+
+@pytest.mark.parametrize("compat", [True, False])
+@pytest.mark.parametrize("text", TEXTS)
+def test_split_points(text, compat):
+    data = text.encode("utf-8")
+    cuts = parallel.split_points(data, 8, compat)
+    assert cuts[0] == 0 and cuts[-1] == len(data) and cuts == sorted(set(cuts))
+    tokens = []
+    for start, end in zip(cuts, cuts[1:]):
+        tokens += parallel._lex(data[start:end].decode("utf-8"), compat, not start)[0]
+    assert tokens == lexer.tokenize(text, compat)[0]
+
+
+@pytest.mark.parametrize("compat", [True, False])
+@pytest.mark.parametrize("text", TEXTS)
+def test_tokenize(text, compat, executor, tmp_path):
+    expected = lexer.tokenize(text, compat)
+    assert parallel.tokenize(text, compat, jobs=2, executor=executor) == expected
+    path = tmp_path / "codigo.c"
+    path.write_bytes(text.encode("utf-8"))
+    assert parallel.tokenize_file(path, compat, jobs=2, executor=executor) == expected
+
+
+@pytest.mark.parametrize("strip", [False, True])
+@pytest.mark.parametrize("compat", [True, False])
+@pytest.mark.parametrize("text", TEXTS)
+def test_tokenize_buffer(text, compat, strip, executor):
+    expected = TokenBuffer.from_source(text, compat, strip)
+    buffer = parallel.tokenize_buffer(text, compat, strip, jobs=2, executor=executor)
+    assert (buffer.kinds, buffer.starts, buffer.ends) == (expected.kinds, expected.starts, expected.ends)
@@ -0,0 +1,39 @@
+import asyncio
+import gc
+
+from analizador.server import AnalysisServer
+
+
+def _notify(method, **params):
+    return {"jsonrpc": "2.0", "method": method, "params": params}
+
+
+def test_debounced_sync_keeps_its_task():
+    async def scenario():
+        server = AnalysisServer(debounce=0.01)
+        # La sincronización espera a 'release' para poder verla pendiente
+        release = asyncio.Event()
+        sync = server.sync
+
+        async def held_sync(document):
+            await release.wait()
+            await sync(document)
+
+        server.sync = held_sync
+        await server.handle(_notify("textDocument/didOpen", uri="a", text="int x = 1;"))
+        await server.handle(_notify("textDocument/didChange", uri="a", text="int x = 2;"))
+        document = server.documents["a"]
+        for _ in range(100):
+            if server.tasks:
+                break
+            await asyncio.sleep(0.005)
+        # La tarea del temporizador queda referenciada hasta terminar
+        assert len(server.tasks) == 1
+        gc.collect()
+        release.set()
+        await asyncio.gather(*server.tasks)
+        assert not server.tasks
+        assert document.synced == "int x = 2;"
+        assert [document.tokens.lexeme(i) for i in range(len(document.tokens))] == ["int", "x", "=", "2", ";"]
+
+    asyncio.run(scenario())
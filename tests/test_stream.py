@@ -0,0 +1,40 @@
+import io
+
+import pytest
+
+from analizador import iter_text_chunks, iter_tokens, lexer
+from benchmarks.corpus import SHAPES, generate
+
+TEXTS = [generate(shape, 5000) for shape in SHAPES] + [
+    "",
+    "  x = 1;",
+    "a = 1; /* abierto\nsigue\n*/ b = 2;\nc = 3;",
+    "a = 1; /* sin cerrar\nb = 2;\n",
+    "x = \"á\";\n// é ñ\ny = x;",
+]
+
+
+def _split(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("compat", [True, False])
+@pytest.mark.parametrize("text", TEXTS)
+def test_chunks_match_tokenize(text, compat):
+    expected = lexer.tokenize(text, compat)[0]
+    for size in (1, 2, 7, 64, 4096):
+        assert list(iter_text_chunks(_split(text, size), compat)) == expected
+
+
+@pytest.mark.parametrize("compat", [True, False])
+@pytest.mark.parametrize("text", TEXTS)
+def test_iter_tokens_sources(text, compat, tmp_path):
+    expected = lexer.tokenize(text, compat)[0]
+    data = text.encode("utf-8")
+    path = tmp_path / "codigo.c"
+    path.write_bytes(data)
+    # Bloques de 3 bytes: los caracteres multibyte quedan partidos
+    assert list(iter_tokens(io.BytesIO(data), chunk_size=3, compat=compat)) == expected
+    assert list(iter_tokens(io.StringIO(text, newline=""), chunk_size=5, compat=compat)) == expected
+    assert list(iter_tokens(path, chunk_size=16, compat=compat)) == expected
+    assert list(iter_tokens(str(path), compat=compat)) == expected